@@ -4,13 +4,24 @@ from django import forms
 from django.contrib import admin, messages
 from django.urls import path, reverse
 from django.shortcuts import render, redirect
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
 from .models import Event, Division, Workout, WorkoutHeat, HeatAssignment
 from .services.heats import (
+    participants_for_division,
+    plan_distribution,
     propose_heats_for_division,
+    rank_participants,
     seed_heats_from_ranking_for_division,
 )
+from compcore.apps.jobs.services.queue import enqueue
+from compcore.apps.judging.services.lanes import LaneShrinkError
+from compcore.apps.leaderboard.services.standings import (
+    refresh_event_totals,
+    refresh_rank_keys,
+    refresh_standings,
+)
 
 # -----------------------------
 # Event
@@ -20,6 +31,22 @@ class EventAdmin(admin.ModelAdmin):
     list_display = ("name", "status", "start_date", "end_date")
     search_fields = ("name",)
     list_filter = ("status",)
+    actions = ["action_rebuild_leaderboard"]
+
+    @admin.action(description=_("Reconstruir leaderboard (segundo plano)"))
+    def action_rebuild_leaderboard(self, request, queryset):
+        events = list(queryset.values_list("id", "name"))
+        job = enqueue(
+            "leaderboard.rebuild_standings",
+            {"event_ids": [pk for pk, _name in events]},
+            user=request.user,
+            label="Rebuild leaderboard · " + ", ".join(name for _pk, name in events),
+        )
+        self.message_user(
+            request,
+            format_html('Rebuild encolado (job <a href="{}">#{}</a>).', reverse("job_detail", args=[job.pk]), job.pk),
+            level=messages.SUCCESS,
+        )
 
 # -----------------------------
 # Division
@@ -49,18 +76,67 @@ class WorkoutAdmin(admin.ModelAdmin):
     list_filter = ("event", "is_published", "scoring")
     search_fields = ("name", "description")
     ordering = ("event", "order")
-    actions = ["action_publish_workouts", "action_unpublish_workouts"]
+    actions = [
+        "action_publish_workouts",
+        "action_unpublish_workouts",
+        "action_seed_all_w1",
+        "action_seed_all_ranking",
+    ]
 
     @admin.action(description=_("Publicar workouts seleccionados"))
     def action_publish_workouts(self, request, queryset):
+        events = {w.event for w in queryset.select_related("event")}
         updated = queryset.update(is_published=True)
+        for ev in events:
+            refresh_event_totals(ev)  # los totales solo cuentan WODs publicados
         self.message_user(request, f"{updated} workouts publicados.", level=messages.SUCCESS)
 
     @admin.action(description=_("Despublicar workouts seleccionados"))
     def action_unpublish_workouts(self, request, queryset):
+        events = {w.event for w in queryset.select_related("event")}
         updated = queryset.update(is_published=False)
+        for ev in events:
+            refresh_event_totals(ev)
         self.message_user(request, f"{updated} workouts despublicados.", level=messages.SUCCESS)
 
+    def _seed_all(self, request, queryset, mode: str):
+        # Puede tardar más que el timeout del request: se encola y lo ejecuta `run_jobs`
+        label = "W1" if mode == "W1" else "Ranking W2+"
+        workouts = list(queryset.order_by("event", "order").values_list("id", "order"))
+        job = enqueue(
+            "events.seed_all",
+            {"workout_ids": [pk for pk, _order in workouts], "mode": mode},
+            user=request.user,
+            label=f"Sembrar {label} · " + ", ".join(f"W{order}" for _pk, order in workouts),
+        )
+        self.message_user(
+            request,
+            format_html(
+                'Siembra {} encolada para {} workouts (job <a href="{}">#{}</a>). Los heats quedan en BORRADOR.',
+                label, len(workouts), reverse("job_detail", args=[job.pk]), job.pk,
+            ),
+            level=messages.SUCCESS,
+        )
+
+    @admin.action(description=_("Sembrar TODAS las divisiones (W1 secuencial)"))
+    def action_seed_all_w1(self, request, queryset):
+        self._seed_all(request, queryset, "W1")
+
+    @admin.action(description=_("Sembrar TODAS las divisiones (W2+ por ranking)"))
+    def action_seed_all_ranking(self, request, queryset):
+        self._seed_all(request, queryset, "W2P")
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and "scoring" in form.changed_data:
+            # HeatResult.rank_key depende del scoring: recalcular claves y re-rankear el WOD
+            # (refresh_standings también rehace los totales, cubre un is_published simultáneo)
+            refresh_rank_keys([obj.id])
+            for division in Division.objects.filter(event_id=obj.event_id).select_related("event"):
+                refresh_standings(obj, division)
+        elif "is_published" in form.changed_data:
+            refresh_event_totals(obj.event)
+
     # === URL custom DENTRO de WorkoutAdmin ===
     def get_urls(self):
         urls = super().get_urls()
@@ -88,6 +164,33 @@ class WorkoutAdmin(admin.ModelAdmin):
             )
             # NUEVO
             heat_start = forms.IntegerField(required=False, min_value=1, label="Número inicial de heat")
+            diff = forms.BooleanField(
+                required=False, label="Re-siembra incremental",
+                help_text="Solo mueve lo necesario y respeta asignaciones bloqueadas o manuales.",
+            )
+            strategy = forms.ChoiceField(
+                choices=(("rank", "Ranking"), ("pace", "Ritmo (agrupa por tiempo previsto)")),
+                initial="rank", required=False, label="Estrategia W2+",
+                help_text="Ritmo: solo WODs TIME; usa los WODs TIME anteriores para acortar la duración total.",
+            )
+            pace_tolerance = forms.IntegerField(
+                required=False, min_value=0, initial=1, label="Tolerancia (heats)",
+                help_text="Cuántos heats puede moverse un participante respecto de su heat por ranking.",
+            )
+            compare_lanes = forms.CharField(
+                required=False, label="Vista previa (carriles)",
+                help_text="Ej: 6,8,10. Muestra la distribución para cada cantidad de carriles SIN escribir en BD.",
+            )
+
+            def clean_compare_lanes(self):
+                raw = self.cleaned_data.get("compare_lanes") or ""
+                try:
+                    values = [int(x) for x in raw.replace(" ", "").split(",") if x]
+                except ValueError:
+                    raise forms.ValidationError("Usa números separados por coma (ej: 6,8,10).")
+                if any(v < 1 for v in values):
+                    raise forms.ValidationError("Cada cantidad de carriles debe ser ≥ 1.")
+                return values
 
             def __init__(self, *args, **kwargs):
                 super().__init__(*args, **kwargs)
@@ -111,32 +214,69 @@ class WorkoutAdmin(admin.ModelAdmin):
                 mode = form.cleaned_data["mode"]
                 lane_count = form.cleaned_data.get("lane_count")  # puede ser None
                 heat_start = form.cleaned_data.get("heat_start")  # NUEVO
+                diff = bool(form.cleaned_data.get("diff"))
+                compare_lanes = form.cleaned_data.get("compare_lanes") or []
+                strategy = form.cleaned_data.get("strategy") or "rank"
+                pace_tolerance = form.cleaned_data.get("pace_tolerance")
 
-                if mode == "W1":
-                    res = propose_heats_for_division(
-                        workout.id,
-                        division.id,
-                        default_lane_count=lane_count or 0,
-                        start_heat_number=heat_start or None,  # NUEVO
-                    )
-                    messages.success(
+                if compare_lanes:
+                    # Solo vista previa: planes en memoria, nada se escribe
+                    workout.event = event
+                    division.event = event
+                    ranked = participants_for_division(event, division)
+                    best_last = False
+                    if mode != "W1":
+                        ranked, best_last = rank_participants(workout, division, ranked)
+                    previews = [
+                        plan_distribution(workout, division, ranked, best_last, lane_count=lc)
+                        for lc in compare_lanes
+                    ]
+                    return render(
                         request,
-                        f"Propuesta W1: {res.get('assignments', 0)} asignaciones; "
-                        f"{res.get('heats_touched', 0)} heats (lane_count={res.get('lane_count_used', '-')}). "
-                        "Los heats quedan en BORRADOR."
-                    )
-                else:
-                    res = seed_heats_from_ranking_for_division(
-                        workout.id,
-                        division.id,
-                        default_lane_count=lane_count or 0,
-                        start_heat_number=heat_start or None,  # NUEVO
+                        "admin/events/workout/propose.html",
+                        {"form": form, "event_selected": True, "previews": previews},
                     )
-                    messages.success(
+
+                try:
+                    if mode == "W1":
+                        res = propose_heats_for_division(
+                            workout.id,
+                            division.id,
+                            default_lane_count=lane_count or 0,
+                            start_heat_number=heat_start or None,  # NUEVO
+                            diff=diff,
+                        )
+                        messages.success(
+                            request,
+                            f"Propuesta W1: {res.get('assignments', 0)} asignaciones; "
+                            f"{res.get('heats_touched', 0)} heats (lane_count={res.get('lane_count_used', '-')}). "
+                            "Los heats quedan en BORRADOR."
+                        )
+                    else:
+                        res = seed_heats_from_ranking_for_division(
+                            workout.id,
+                            division.id,
+                            default_lane_count=lane_count or 0,
+                            start_heat_number=heat_start or None,  # NUEVO
+                            diff=diff,
+                            strategy=strategy,
+                            pace_tolerance=1 if pace_tolerance is None else pace_tolerance,
+                        )
+                        messages.success(
+                            request,
+                            f"Ranking W2+: {res.get('assignments', 0)} asignaciones; "
+                            f"{res.get('heats_touched', 0)} heats (lane_count={res.get('lane_count_used', '-')}). "
+                            "Los heats quedan en BORRADOR."
+                        )
+                except LaneShrinkError as exc:
+                    messages.error(request, str(exc))
+                    return render(request, "admin/events/workout/propose.html", {"form": form, "event_selected": True})
+
+                if diff:
+                    messages.info(
                         request,
-                        f"Ranking W2+: {res.get('assignments', 0)} asignaciones; "
-                        f"{res.get('heats_touched', 0)} heats (lane_count={res.get('lane_count_used', '-')}). "
-                        "Los heats quedan en BORRADOR."
+                        f"Re-siembra incremental: {res.get('inserted', 0)} nuevas, {res.get('updated', 0)} movidas, "
+                        f"{res.get('deleted', 0)} eliminadas; {res.get('kept_pinned', 0)} bloqueadas/manuales intactas.",
                     )
 
                 # Aviso si hubo conflicto de numeración solicitada
@@ -3,3 +3,13 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'compcore.apps.events'
+
+    def ready(self):
+        # Sello de resultados por evento (ETag / caché de leaderboard y resultados)
+        from .signals import connect_results_version_signals
+        connect_results_version_signals()
+
+        # Snapshots estáticas: re-publicar páginas afectadas (solo con settings.PUBLIC_SNAPSHOTS)
+        from .services.results_version import results_changed
+        from .services.snapshots import on_results_changed
+        results_changed.connect(on_results_changed, dispatch_uid="events.snapshots")
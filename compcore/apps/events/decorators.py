@@ -0,0 +1,122 @@
+# compcore/apps/events/decorators.py
+"""
+Caché HTTP versionada para páginas públicas de resultados (leaderboard, live, resultados).
+
+Con el sello Event.results_version:
+  • If-None-Match / If-Modified-Since vigentes → 304 tras UNA consulta mínima (sin ORM de la vista).
+  • Si no, el cuerpo renderizado se guarda en caché con la versión en la clave; mientras no
+    haya nuevos resultados, los polls de espectadores no recalculan ni re-renderizan.
+  • Al cambiar la versión, un único worker recalcula (single-flight) y los demás sirven la copia
+    anterior hasta que la nueva esté lista. Entre varios workers requiere una caché compartida
+    (settings.CACHES: DatabaseCache, Redis o Memcached); con LocMem el lock es por proceso.
+"""
+from __future__ import annotations
+
+import time
+from functools import wraps
+from typing import Callable
+
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .services.results_version import results_stamp
+
+BODY_TTL = 60 * 30  # segundos; la versión en la clave ya invalida, el TTL solo limpia
+LOCK_TTL = 30       # segundos; si el proceso que recalcula muere, el lock expira solo
+WAIT_SECONDS = 5.0  # espera máxima cuando aún no hay copia anterior para servir
+
+
+def _cacheable(request) -> bool:
+    # Mensajes pendientes (flash) son por usuario: esa respuesta no se comparte.
+    # Las snapshots (services.snapshots) siempre renderizan la versión vigente.
+    if getattr(request, "is_snapshot", False):
+        return False
+    return request.method in ("GET", "HEAD") and not len(get_messages(request))
+
+
+def _single_flight(request, view, args, kwargs, key: str, latest_key: str, version: int):
+    """
+    Un solo proceso recalcula cada página por versión (lock con cache.add, atómico en backends
+    compartidos); el resto sirve la última versión buena (stale-while-revalidate) o, si todavía no
+    existe ninguna, espera brevemente a que aparezca. Devuelve (response, versión servida).
+    """
+    lock_key = f"{latest_key}:lock"
+    acquired = cache.add(lock_key, version, LOCK_TTL)
+    if not acquired:
+        stale = cache.get(latest_key)
+        if stale is not None:
+            stale_version, content, content_type = stale
+            return HttpResponse(content, content_type=content_type), stale_version
+        deadline = time.monotonic() + WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            hit = cache.get(key)
+            if hit is not None:
+                return HttpResponse(hit[0], content_type=hit[1]), version
+        # El que tenía el lock no terminó a tiempo: se calcula igual (sin bloquear al espectador)
+
+    try:
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            response = response.render() if hasattr(response, "render") else response
+            content, content_type = response.content, response["Content-Type"]
+            cache.set_many({key: (content, content_type), latest_key: (version, content, content_type)}, BODY_TTL)
+        return response, version
+    finally:
+        if acquired:  # el lock de otro worker no se toca: sigue recalculando
+            cache.delete(lock_key)
+
+
+def versioned_results(prefix: str, slug_kwarg: str = "slug", body_cache: bool = True) -> Callable:
+    def deco(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable(request):
+                return view(request, *args, **kwargs)
+
+            stamp = results_stamp(kwargs.get(slug_kwarg, ""))
+            if stamp is None:
+                return view(request, *args, **kwargs)  # la vista responde 404
+            version, updated_at = stamp
+
+            # El header del sitio cambia con la sesión (Ingresar / Mi perfil)
+            audience = "u" if request.user.is_authenticated else "a"
+            etag = quote_etag(f"{prefix}-{version}-{audience}")
+            last_modified = int(updated_at.timestamp()) if updated_at else None
+
+            def finish(response: HttpResponse, served: int = version) -> HttpResponse:
+                if response.status_code not in (200, 304):
+                    return response
+                if served == version:
+                    response["ETag"] = etag
+                    if last_modified is not None:
+                        response["Last-Modified"] = http_date(last_modified)
+                else:
+                    # Copia anterior mientras otro worker recalcula: sin Last-Modified, así el próximo
+                    # poll no recibe un 304 sobre contenido viejo
+                    response["ETag"] = quote_etag(f"{prefix}-{served}-{audience}")
+                patch_cache_control(response, no_cache=True)
+                patch_vary_headers(response, ("Cookie",))
+                return response
+
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                return finish(not_modified)
+            if not body_cache:
+                return finish(view(request, *args, **kwargs))
+
+            path = request.get_full_path()
+            key = f"results-page:{prefix}:{version}:{audience}:{path}"
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return finish(HttpResponse(content, content_type=content_type))
+
+            latest_key = f"results-page:{prefix}:latest:{audience}:{path}"
+            response, served = _single_flight(request, view, args, kwargs, key, latest_key, version)
+            return finish(response, served)
+        return wrapper
+    return deco
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from compcore.apps.events.models import Event, Division, Workout
+from compcore.apps.events.services.heats import _assign_to_heats, _get_entrants_for_division
+from compcore.apps.registration.models import AthleteEntry
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de _assign_to_heats: tiempo de escritura y consultas según tamaño de división. "
+        "Trabaja dentro de una transacción que se revierte (no deja datos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="50,100,300,1000", help="Tamaños de división separados por coma")
+        parser.add_argument("--lanes", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=3, help="Re-siembras por tamaño (se toma la mejor)")
+
+    def handle(self, *args, **opts):
+        sizes = [int(x) for x in opts["sizes"].split(",") if x.strip()]
+        lanes = opts["lanes"]
+        repeat = max(1, opts["repeat"])
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"_assign_to_heats · lanes={lanes} · repeat={repeat} · backend={connection.vendor}"
+        ))
+        self.stdout.write(f"{'N':>6} {'heats':>6} {'queries':>8} {'mejor ms':>10} {'ms/atleta':>10}")
+
+        try:
+            with transaction.atomic():
+                User = get_user_model()
+                event = Event.objects.create(name="__bench_assign__", slug="bench-assign-heats-tmp")
+                workout = Workout.objects.create(event=event, order=1, name="Bench")
+
+                for n in sizes:
+                    division = Division.objects.create(event=event, name=f"Bench {n}", slug=f"bench-{n}")
+                    users = User.objects.bulk_create(
+                        [User(username=f"__bench_{n}_{i}") for i in range(n)]
+                    )
+                    AthleteEntry.objects.bulk_create(
+                        [AthleteEntry(user=u, event=event, division=division) for u in users]
+                    )
+                    entrants = _get_entrants_for_division(division)
+
+                    best = None
+                    queries = 0
+                    res = {}
+                    for _ in range(repeat):
+                        with CaptureQueriesContext(connection) as ctx:
+                            t0 = time.perf_counter()
+                            res = _assign_to_heats(workout, division, entrants, lanes)
+                            elapsed = (time.perf_counter() - t0) * 1000
+                        queries = len(ctx.captured_queries)
+                        best = elapsed if best is None else min(best, elapsed)
+
+                    self.stdout.write(
+                        f"{n:>6} {res.get('heats_touched', 0):>6} {queries:>8} {best:>10.1f} {best / n:>10.3f}"
+                    )
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("✓ Benchmark terminado (datos revertidos)."))
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from compcore.apps.events.services.pacing import heat_durations, pace_grouping
+
+
+def _fmt(seconds: float) -> str:
+    return f"{int(seconds // 60)}:{int(seconds % 60):02d}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de la siembra por ritmo sobre divisiones sintéticas: duración total prevista "
+        "(Σ del más lento por heat) del orden actual vs. agrupación por ritmo. No toca la BD."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="24,60,120,300", help="Tamaños de división separados por coma")
+        parser.add_argument("--lanes", type=int, default=10)
+        parser.add_argument("--tolerances", default="1,2,all", help="Tolerancias en heats ('all' = sin restricción)")
+        parser.add_argument("--base", type=int, default=600, help="Tiempo mediano previsto en segundos")
+        parser.add_argument("--noise", type=float, default=0.15, help="Dispersión del tiempo respecto del ranking")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **opts):
+        sizes = [int(x) for x in opts["sizes"].split(",") if x.strip()]
+        tolerances = [None if x.strip() == "all" else int(x) for x in opts["tolerances"].split(",") if x.strip()]
+        lanes = opts["lanes"]
+        rng = random.Random(opts["seed"])
+
+        header = f"{'N':>5} {'heats':>6} {'actual':>8}"
+        for tol in tolerances:
+            header += f" {('±' + str(tol)) if tol is not None else 'libre':>14}"
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Siembra por ritmo · lanes={lanes} · noise={opts['noise']}"))
+        self.stdout.write(header)
+
+        for n in sizes:
+            # Orden de siembra W2+: PEOR→MEJOR; los mejores tienden a ser más rápidos (con ruido)
+            entrants = [("athlete", i) for i in range(n)]
+            predicted = {
+                key: opts["base"] * (1.25 - 0.5 * i / n) * rng.lognormvariate(0, opts["noise"])
+                for i, key in enumerate(entrants)
+            }
+            current = sum(heat_durations(entrants, predicted, lanes))
+            line = f"{n:>5} {(n + lanes - 1) // lanes:>6} {_fmt(current):>8}"
+            for tol in tolerances:
+                t0 = time.perf_counter()
+                order = pace_grouping(entrants, predicted, lanes, tolerance=tol)
+                ms = (time.perf_counter() - t0) * 1000
+                total = sum(heat_durations(order, predicted, lanes))
+                line += f" {_fmt(total):>6} {100 * (total - current) / current:>+5.1f}%"
+                line += "" if ms < 1000 else f" ({ms:.0f} ms)"
+            self.stdout.write(line)
+
+        self.stdout.write(self.style.SUCCESS("✓ Benchmark terminado (duraciones previstas en mm:ss)."))
@@ -29,7 +29,7 @@ class Command(BaseCommand):
             raise CommandError(f"Event '{event_slug}' no existe.")
 
         try:
-            workout = Workout.objects.get(event=event, order=order)
+            workout = Workout.objects.select_related("event").get(event=event, order=order)
         except Workout.DoesNotExist:
             raise CommandError(f"WOD con order={order} para event '{event_slug}' no existe.")
 
@@ -42,7 +42,7 @@ class Command(BaseCommand):
         ranked, best_last = rank_participants(workout, division, parts)
         plan = plan_distribution(workout, division, ranked, best_last)
 
-        self.stdout.write(self.style.MIGRATE_HEADING(f"{event.name} · W{workout.order} {workout.title}"))
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{event.name} · W{workout.order} {workout.name}"))
         self.stdout.write(f"División: {division.name} · capacidad/heat: {plan.heat_capacity} · heats: {plan.needed_heats}")
         self.stdout.write(f"Modo: {'líderes → último heat' if plan.assign_best_to_last else 'fallback (WOD1 o single heat)'}\n")
 
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from compcore.apps.events.models import Event
+from compcore.apps.events.services.snapshots import brotli, publish_event, snapshot_root
+
+
+class Command(BaseCommand):
+    help = (
+        "Publica las snapshots estáticas (HTML/JSON + .gz/.br) de heats, resultados y leaderboard "
+        "bajo STATIC_ROOT/snapshots. Usar antes de activar PUBLIC_SNAPSHOTS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", dest="event_slug", default="", help="Slug del evento (por defecto: todos)")
+
+    def handle(self, *args, **opts):
+        events = Event.objects.all().order_by("id")
+        if opts["event_slug"]:
+            events = events.filter(slug=opts["event_slug"])
+            if not events.exists():
+                raise CommandError(f"Event '{opts['event_slug']}' no existe.")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"Snapshots → {snapshot_root()} · brotli={'sí' if brotli is not None else 'no instalado (solo .gz)'}"
+        ))
+        totals = {"written": 0, "unchanged": 0, "removed": 0, "skipped": 0}
+        for event in events:
+            stats = publish_event(event)
+            for key, value in stats.items():
+                totals[key] += value
+            self.stdout.write(
+                f"  {event.slug}: {stats['written']} escritas · {stats['unchanged']} sin cambios · "
+                f"{stats['removed']} borradas · {stats['skipped']} con error"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Snapshots: {totals['written']} escritas · {totals['unchanged']} sin cambios · "
+            f"{totals['removed']} borradas · {totals['skipped']} con error"
+        ))
@@ -0,0 +1,65 @@
+# compcore/apps/events/middleware.py
+"""
+Sirve las snapshots estáticas (services.snapshots) en las URLs públicas cuando
+settings.PUBLIC_SNAPSHOTS está activo: /heats/…, /results/… y /leaderboard/… se responden desde
+STATIC_ROOT/snapshots con WhiteNoise (gzip/brotli según Accept-Encoding, ETag, 304, Range),
+sin ejecutar la vista ni tocar la BD.
+
+Solo para visitantes anónimos (sin cookie de sesión ni mensajes), GET/HEAD y sin query string
+(los filtros del leaderboard y el cursor de la API siguen yendo a Django). Si la snapshot aún no
+existe, la petición sigue su curso normal.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .services.snapshots import INDEX_FILES, snapshot_root
+
+SNAPSHOT_PREFIXES = ("/heats/", "/results/", "/leaderboard/")
+
+
+def _vary_cookie(headers, path, url) -> None:
+    # La versión para usuarios logueados es otra: una caché compartida no debe mezclarlas
+    headers["Vary"] = "Cookie"
+
+
+class SnapshotMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "PUBLIC_SNAPSHOTS", False):
+            raise MiddlewareNotUsed
+        from whitenoise.base import WhiteNoise
+        from whitenoise.middleware import WhiteNoiseMiddleware
+
+        self.get_response = get_response
+        # autorefresh: los archivos cambian mientras corre el proceso (un stat por pedido, sin índice)
+        self.files = WhiteNoise(
+            None,
+            autorefresh=True,
+            max_age=getattr(settings, "PUBLIC_SNAPSHOTS_MAX_AGE", 5),
+            add_headers_function=_vary_cookie,
+        )
+        self.files.add_files(str(snapshot_root()), prefix="/")
+        self.serve = WhiteNoiseMiddleware.serve
+        # "messages": cookie de CookieStorage/FallbackStorage (mensajes flash pendientes)
+        self.skip_cookies = (settings.SESSION_COOKIE_NAME, "messages")
+
+    def _snapshot(self, request):
+        if request.method not in ("GET", "HEAD") or request.META.get("QUERY_STRING"):
+            return None
+        path = request.path_info
+        if not path.startswith(SNAPSHOT_PREFIXES) or not path.endswith("/"):
+            return None
+        if any(name in request.COOKIES for name in self.skip_cookies):
+            return None
+        for name in INDEX_FILES:
+            static_file = self.files.find_file(path + name)
+            if static_file is not None:
+                return static_file
+        return None
+
+    def __call__(self, request):
+        static_file = self._snapshot(request)
+        if static_file is None:
+            return self.get_response(request)
+        return self.serve(static_file, request)
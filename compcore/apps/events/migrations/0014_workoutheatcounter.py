@@ -0,0 +1,35 @@
+# Generated by Django 4.2.24 on 2026-10-17 04:02
+
+from django.db import migrations, models
+from django.db.models import Max
+import django.db.models.deletion
+
+
+def backfill_heat_counters(apps, schema_editor):
+    WorkoutHeat = apps.get_model('events', 'WorkoutHeat')
+    WorkoutHeatCounter = apps.get_model('events', 'WorkoutHeatCounter')
+    db = schema_editor.connection.alias
+
+    # Un contador por workout que ya tiene heats, arrancando en su máximo actual
+    rows = WorkoutHeat.objects.using(db).values('workout_id').annotate(m=Max('heat_number')).order_by()
+    WorkoutHeatCounter.objects.using(db).bulk_create(
+        [WorkoutHeatCounter(workout_id=r['workout_id'], last_number=r['m'] or 0) for r in rows]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_alter_division_options_alter_heatassignment_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkoutHeatCounter',
+            fields=[
+                ('workout', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='heat_counter', serialize=False, to='events.workout')),
+                ('last_number', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_heat_counters, migrations.RunPython.noop),
+    ]
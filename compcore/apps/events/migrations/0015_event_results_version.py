@@ -0,0 +1,23 @@
+# Generated by Django 4.2.24 on 2026-10-17 04:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0014_workoutheatcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='results_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='results_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-from django.db import models
+from django.db import models, transaction
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from django.db.models import Max
 
 
 class Event(models.Model):
@@ -37,6 +36,11 @@ class Event(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Sello de resultados: sube con cada escritura de HeatResult / WorkoutHeat / publicación de WODs.
+    # Las vistas públicas lo usan como ETag y clave de caché (services/results_version.py).
+    results_version = models.PositiveBigIntegerField(default=0, editable=False)
+    results_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     class Meta:
         ordering = ("-start_date", "name")
 
@@ -138,12 +142,52 @@ class WorkoutHeat(models.Model):
     def __str__(self) -> str:
         return f"{self.workout} · {self.division.name} · Heat {self.heat_number}"
 
+    def clean(self):
+        # Achicar el heat no puede dejar afuera lanes con resultados (las filas vacías se borran solas)
+        if self.pk and self.lane_count:
+            from compcore.apps.judging.models import HeatResult  # import local para evitar ciclos
+            from compcore.apps.judging.services.lanes import FILLED_LANE
+
+            lanes = list(
+                HeatResult.objects.filter(FILLED_LANE, heat_id=self.pk, lane__gt=self.lane_count)
+                .order_by("lane").values_list("lane", flat=True)
+            )
+            if lanes:
+                raise ValidationError(
+                    {"lane_count": f"Los lanes {', '.join(map(str, lanes))} ya tienen resultados."}
+                )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Número con el que se leyó el heat: si save() lo cambia, el contador debe enterarse
+        instance._loaded_heat_number = instance.__dict__.get("heat_number")
+        return instance
+
     def save(self, *args, **kwargs):
-        # Asignación automática: numeración global por workout
-        if not self.heat_number:
-            max_num = WorkoutHeat.objects.filter(workout=self.workout).aggregate(m=Max("heat_number"))["m"] or 0
-            self.heat_number = max_num + 1
-        super().save(*args, **kwargs)
+        # Asignación automática: numeración global por workout (contador con bloqueo, sin Max())
+        from .services.heat_numbers import note_heat_number, reserve_heat_numbers  # import local para evitar ciclos
+
+        with transaction.atomic():
+            if not self.heat_number:
+                start_base, _ = reserve_heat_numbers(self.workout_id, 1)
+                self.heat_number = start_base + 1
+            elif self._state.adding or self.heat_number != getattr(self, "_loaded_heat_number", None):
+                note_heat_number(self.workout_id, self.heat_number)
+            super().save(*args, **kwargs)
+        self._loaded_heat_number = self.heat_number
+
+
+class WorkoutHeatCounter(models.Model):
+    """
+    Último heat_number entregado por workout. La fila se bloquea al reservar, así dos admins
+    sembrando a la vez nunca reciben el mismo número (ver services/heat_numbers.py).
+    """
+    workout = models.OneToOneField(Workout, on_delete=models.CASCADE, primary_key=True, related_name="heat_counter")
+    last_number = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.workout} · último heat {self.last_number}"
 
 
 class HeatAssignment(models.Model):
@@ -0,0 +1,100 @@
+# compcore/apps/events/services/heat_numbers.py
+"""
+Asignación de heat_number por workout.
+
+Un contador por workout (WorkoutHeatCounter.last_number) reemplaza los Max() + exists()
+que se hacían en cada save/siembra. Reservar N números es UN solo UPDATE atómico:
+  • PostgreSQL: el UPDATE toma el lock de la fila hasta el commit.
+  • SQLite: el UPDATE toma el lock de escritura de la base hasta el commit.
+El valor nuevo se lee a continuación dentro de la misma transacción, con la fila ya bloqueada.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F, Max
+
+from ..models import WorkoutHeat, WorkoutHeatCounter
+
+
+# ------------------------------
+# Contador
+# ------------------------------
+def _bump(workout_id: int, count: int) -> Optional[int]:
+    """last_number += count; devuelve el nuevo valor o None si el contador aún no existe."""
+    if not WorkoutHeatCounter.objects.filter(pk=workout_id).update(last_number=F("last_number") + count):
+        return None
+    return WorkoutHeatCounter.objects.filter(pk=workout_id).values_list("last_number", flat=True).first()
+
+
+def _locked_last(workout_id: int) -> int:
+    """Bloquea el contador (creándolo desde el máximo actual la primera vez) y devuelve last_number."""
+    counter = WorkoutHeatCounter.objects.select_for_update().filter(pk=workout_id).first()
+    if counter is None:
+        current_max = WorkoutHeat.objects.filter(workout_id=workout_id).aggregate(m=Max("heat_number"))["m"] or 0
+        WorkoutHeatCounter.objects.get_or_create(workout_id=workout_id, defaults={"last_number": current_max})
+        counter = WorkoutHeatCounter.objects.select_for_update().get(pk=workout_id)
+    return counter.last_number
+
+
+def _rewind(last: int, freed: Iterable[int]) -> int:
+    """Si se liberaron los números del final, el contador retrocede (las re-siembras reutilizan numeración)."""
+    freed = set(freed)
+    while last in freed:
+        last -= 1
+    return last
+
+
+# ------------------------------
+# Entradas públicas de servicio
+# ------------------------------
+def reserve_heat_numbers(
+    workout_id: int,
+    count: int,
+    start_heat_number: Optional[int] = None,
+    freed: Iterable[int] = (),
+) -> Tuple[int, bool]:
+    """
+    Reserva `count` números consecutivos: devuelve (start_base, start_conflict) → usar start_base+1..
+    - Por defecto continúa desde el último número entregado (1 round trip).
+    - `freed`: números de heats YA borrados en esta transacción; si eran el final, se reutilizan.
+    - Si start_heat_number >= 1 y el rango está libre, comienza EXACTO ahí; si no, continúa al final.
+    Debe llamarse dentro de la transacción que crea los heats (el lock dura hasta el commit).
+    """
+    freed = list(freed)
+    with transaction.atomic():
+        if not freed and not start_heat_number:
+            last = _bump(workout_id, count)
+            if last is not None:
+                return last - count, False
+
+        last = _rewind(_locked_last(workout_id), freed)
+        start_base, conflict = last, False
+        if start_heat_number and start_heat_number >= 1:
+            rng = range(start_heat_number, start_heat_number + count)
+            if WorkoutHeat.objects.filter(workout_id=workout_id, heat_number__in=list(rng)).exists():
+                conflict = True  # ajustar al siguiente libre
+            else:
+                start_base = start_heat_number - 1  # aplicar exacto
+        WorkoutHeatCounter.objects.filter(pk=workout_id).update(last_number=max(last, start_base + count))
+    return start_base, conflict
+
+
+def release_heat_numbers(workout_id: int, freed: Iterable[int]) -> None:
+    """Tras borrar heats: si eran los últimos números, el contador retrocede."""
+    freed = list(freed)
+    if not freed:
+        return
+    with transaction.atomic():
+        last = _locked_last(workout_id)
+        new_last = _rewind(last, freed)
+        if new_last != last:
+            WorkoutHeatCounter.objects.filter(pk=workout_id).update(last_number=new_last)
+
+
+def note_heat_number(workout_id: int, heat_number: int) -> None:
+    """Heat creado con número manual: el contador nunca queda por debajo de él."""
+    qs = WorkoutHeatCounter.objects.filter(pk=workout_id, last_number__lt=heat_number)
+    if not qs.update(last_number=heat_number) and _locked_last(workout_id) < heat_number:
+        qs.update(last_number=heat_number)  # el contador se acaba de crear
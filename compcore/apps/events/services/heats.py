@@ -1,14 +1,16 @@
 # compcore/apps/events/services/heats.py
 from __future__ import annotations
 
-import math
-from typing import Any, Dict, List, Tuple, Optional
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Optional
 
 from django.db import transaction
-from django.db.models import Max
 
 # Import relativo correcto (desde services → events)
 from ..models import Event, Division, Workout, WorkoutHeat, HeatAssignment
+from .heat_numbers import release_heat_numbers, reserve_heat_numbers
+from .results_version import bump_results_version
+from .pacing import PACE_STRATEGY, RANK_STRATEGY, pace_grouping, predict_finish_times
 
 
 # ------------------------------
@@ -45,9 +47,100 @@ def _get_entrants_for_division(division: Division) -> List[Tuple[str, int]]:
     return [("athlete", a.pk) for a in qs]
 
 
+def _entrants_for_divisions(divisions: List[Division]) -> Dict[int, List[Tuple[str, int]]]:
+    """Como _get_entrants_for_division pero para muchas divisiones en 2 consultas."""
+    from compcore.apps.registration.models import Team, AthleteEntry  # import local para evitar ciclos
+
+    out: Dict[int, List[Tuple[str, int]]] = {d.id: [] for d in divisions}
+    team_divs = [d.id for d in divisions if getattr(d, "team_size", 1) and d.team_size > 1]
+    solo_divs = [d.id for d in divisions if d.id not in team_divs]
+    if team_divs:
+        for pk, division_id in Team.objects.filter(division_id__in=team_divs).order_by("id").values_list(
+            "id", "division_id"
+        ):
+            out[division_id].append(("team", pk))
+    if solo_divs:
+        for pk, division_id in AthleteEntry.objects.filter(
+            division_id__in=solo_divs, team__isnull=True
+        ).order_by("id").values_list("id", "division_id"):
+            out[division_id].append(("athlete", pk))
+    return out
+
+
 # -------------------------------------------
 # Crear heats y asignar (común W1/W2+)
 # -------------------------------------------
+def _bulk_create_heats(
+    workout: Workout,
+    division: Division,
+    start_base: int,
+    count: int,
+    lane_count: int,
+) -> List[WorkoutHeat]:
+    """
+    Crea `count` heats BORRADOR numerados start_base+1.. en una sola escritura.
+    """
+    heats = [
+        WorkoutHeat(
+            workout=workout,
+            division=division,
+            heat_number=start_base + i + 1,
+            lane_count=lane_count,
+            is_published=False,
+        )
+        for i in range(count)
+    ]
+    return _bulk_insert_heats(workout, heats)
+
+
+def _bulk_insert_heats(workout: Workout, heats: List[WorkoutHeat]) -> List[WorkoutHeat]:
+    """bulk_create de heats; si el backend no devuelve PKs, se recuperan con una consulta."""
+    from compcore.apps.judging.services.lanes import ensure_lane_rows  # import local para evitar ciclos
+
+    WorkoutHeat.objects.bulk_create(heats)
+    bump_results_version(workout.event_id)  # bulk_create no dispara señales
+    if any(h.pk is None for h in heats):
+        ids = dict(
+            WorkoutHeat.objects.filter(
+                workout=workout, heat_number__in=[h.heat_number for h in heats]
+            ).values_list("heat_number", "id")
+        )
+        for h in heats:
+            h.pk = ids[h.heat_number]
+    ensure_lane_rows(heats)  # lanes vacíos para el editor de resultados (ni señales ni GET los crean)
+    return heats
+
+
+def _resolve_start_base(
+    workout: Workout, needed_heats: int, start_heat_number: Optional[int], freed: Iterable[int] = ()
+) -> Tuple[int, bool]:
+    """
+    (start_base, start_conflict): los heats se numeran start_base+1..
+    - Por defecto continúa desde el último número entregado del workout.
+    - Si start_heat_number >= 1 y el rango está libre, comienza EXACTO ahí; si no, ajusta al final.
+    - `freed`: números de borradores recién eliminados (se reutilizan si eran los últimos).
+    Reserva atómica sobre el contador del workout (ver services/heat_numbers.py).
+    """
+    return reserve_heat_numbers(workout.id, needed_heats, start_heat_number, freed)
+
+
+def _new_assignment(heat: WorkoutHeat, entrant: Tuple[str, int], lane: int) -> HeatAssignment:
+    kind, pk = entrant
+    if kind == "team":
+        return HeatAssignment(heat=heat, team_id=pk, lane=lane, is_manual=False, locked=False)
+    return HeatAssignment(heat=heat, athlete_entry_id=pk, lane=lane, is_manual=False, locked=False)
+
+
+def _build_assignments(
+    heats: List[WorkoutHeat], entrants: List[Tuple[str, int]], lane_count: int
+) -> List[HeatAssignment]:
+    """Reparte entrants en orden: lanes 1..lane_count del primer heat, luego el siguiente, etc."""
+    return [
+        _new_assignment(heats[idx // lane_count], entrant, idx % lane_count + 1)
+        for idx, entrant in enumerate(entrants)
+    ]
+
+
 def _assign_to_heats(
     workout: Workout,
     division: Division,
@@ -67,15 +160,15 @@ def _assign_to_heats(
     if lane_count <= 0:
         lane_count = 8
 
-    touched = 0
-    assignments = 0
-
     with transaction.atomic():
         # Borrar borradores previos de esta división para este workout
-        WorkoutHeat.objects.filter(workout=workout, division=division, is_published=False).delete()
+        drafts = WorkoutHeat.objects.filter(workout=workout, division=division, is_published=False)
+        freed = list(drafts.values_list("heat_number", flat=True))
+        drafts.delete()
 
         total = len(entrants)
         if total == 0:
+            release_heat_numbers(workout.id, freed)
             return {
                 "heats_touched": 0,
                 "assignments": 0,
@@ -87,52 +180,17 @@ def _assign_to_heats(
 
         needed_heats = (total + lane_count - 1) // lane_count
 
-        current_max = WorkoutHeat.objects.filter(workout=workout).aggregate(m=Max("heat_number")).get("m") or 0
-        start_conflict = False
-        if start_heat_number and start_heat_number >= 1:
-            rng = range(start_heat_number, start_heat_number + needed_heats)
-            conflicts = WorkoutHeat.objects.filter(workout=workout, heat_number__in=list(rng)).exists()
-            if conflicts:
-                start_base = current_max  # ajustar al siguiente libre
-                start_conflict = True
-            else:
-                start_base = start_heat_number - 1  # aplicar exacto
-        else:
-            start_base = current_max  # comportamiento previo
-
-        created_heats: List[WorkoutHeat] = []
-        for i in range(needed_heats):
-            h = WorkoutHeat.objects.create(
-                workout=workout,
-                division=division,
-                heat_number=start_base + i + 1,
-                lane_count=lane_count,
-                is_published=False,
-            )
-            created_heats.append(h)
-            touched += 1
+        start_base, start_conflict = _resolve_start_base(workout, needed_heats, start_heat_number, freed)
+
+        # Heats y asignaciones se arman en memoria y se escriben con bulk_create
+        # (2-3 round trips en total, no uno por heat/participante).
+        created_heats = _bulk_create_heats(workout, division, start_base, needed_heats, lane_count)
+        touched = len(created_heats)
 
         # Asignar participantes lane por lane
-        heat_idx = 0
-        lane_cursor = 1
-        current_heat = created_heats[heat_idx]
-
-        for kind, pk in entrants:
-            if lane_cursor > lane_count:
-                heat_idx += 1
-                current_heat = created_heats[heat_idx]
-                lane_cursor = 1
-
-            if kind == "team":
-                HeatAssignment.objects.create(
-                    heat=current_heat, team_id=pk, lane=lane_cursor, is_manual=False, locked=False
-                )
-            else:
-                HeatAssignment.objects.create(
-                    heat=current_heat, athlete_entry_id=pk, lane=lane_cursor, is_manual=False, locked=False
-                )
-            assignments += 1
-            lane_cursor += 1
+        to_create = _build_assignments(created_heats, entrants, lane_count)
+        HeatAssignment.objects.bulk_create(to_create)
+        assignments = len(to_create)
 
     return {
         "heats_touched": touched,
@@ -144,126 +202,175 @@ def _assign_to_heats(
     }
 
 
-# ------------------------------------------------------
-# Ranking acumulado para W2+ (idéntico a tu ZIP original)
-# ------------------------------------------------------
-def _registered_participants_for_division(division: Division):
-    """Participantes “base” de la división (Team o AthleteEntry)."""
-    from compcore.apps.registration.models import Team, AthleteEntry
-    if getattr(division, "team_size", 1) and division.team_size > 1:
-        return list(Team.objects.filter(division=division))
-    return list(AthleteEntry.objects.filter(division=division, team__isnull=True))
-
-
-def _score_key(workout: Workout, result_obj: Any):
-    """Clave de ordenación según el tipo de scoring del workout."""
-    scoring = getattr(workout, "scoring", "").upper()
-    if scoring == "TIME":
-        return (
-            int(getattr(result_obj, "time_seconds", 10**9) or 10**9),
-            int(getattr(result_obj, "tiebreak_seconds", 10**9) or 10**9),
-            int(getattr(result_obj, "penalties", 10**9) or 10**9),
-        )
-    elif scoring == "REPS":
-        return (
-            -(int(getattr(result_obj, "reps", 0) or 0)),
-            int(getattr(result_obj, "penalties", 10**9) or 10**9),
-        )
-    elif scoring == "WEIGHT":
-        return (
-            -(int(getattr(result_obj, "weight_kg", 0) or 0)),
-            int(getattr(result_obj, "penalties", 10**9) or 10**9),
-        )
-    elif scoring == "POINTS":
-        return (
-            -(int(getattr(result_obj, "points", 0) or 0)),
-            int(getattr(result_obj, "penalties", 10**9) or 10**9),
+# -------------------------------------------
+# Re-siembra incremental (diff) que respeta lanes bloqueados/manuales
+# -------------------------------------------
+def _reseed_diff(
+    workout: Workout,
+    division: Division,
+    entrants: List[Tuple[str, int]],
+    lane_count: int,
+    start_heat_number: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Calcula el plan objetivo en memoria y lo compara contra los heats BORRADOR actuales:
+    - Asignaciones locked o is_manual NO se tocan; su (heat, lane) queda reservado.
+    - Solo se escriben los INSERT/UPDATE/DELETE necesarios (re-siembra idéntica = 0 escrituras).
+    - Se reutilizan los heats borrador existentes (en orden de heat_number); los que falten se
+      crean después del máximo del workout y los que sobren (vacíos) se eliminan.
+    Heats publicados no se consideran (igual que _assign_to_heats).
+    """
+    if lane_count <= 0:
+        lane_count = 8
+
+    with transaction.atomic():
+        heats = list(
+            WorkoutHeat.objects.select_for_update()
+            .filter(workout=workout, division=division, is_published=False)
+            .order_by("heat_number")
         )
-    return (10**9,)
+        heat_index = {h.pk: i for i, h in enumerate(heats)}
+
+        reserved = set()          # (heat_idx, lane) ocupados por locked/manual
+        pinned = set()            # participantes que no se mueven
+        auto_current: Dict[Tuple[str, int], Tuple[int, int, Optional[int]]] = {}
+        to_delete: List[int] = []
+        for pk, heat_id, lane, team_id, entry_id, is_manual, locked in HeatAssignment.objects.filter(
+            heat__in=heats
+        ).values_list("id", "heat_id", "lane", "team_id", "athlete_entry_id", "is_manual", "locked"):
+            key = ("team", team_id) if team_id else (("athlete", entry_id) if entry_id else None)
+            if is_manual or locked:
+                reserved.add((heat_index[heat_id], lane))
+                if key is not None:
+                    pinned.add(key)
+            elif key is None or key in auto_current:
+                to_delete.append(pk)  # filas huérfanas o duplicadas
+            else:
+                auto_current[key] = (pk, heat_id, lane)
 
+        # Plan objetivo: huecos libres en orden heat→lane, saltando los reservados
+        targets: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        hi, lane = 0, 1
+        for key in entrants:
+            if key in pinned or key in targets:
+                continue
+            while (hi, lane) in reserved:
+                lane += 1
+                if lane > lane_count:
+                    hi, lane = hi + 1, 1
+            targets[key] = (hi, lane)
+            lane += 1
+            if lane > lane_count:
+                hi, lane = hi + 1, 1
+
+        used = [i for i, _ in targets.values()] + [i for i, _ in reserved]
+        needed = (max(used) + 1) if used else 0
+
+        # Heats: reutilizar, crear faltantes, ajustar lane_count
+        start_conflict = False
+        created: List[WorkoutHeat] = []
+        if needed > len(heats):
+            missing = needed - len(heats)
+            if heats:
+                start_base, _ = _resolve_start_base(workout, missing, None)
+            else:
+                start_base, start_conflict = _resolve_start_base(workout, missing, start_heat_number)
+            created = _bulk_create_heats(workout, division, start_base, missing, lane_count)
+        all_heats = heats + created
+
+        resized = [h for h in all_heats[:needed] if h.lane_count != lane_count]
+        for h in resized:
+            h.lane_count = lane_count
+        if resized:
+            from compcore.apps.judging.services.lanes import ensure_lane_rows, trim_lane_rows  # evita ciclos
+
+            WorkoutHeat.objects.bulk_update(resized, ["lane_count"])
+            trim_lane_rows(resized)  # LaneShrinkError (y rollback) si un lane sobrante tiene resultado
+            ensure_lane_rows(resized)
+            bump_results_version(workout.event_id)
+
+        # Diff de asignaciones automáticas
+        to_insert: List[HeatAssignment] = []
+        to_update: List[HeatAssignment] = []
+        for key, (i, ln) in targets.items():
+            heat = all_heats[i]
+            current = auto_current.pop(key, None)
+            if current is None:
+                to_insert.append(_new_assignment(heat, key, ln))
+            elif current[1] != heat.pk or current[2] != ln:
+                to_update.append(HeatAssignment(pk=current[0], heat_id=heat.pk, lane=ln))
+        to_delete.extend(pk for pk, _heat_id, _lane in auto_current.values())
+
+        if to_update:
+            HeatAssignment.objects.bulk_update(to_update, ["heat", "lane"])
+        if to_insert:
+            HeatAssignment.objects.bulk_create(to_insert)
+        if to_delete:
+            HeatAssignment.objects.filter(pk__in=to_delete).delete()
+
+        surplus = [h.pk for h in all_heats[needed:]]
+        if surplus:
+            WorkoutHeat.objects.filter(pk__in=surplus).delete()
+            release_heat_numbers(workout.id, [h.heat_number for h in all_heats[needed:]])
 
-def _ranking_for_division(workout: Workout, division: Division) -> List[Tuple[str, int]]:
+    return {
+        "heats_touched": len(created) + len(resized) + len(surplus),
+        "assignments": len(targets) + len(reserved),
+        "lane_count_used": lane_count,
+        "start_requested": start_heat_number,
+        "start_applied": all_heats[0].heat_number if needed else None,
+        "start_conflict": start_conflict,
+        "inserted": len(to_insert),
+        "updated": len(to_update),
+        "deleted": len(to_delete),
+        "kept_pinned": len(reserved),
+        "heats_created": len(created),
+        "heats_deleted": len(surplus),
+    }
+
+
+# ------------------------------------------------------
+# Ranking acumulado para W2+ (núcleo compartido con el leaderboard)
+# ------------------------------------------------------
+def _ranking_for_divisions(workout: Workout, divisions: List[Division]) -> Dict[int, List[Tuple[str, int]]]:
     """
-    Devuelve [('team'|'athlete', pk)] en orden PEOR→MEJOR usando puntaje acumulado.
+    {division_id: [('team'|'athlete', pk)]} en orden PEOR→MEJOR usando puntaje acumulado,
+    para TODAS las divisiones pedidas en un único pase (pocas consultas, sin importar cuántas).
     - Calcula puntos solo con workouts PUBLICADOS del mismo evento con order < actual.
-    - 1º = 100; decremento step=ceil(100/N); piso 2 puntos.
-    - Desempate: índice del último workout (peor primero) y luego nombre.
-
-    🔧 Ajuste pedido: contar resultados de heats aunque NO estén publicados.
-      → Se mantiene el filtro de workouts publicados,
-        pero ya NO se exige is_published en los heats previos.
+    - 1º = 100; decremento step=ceil(100/N); piso 2 puntos (misma regla que el leaderboard).
+    - Cuenta resultados de heats aunque NO estén publicados.
     """
-    from compcore.apps.judging.models import HeatResult
-    from compcore.apps.registration.models import Team, AthleteEntry
-
-    participants = _registered_participants_for_division(division)
-    N = len(participants)
-    if N == 0:
-        return []
+    from compcore.apps.leaderboard.services.ranking import rank_event, seeding_order  # import local para evitar ciclos
 
     prev_workouts = list(
         Workout.objects.filter(event=workout.event, is_published=True, order__lt=workout.order).order_by("order")
     )
+    ranking = rank_event(workout.event, prev_workouts, divisions)
+    return {d.id: seeding_order(ranking, d.id, prev_workouts) for d in divisions}
 
-    heats_by_wod: Dict[int, List[int]] = {}
-    for w in prev_workouts:
-        # 🔧 AQUÍ EL CAMBIO: quitamos is_published=True en heats previos
-        heats_by_wod[w.id] = list(
-            WorkoutHeat.objects.filter(workout=w, division=division).values_list("id", flat=True)
-        )
-
-    total_points: Dict[Any, int] = {}
-    last_ranking_index: Dict[Any, int] = {}
 
-    for w in prev_workouts:
-        heat_ids = heats_by_wod.get(w.id, [])
-        if not heat_ids:
-            continue
-
-        results = list(HeatResult.objects.filter(heat_id__in=heat_ids).select_related("team", "athlete_entry"))
-        if not results:
-            continue
+def _ranking_for_division(workout: Workout, division: Division) -> List[Tuple[str, int]]:
+    """Compat: ranking PEOR→MEJOR de una sola división."""
+    return _ranking_for_divisions(workout, [division])[division.id]
 
-        ordered = sorted(results, key=lambda r: _score_key(w, r))
-        step = math.ceil(100 / N) if N > 0 else 0
 
-        by_entity: Dict[Any, int] = {}
-        for idx, r in enumerate(ordered):
-            ent = r.team or r.athlete_entry
-            if not ent:
-                continue
-            pts = 100 - idx * step
-            if pts < 2:
-                pts = 2
-            by_entity[ent] = int(pts)
-
-        for ent, pts in by_entity.items():
-            total_points[ent] = total_points.get(ent, 0) + int(pts)
-
-        # índice de desempate: peor primero en el último workout
-        for idx, r in enumerate(reversed(ordered)):
-            ent = r.team or r.athlete_entry
-            if ent is not None:
-                last_ranking_index[ent] = idx
-
-    enriched: List[Tuple[str, int, int, int, str]] = []
-    for ent in participants:
-        total = total_points.get(ent, 0)
-        last_idx = last_ranking_index.get(ent, -1)
-
-        if isinstance(ent, Team):
-            nm = getattr(ent, "name", "") or ""
-            enriched.append(("team", ent.pk, total, last_idx, nm))
-        else:
-            nm = ""
-            if hasattr(ent, "athlete") and getattr(ent.athlete, "full_name", None):
-                nm = ent.athlete.full_name or ""
-            if not nm:
-                nm = str(getattr(ent, "id", ""))
-            enriched.append(("athlete", ent.pk, total, last_idx, nm))
-
-    enriched.sort(key=lambda x: (x[2], -x[3], x[4]))  # total asc, peor últimoW primero, nombre asc
-    return [(kind, pk) for (kind, pk, _total, _last_idx, _name) in enriched]
+def _pace_order(
+    workout: Workout,
+    entrants_by_div: Dict[int, List[Tuple[str, int]]],
+    lane_by_div: Dict[int, int],
+    tolerance: Optional[int],
+) -> Dict[int, List[Tuple[str, int]]]:
+    """
+    Estrategia "pace": reagrupa por tiempo previsto (ver services/pacing.py).
+    Solo aplica a WODs TIME; en otros scoring la duración del heat no depende del más lento.
+    """
+    if workout.scoring != "TIME":
+        return entrants_by_div
+    predicted = predict_finish_times(workout, list(entrants_by_div))
+    return {
+        division_id: pace_grouping(entrants, predicted.get(division_id, {}), lane_by_div[division_id], tolerance)
+        for division_id, entrants in entrants_by_div.items()
+    }
 
 
 # ------------------------------
@@ -274,12 +381,14 @@ def propose_heats_for_division(
     division_id: int,
     default_lane_count: int = 0,
     start_heat_number: Optional[int] = None,
+    diff: bool = False,
 ) -> Dict[str, Any]:
     workout = Workout.objects.select_related("event").get(pk=workout_id)
     division = Division.objects.select_related("event").get(pk=division_id)
     lane_count = _resolve_lane_capacity(workout.event, division, default_lane_count)
     entrants = _get_entrants_for_division(division)
-    return _assign_to_heats(workout, division, entrants, lane_count, start_heat_number=start_heat_number)
+    assign = _reseed_diff if diff else _assign_to_heats
+    return assign(workout, division, entrants, lane_count, start_heat_number=start_heat_number)
 
 
 def seed_heats_from_ranking_for_division(
@@ -287,9 +396,271 @@ def seed_heats_from_ranking_for_division(
     division_id: int,
     default_lane_count: int = 0,
     start_heat_number: Optional[int] = None,
+    diff: bool = False,
+    strategy: str = RANK_STRATEGY,
+    pace_tolerance: Optional[int] = 1,
 ) -> Dict[str, Any]:
     workout = Workout.objects.select_related("event").get(pk=workout_id)
     division = Division.objects.select_related("event").get(pk=division_id)
     lane_count = _resolve_lane_capacity(workout.event, division, default_lane_count)
     entrants = _ranking_for_division(workout, division)
-    return _assign_to_heats(workout, division, entrants, lane_count, start_heat_number=start_heat_number)
\ No newline at end of file
+    if strategy == PACE_STRATEGY:
+        entrants = _pace_order(workout, {division.id: entrants}, {division.id: lane_count}, pace_tolerance)[division.id]
+    assign = _reseed_diff if diff else _assign_to_heats
+    return assign(workout, division, entrants, lane_count, start_heat_number=start_heat_number)
+
+
+def seed_all_divisions_for_workout(
+    workout_id: int,
+    mode: str = "W2P",
+    default_lane_count: int = 0,
+    start_heat_number: Optional[int] = None,
+    progress: Optional[Callable[[Division, Dict[str, Any]], None]] = None,
+    strategy: str = RANK_STRATEGY,
+    pace_tolerance: Optional[int] = 1,
+) -> Dict[str, Any]:
+    """
+    Siembra TODAS las divisiones de un workout en una sola transacción.
+    - mode="W1": orden de registro; cualquier otro valor: ranking acumulado W2+ (un único pase).
+    - Numeración contigua para todo el workout: una sola reserva de numeración y un bulk_create
+      de heats + uno de asignaciones (en orden de división por nombre).
+    - `progress(division, resumen)` se llama por división (mensajes del admin / jobs).
+    - strategy="pace" (solo W2+ en WODs TIME): reagrupa por tiempo previsto, ±pace_tolerance heats.
+    """
+    workout = Workout.objects.select_related("event").get(pk=workout_id)
+    divisions = list(Division.objects.filter(event=workout.event).order_by("name", "id"))
+    for d in divisions:
+        d.event = workout.event  # evita un lookup por división en _resolve_lane_capacity
+
+    if mode == "W1":
+        entrants_by_div = _entrants_for_divisions(divisions)
+    else:
+        entrants_by_div = _ranking_for_divisions(workout, divisions)
+    lane_by_div = {d.id: _resolve_lane_capacity(workout.event, d, default_lane_count) for d in divisions}
+    if mode != "W1" and strategy == PACE_STRATEGY:
+        entrants_by_div = _pace_order(workout, entrants_by_div, lane_by_div, pace_tolerance)
+
+    plan: List[Tuple[Division, List[Tuple[str, int]], int, int]] = []
+    needed_total = 0
+    for d in divisions:
+        entrants = entrants_by_div.get(d.id, [])
+        lane_count = lane_by_div[d.id]
+        needed = (len(entrants) + lane_count - 1) // lane_count
+        plan.append((d, entrants, lane_count, needed))
+        needed_total += needed
+
+    per_division: List[Dict[str, Any]] = []
+    with transaction.atomic():
+        drafts = WorkoutHeat.objects.filter(workout=workout, division__in=divisions, is_published=False)
+        freed = list(drafts.values_list("heat_number", flat=True))
+        drafts.delete()
+
+        start_base, start_conflict = _resolve_start_base(workout, needed_total, start_heat_number, freed)
+
+        heats: List[WorkoutHeat] = []
+        cursor = start_base
+        for d, entrants, lane_count, needed in plan:
+            for i in range(needed):
+                heats.append(
+                    WorkoutHeat(
+                        workout=workout,
+                        division=d,
+                        heat_number=cursor + i + 1,
+                        lane_count=lane_count,
+                        is_published=False,
+                    )
+                )
+            cursor += needed
+        _bulk_insert_heats(workout, heats)
+
+        assignments: List[HeatAssignment] = []
+        offset = 0
+        for d, entrants, lane_count, needed in plan:
+            div_heats = heats[offset:offset + needed]
+            offset += needed
+            assignments.extend(_build_assignments(div_heats, entrants, lane_count))
+            summary = {
+                "division_id": d.id,
+                "division_name": d.name,
+                "heats_touched": needed,
+                "assignments": len(entrants),
+                "lane_count_used": lane_count,
+                "first_heat": div_heats[0].heat_number if div_heats else None,
+                "last_heat": div_heats[-1].heat_number if div_heats else None,
+            }
+            per_division.append(summary)
+            if progress is not None:
+                progress(d, summary)
+        HeatAssignment.objects.bulk_create(assignments)
+
+    return {
+        "divisions": per_division,
+        "heats_touched": len(heats),
+        "assignments": len(assignments),
+        "start_requested": start_heat_number,
+        "start_applied": (start_base + 1) if heats else None,
+        "start_conflict": start_conflict,
+    }
+
+
+# ------------------------------------------------------
+# Plan de distribución en memoria (vista previa → aplicar)
+# ------------------------------------------------------
+@dataclass(frozen=True)
+class RankedParticipant:
+    key: Tuple[str, int]        # ('team'|'athlete', pk)
+    display: str
+    points_prev: float = 0.0    # puntos acumulados hasta el WOD anterior
+
+
+@dataclass(frozen=True)
+class HeatPlan:
+    """
+    Propuesta inmutable de distribución para un (workout, division).
+    `ranked` va MEJOR→PEOR (u orden de registro en fallback); `heat_of` / `lane_of` son arreglos
+    paralelos a `ranked` con el heat relativo (1..needed_heats) y el carril de cada participante.
+    No guarda instancias de modelo: se puede comparar, serializar y descartar sin tocar la BD.
+    """
+    workout_id: int
+    division_id: int
+    heat_capacity: int
+    needed_heats: int
+    assign_best_to_last: bool
+    ranked: Tuple[RankedParticipant, ...]
+    heat_of: Tuple[int, ...]
+    lane_of: Tuple[int, ...]
+
+    def _seat_order(self) -> List[int]:
+        return sorted(range(len(self.ranked)), key=lambda i: (self.heat_of[i], self.lane_of[i]))
+
+    @property
+    def distribution(self) -> Dict[int, List[RankedParticipant]]:
+        """{heat relativo: [participantes por carril]}."""
+        out: Dict[int, List[RankedParticipant]] = {h: [] for h in range(1, self.needed_heats + 1)}
+        for idx in self._seat_order():
+            out[self.heat_of[idx]].append(self.ranked[idx])
+        return out
+
+    def seeding_order(self) -> List[Tuple[str, int]]:
+        """Participantes en orden heat→lane (lo que consumen _reseed_diff / _assign_to_heats)."""
+        return [self.ranked[i].key for i in self._seat_order()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representación JSON-serializable (vista previa en admin / API)."""
+        heats: Dict[int, List[Dict[str, Any]]] = {h: [] for h in range(1, self.needed_heats + 1)}
+        for idx in self._seat_order():
+            rp = self.ranked[idx]
+            heats[self.heat_of[idx]].append({
+                "lane": self.lane_of[idx],
+                "kind": rp.key[0],
+                "id": rp.key[1],
+                "display": rp.display,
+                "points_prev": rp.points_prev,
+            })
+        return {
+            "workout_id": self.workout_id,
+            "division_id": self.division_id,
+            "heat_capacity": self.heat_capacity,
+            "needed_heats": self.needed_heats,
+            "assign_best_to_last": self.assign_best_to_last,
+            "heats": [{"heat": h, "lanes": lanes} for h, lanes in heats.items()],
+        }
+
+
+def participants_for_division(event: Event, division: Division) -> List[RankedParticipant]:
+    """Participantes de la división en orden de registro (1 consulta), con nombre para mostrar."""
+    from compcore.apps.registration.models import Team, AthleteEntry  # import local para evitar ciclos
+
+    if getattr(division, "team_size", 1) and division.team_size > 1:
+        rows = Team.objects.filter(division=division).order_by("id").values_list("id", "name")
+        return [RankedParticipant(("team", pk), name or "—") for pk, name in rows]
+
+    rows = AthleteEntry.objects.filter(division=division, team__isnull=True).order_by("id").values_list(
+        "id", "user__username"
+    )
+    return [RankedParticipant(("athlete", pk), username or "—") for pk, username in rows]
+
+
+def rank_participants(
+    workout: Workout, division: Division, parts: List[RankedParticipant]
+) -> Tuple[List[RankedParticipant], bool]:
+    """
+    (ranked MEJOR→PEOR, best_last).
+    - Sin WODs publicados previos (W1): orden de registro y best_last=False.
+    - W2+: mismo ranking acumulado que _ranking_for_divisions, con points_prev cargado.
+    """
+    from compcore.apps.leaderboard.services.ranking import division_totals, rank_event, seeding_order
+
+    prev_workouts = list(
+        Workout.objects.filter(event_id=workout.event_id, is_published=True, order__lt=workout.order).order_by("order")
+    )
+    if not prev_workouts:
+        return list(parts), False
+
+    ranking = rank_event(workout.event, prev_workouts, [division])
+    totals = {row.key: row.total for row in division_totals(ranking, division.id, prev_workouts)}
+    position = {key: i for i, key in enumerate(reversed(seeding_order(ranking, division.id, prev_workouts)))}
+
+    last = len(position)
+    ordered = sorted(parts, key=lambda rp: position.get(rp.key, last))
+    return [replace(rp, points_prev=float(totals.get(rp.key, 0))) for rp in ordered], True
+
+
+def plan_distribution(
+    workout: Workout,
+    division: Division,
+    ranked: List[RankedParticipant],
+    best_last: bool,
+    lane_count: Optional[int] = None,
+) -> HeatPlan:
+    """
+    Arma el plan SIN escribir en BD (se puede llamar con varios lane_count para comparar).
+    - best_last y más de un heat: se siembra PEOR→MEJOR, los líderes quedan en el último heat.
+    - Si no: orden de `ranked` tal cual (registro en W1) llenando lanes 1..N de cada heat.
+    """
+    capacity = _resolve_lane_capacity(workout.event, division, lane_count)
+    total = len(ranked)
+    needed = (total + capacity - 1) // capacity
+    best_to_last = bool(best_last and needed > 1)
+
+    seq = list(range(total - 1, -1, -1)) if best_to_last else list(range(total))
+    heat_of = [0] * total
+    lane_of = [0] * total
+    for pos, idx in enumerate(seq):
+        heat_of[idx] = pos // capacity + 1
+        lane_of[idx] = pos % capacity + 1
+
+    return HeatPlan(
+        workout_id=workout.id,
+        division_id=division.id,
+        heat_capacity=capacity,
+        needed_heats=needed,
+        assign_best_to_last=best_to_last,
+        ranked=tuple(ranked),
+        heat_of=tuple(heat_of),
+        lane_of=tuple(lane_of),
+    )
+
+
+def clear_auto_assignments(workout: Workout, division: Division) -> int:
+    """Borra asignaciones automáticas de heats BORRADOR; locked/manuales se conservan."""
+    deleted, _ = HeatAssignment.objects.filter(
+        heat__workout=workout,
+        heat__division=division,
+        heat__is_published=False,
+        is_manual=False,
+        locked=False,
+    ).delete()
+    return deleted
+
+
+def apply_plan(plan: HeatPlan, start_heat_number: Optional[int] = None) -> int:
+    """
+    Escribe el plan elegido en bloque (vía _reseed_diff): reutiliza heats borrador, respeta
+    asignaciones locked/manuales (sus carriles se saltan) y devuelve cuántas asignaciones
+    automáticas se crearon o movieron.
+    """
+    workout = Workout.objects.select_related("event").get(pk=plan.workout_id)
+    division = Division.objects.get(pk=plan.division_id)
+    res = _reseed_diff(workout, division, plan.seeding_order(), plan.heat_capacity, start_heat_number)
+    return res["inserted"] + res["updated"]
\ No newline at end of file
@@ -0,0 +1,171 @@
+# compcore/apps/events/services/pacing.py
+"""
+Siembra por ritmo para WODs TIME.
+
+En un heat TIME el piso queda ocupado hasta que termina el más lento, así que la duración
+total de una división ≈ Σ max(tiempo previsto) por heat. Acá:
+  • se predice el tiempo de cada participante a partir de sus WODs TIME anteriores
+    (ritmo relativo a la mediana de cada WOD, así WODs largos y cortos pesan igual);
+  • se reagrupan los heats para bajar esa suma, permitiendo que cada participante se mueva
+    como mucho `tolerance` heats respecto del heat que le tocaría por ranking.
+El resultado es la MISMA lista de entrants reordenada (heat por heat), así que
+_assign_to_heats / _reseed_diff la consumen sin cambios.
+"""
+from __future__ import annotations
+
+from statistics import median
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..models import Workout
+
+EntrantKey = Tuple[str, int]
+
+RANK_STRATEGY = "rank"
+PACE_STRATEGY = "pace"
+
+
+# ------------------------------
+# Predicción
+# ------------------------------
+def predict_from_rows(rows: Iterable) -> Dict[EntrantKey, float]:
+    """
+    Filas con (workout_id, team_id, athlete_entry_id, time_seconds) → {entrant: segundos previstos}.
+    Previsto = ritmo relativo promedio × mediana de las medianas de cada WOD.
+    """
+    times_by_workout: Dict[int, Dict[EntrantKey, int]] = {}
+    for r in rows:
+        if not r.time_seconds:
+            continue
+        key = ("team", r.team_id) if r.team_id else (("athlete", r.athlete_entry_id) if r.athlete_entry_id else None)
+        if key is None:
+            continue
+        times_by_workout.setdefault(r.workout_id, {})[key] = r.time_seconds
+
+    ratios: Dict[EntrantKey, List[float]] = {}
+    medians: List[float] = []
+    for times in times_by_workout.values():
+        mid = median(times.values())
+        if not mid:
+            continue
+        medians.append(mid)
+        for key, t in times.items():
+            ratios.setdefault(key, []).append(t / mid)
+
+    if not medians:
+        return {}
+    base = median(medians)
+    return {key: base * sum(vals) / len(vals) for key, vals in ratios.items()}
+
+
+def predict_finish_times(workout: Workout, division_ids: Sequence[int]) -> Dict[int, Dict[EntrantKey, float]]:
+    """
+    {division_id: {entrant: segundos}} con los WODs TIME anteriores y PUBLICADOS del evento (mismo
+    criterio que el ranking de siembra), en UNA consulta.
+    """
+    from compcore.apps.leaderboard.services.ranking import load_results  # import local para evitar ciclos
+
+    out: Dict[int, Dict[EntrantKey, float]] = {d: {} for d in division_ids}
+    prev_ids = list(
+        Workout.objects.filter(
+            event_id=workout.event_id, scoring="TIME", is_published=True, order__lt=workout.order
+        ).values_list("id", flat=True)
+    )
+    if not prev_ids or not division_ids:
+        return out
+
+    rows_by_div: Dict[int, list] = {}
+    for r in load_results(prev_ids, division_ids):
+        rows_by_div.setdefault(r.division_id, []).append(r)
+    for division_id, rows in rows_by_div.items():
+        out[division_id] = predict_from_rows(rows)
+    return out
+
+
+# ------------------------------
+# Agrupación
+# ------------------------------
+def heat_durations(
+    entrants: Sequence[EntrantKey], predicted: Dict[EntrantKey, float], lane_count: int
+) -> List[float]:
+    """Duración prevista de cada heat (el más lento manda) si se llenan lanes en este orden."""
+    default = median(predicted.values()) if predicted else 0.0
+    return [
+        max(predicted.get(key, default) for key in entrants[i:i + lane_count])
+        for i in range(0, len(entrants), lane_count)
+    ]
+
+
+def pace_grouping(
+    entrants: Sequence[EntrantKey],
+    predicted: Dict[EntrantKey, float],
+    lane_count: int,
+    tolerance: Optional[int] = 1,
+) -> List[EntrantKey]:
+    """
+    Reordena `entrants` (orden de siembra actual) para minimizar Σ max por heat.
+    - Cada heat conserva su tamaño; cada participante queda a ≤ tolerance heats de su heat original.
+    - tolerance=None: sin restricción (orden por tiempo previsto, óptimo).
+    - Sin predicciones: devuelve el orden original.
+    Dentro de cada heat se respeta el orden original (lanes).
+    Participantes sin historial usan la mediana de la división.
+    """
+    entrants = list(entrants)
+    if lane_count <= 0 or not predicted or len(entrants) <= lane_count or tolerance == 0:
+        return entrants
+
+    default = median(predicted.values())
+    t = {key: predicted.get(key, default) for key in entrants}
+    position = {key: i for i, key in enumerate(entrants)}
+    band = {key: i // lane_count for i, key in enumerate(entrants)}
+    heats: List[List[EntrantKey]] = [entrants[i:i + lane_count] for i in range(0, len(entrants), lane_count)]
+
+    if tolerance is None:
+        # Óptimo sin restricción: bloques contiguos por tiempo; el heat incompleto se queda con los más rápidos
+        by_time = sorted(entrants, key=lambda k: (-t[k], position[k]))
+        sizes = sorted((len(h) for h in heats), reverse=True)
+        groups, start = [], 0
+        for size in sizes:
+            groups.append(by_time[start:start + size])
+            start += size
+        # Heats completos en orden de ranking promedio (los líderes siguen al final); el incompleto
+        # queda último como en la siembra original: quien consume la lista la corta cada lane_count.
+        full = sorted((g for g in groups if len(g) == lane_count), key=lambda g: sum(position[k] for k in g) / len(g))
+        groups = full + [g for g in groups if len(g) < lane_count]
+        if [len(g) for g in groups] != [len(h) for h in heats]:
+            return entrants  # nunca cambiar el tamaño de un heat: ante la duda, la siembra original
+        return [key for g in groups for key in sorted(g, key=position.__getitem__)]
+
+    # Búsqueda local: intercambiar el más lento de un heat por uno más rápido de otro heat
+    # compatible, mientras baje la suma de máximos y ambos sigan dentro de su tolerancia.
+    def heat_max(members: List[EntrantKey], without: Optional[EntrantKey] = None) -> float:
+        return max((t[k] for k in members if k != without), default=0.0)
+
+    max_passes = 4 * len(heats)
+    for _ in range(max_passes):
+        improved = False
+        for a, heat_a in enumerate(heats):
+            x = max(heat_a, key=lambda k: (t[k], position[k]))
+            rest_a = heat_max(heat_a, without=x)
+            cur_a = t[x]
+            best = None
+            lo, hi = max(0, band[x] - tolerance), min(len(heats) - 1, band[x] + tolerance)
+            for b in range(lo, hi + 1):
+                if b == a:
+                    continue
+                heat_b = heats[b]
+                cur_b = heat_max(heat_b)
+                for y in heat_b:
+                    if t[y] >= t[x] or abs(a - band[y]) > tolerance:
+                        continue
+                    delta = max(rest_a, t[y]) + max(heat_max(heat_b, without=y), t[x]) - cur_a - cur_b
+                    if delta < -1e-9 and (best is None or delta < best[0]):
+                        best = (delta, b, y)
+            if best is not None:
+                _, b, y = best
+                heat_a[heat_a.index(x)] = y
+                heats[b][heats[b].index(y)] = x
+                improved = True
+        if not improved:
+            break
+
+    return [key for heat in heats for key in sorted(heat, key=position.__getitem__)]
@@ -0,0 +1,133 @@
+# compcore/apps/events/services/results_version.py
+"""
+Versión de resultados por evento (Event.results_version).
+
+- bump_results_version(): se llama desde señales (guardado de HeatResult; guardado/borrado de
+  WorkoutHeat y Workout; edición de Division) y desde los servicios que escriben en bloque
+  (siembra, standings). Se aplica al COMMIT y una sola vez por evento y transacción: borrar
+  100 heats en una siembra es un único UPDATE.
+- claim_results_version(): variante inmediata para quien escribe standings: sube la versión DENTRO de
+  la transacción (la fila del evento queda bloqueada hasta el commit) y devuelve el número, así las
+  filas pueden marcarse con la versión exacta en la que cambian (API `since=`).
+- results_stamp(): una consulta mínima por slug (version, updated_at) para ETag / Last-Modified.
+- results_changed: señal enviada tras aplicar el bump (ya confirmado), con event_id y refs (los
+  ("heat"|"workout", id) afectados, o None si el cambio abarca todo el evento); el stream SSE del
+  leaderboard la usa para despertar a los canales del evento y las snapshots para re-publicar solo
+  las páginas afectadas.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Event, Workout, WorkoutHeat
+
+results_changed = Signal()
+
+
+def _apply_bump(event_id: int, notify: bool = True, refs: Optional[FrozenSet[Tuple[str, int]]] = None) -> None:
+    Event.objects.filter(pk=event_id).update(
+        results_version=F("results_version") + 1, results_updated_at=timezone.now()
+    )
+    if notify:
+        results_changed.send(sender=Event, event_id=event_id, refs=refs)
+
+
+def _registry() -> Optional[Dict[int, Callable]]:
+    """
+    Bumps programados en la transacción actual, por evento (None fuera de una transacción).
+    Se guardan en la conexión junto a la lista de hooks de on_commit vigente: Django la reemplaza al
+    ejecutarlos (commit) o al descartarlos (rollback, también de un savepoint), así un registro de una
+    transacción anterior nunca absorbe bumps nuevos.
+    """
+    conn = transaction.get_connection()
+    if not conn.in_atomic_block:
+        return None
+    state = getattr(conn, "_results_pending", None)
+    if state is None or state[0] is not conn.run_on_commit:
+        state = (conn.run_on_commit, {})
+        conn._results_pending = state
+    return state[1]
+
+
+def _pending(event_id: Optional[int] = None, ref: Optional[Tuple[str, int]] = None) -> Optional[Callable]:
+    """Bump ya programado en la transacción actual para ese evento (o para ese workout/heat)."""
+    pending = _registry()
+    if not pending:
+        return None
+    if event_id is not None:
+        return pending.get(event_id)
+    return next((fn for fn in pending.values() if ref in fn.results_refs), None)
+
+
+def _schedule(event_id: int, callback: Callable, refs: Set[Tuple[str, int]], everything: bool) -> None:
+    callback.results_event_id = event_id
+    callback.results_refs = refs
+    callback.results_all = everything
+    transaction.on_commit(callback)
+    pending = _registry()
+    if pending is not None:
+        pending[event_id] = callback
+
+
+def bump_results_version(event_id: Optional[int], ref: Optional[Tuple[str, int]] = None) -> None:
+    if not event_id:
+        return
+    fn = _pending(event_id)
+    if fn is not None:
+        if ref is not None:
+            fn.results_refs.add(ref)
+        else:
+            fn.results_all = True
+        return
+
+    def callback() -> None:
+        _apply_bump(event_id, refs=None if callback.results_all else frozenset(callback.results_refs))
+
+    _schedule(event_id, callback, {ref} if ref is not None else set(), ref is None)
+
+
+def claim_results_version(event_id: int) -> int:
+    """
+    Sube results_version ya (no al commit) y devuelve la nueva versión. Debe llamarse dentro de
+    transaction.atomic(): el UPDATE bloquea la fila del evento, así dos escritores concurrentes
+    obtienen versiones distintas y nadie ve la versión antes de ver las filas marcadas con ella.
+    Los bump_results_version() posteriores de la misma transacción quedan absorbidos.
+    """
+    conn = transaction.get_connection()
+    if not conn.in_atomic_block:
+        raise RuntimeError("claim_results_version() requiere una transacción abierta")
+    _apply_bump(event_id, notify=False)
+    version = Event.objects.filter(pk=event_id).values_list("results_version", flat=True).get()
+
+    fn = _pending(event_id)
+    if fn is None:
+        def callback() -> None:
+            results_changed.send(sender=Event, event_id=event_id, refs=None)
+
+        _schedule(event_id, callback, set(), True)
+    return version
+
+
+def bump_for_workout(workout_id: Optional[int]) -> None:
+    if not workout_id or _pending(ref=("workout", workout_id)) is not None:
+        return
+    event_id = Workout.objects.filter(pk=workout_id).values_list("event_id", flat=True).first()
+    bump_results_version(event_id, ("workout", workout_id))
+
+
+def bump_for_heat(heat_id: Optional[int]) -> None:
+    if not heat_id or _pending(ref=("heat", heat_id)) is not None:
+        return
+    event_id = WorkoutHeat.objects.filter(pk=heat_id).values_list("workout__event_id", flat=True).first()
+    bump_results_version(event_id, ("heat", heat_id))
+
+
+def results_stamp(slug: str) -> Optional[Tuple[int, Optional[datetime]]]:
+    """(version, updated_at) del evento o None si no existe."""
+    return Event.objects.filter(slug=slug).values_list("results_version", "results_updated_at").first()
@@ -0,0 +1,230 @@
+# compcore/apps/events/services/snapshots.py
+"""
+Snapshots estáticas de las páginas públicas para picos de tráfico (finales).
+
+- publish_event(): renderiza heats publicados, detalle de heat, /results/, leaderboard y su API
+  JSON de un evento y los escribe bajo STATIC_ROOT/snapshots/<url>/index.html|index.json, con sus
+  variantes precomprimidas .gz y .br (brotli es opcional). Con `refs` solo re-renderiza las páginas
+  de esos heats/workouts (más las del evento, que dependen de todo); un archivo igual al anterior
+  no se reescribe, y las páginas que dejaron de existir (heat/workout despublicado) se borran.
+- schedule_publish(): receptor de results_changed → encola UNA tarea por evento en la cola de
+  trabajos (los cambios que llegan mientras espera se suman a la misma).
+- middleware.SnapshotMiddleware sirve esos archivos con WhiteNoise para visitantes anónimos sin
+  pasar por vistas ni BD; se activa con settings.PUBLIC_SNAPSHOTS.
+"""
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from ..models import Division, Event, Workout, WorkoutHeat
+
+try:  # opcional: sin brotli solo se publica .gz
+    import brotli
+except ImportError:
+    brotli = None
+
+log = logging.getLogger(__name__)
+
+TASK = "events.publish_snapshots"
+INDEX_FILES = ("index.html", "index.json")
+
+Ref = Tuple[str, int]
+
+
+class Page(NamedTuple):
+    url: str
+    filename: str            # index.html | index.json
+    scopes: FrozenSet[Ref]   # vacío = depende de todo el evento
+
+
+def snapshot_root() -> Path:
+    return Path(getattr(settings, "PUBLIC_SNAPSHOTS_ROOT", None) or Path(settings.STATIC_ROOT) / "snapshots")
+
+
+def _url_dir(url: str) -> Path:
+    return snapshot_root().joinpath(*[p for p in url.split("/") if p])
+
+
+def snapshot_path(url: str, filename: str) -> Path:
+    return _url_dir(url) / filename
+
+
+def _host() -> str:
+    for host in settings.ALLOWED_HOSTS:
+        if host and host != "*":
+            return host.lstrip(".")
+    return "localhost"
+
+
+# ------------------------------
+# Páginas de un evento
+# ------------------------------
+def event_pages(event: Event) -> List[Page]:
+    """Todas las URLs publicables del evento (3 consultas: divisiones, workouts y heats)."""
+    slug = event.slug
+    pages = [
+        Page(reverse("public_results", args=[slug]), "index.html", frozenset()),
+        Page(reverse("event_leaderboard", args=[slug]), "index.html", frozenset()),
+        Page(reverse("leaderboard_api_event", args=[slug]), "index.json", frozenset()),
+    ]
+    for division_slug in Division.objects.filter(event=event).order_by("name").values_list("slug", flat=True):
+        pages.append(Page(reverse("leaderboard_api_division", args=[slug, division_slug]), "index.json", frozenset()))
+
+    for workout_id, order in (
+        Workout.objects.filter(event=event, is_published=True).order_by("order").values_list("id", "order")
+    ):
+        pages.append(Page(reverse("public_heats", args=[slug, order]), "index.html", frozenset({("workout", workout_id)})))
+    heats = (
+        WorkoutHeat.objects.filter(workout__event=event, workout__is_published=True, is_published=True)
+        .order_by("workout__order", "heat_number")
+        .values_list("id", "heat_number", "workout_id", "workout__order")
+    )
+    for heat_id, number, workout_id, order in heats:
+        pages.append(Page(
+            reverse("heat_detail", args=[slug, order, number]), "index.html",
+            frozenset({("workout", workout_id), ("heat", heat_id)}),
+        ))
+    return pages
+
+
+def _event_dirs(event: Event) -> List[Path]:
+    """Subárboles con páginas por heat/workout/división: ahí se buscan snapshots huérfanas."""
+    return [
+        _url_dir(reverse("public_heats", args=[event.slug, 1])).parent,  # heats/<slug>/
+        _url_dir(reverse("leaderboard_api_event", args=[event.slug])),
+    ]
+
+
+# ------------------------------
+# Render y escritura
+# ------------------------------
+def render_page(url: str) -> Tuple[int, bytes]:
+    """Ejecuta la vista como un visitante anónimo, sin middleware ni caché versionada."""
+    match = resolve(url)
+    request = RequestFactory(HTTP_HOST=_host()).get(url)
+    request.user = AnonymousUser()
+    request.is_snapshot = True  # versioned_results no sirve copias viejas a la snapshot
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+    except Http404:
+        return 404, b""
+    if response.streaming:  # p. ej. results_event transmite los heats por bloques
+        return response.status_code, b"".join(response.streaming_content)
+    if hasattr(response, "render"):
+        response = response.render()
+    return response.status_code, response.content
+
+
+def _replace(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def write_snapshot(path: Path, content: bytes) -> bool:
+    """Escribe el archivo y sus variantes .gz/.br; False si ya estaba igual."""
+    if path.is_file() and path.read_bytes() == content:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Primero las variantes comprimidas: el original nuevo nunca convive con un .gz viejo
+    _replace(path.with_name(path.name + ".gz"), gzip.compress(content, 9, mtime=0))
+    br = path.with_name(path.name + ".br")
+    if brotli is not None:
+        _replace(br, brotli.compress(content))
+    elif br.exists():
+        br.unlink()
+    _replace(path, content)
+    return True
+
+
+def remove_snapshot(path: Path) -> bool:
+    removed = False
+    for p in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+        if p.exists():
+            p.unlink()
+            removed = True
+    return removed
+
+
+def _prune(event: Event, keep: Set[Path]) -> int:
+    removed = 0
+    for base in _event_dirs(event):
+        if not base.is_dir():
+            continue
+        for name in INDEX_FILES:
+            for path in base.rglob(name):
+                if path not in keep and remove_snapshot(path):
+                    removed += 1
+    return removed
+
+
+def publish_event(event: Event, refs: Optional[Iterable[Ref]] = None) -> Dict[str, int]:
+    """
+    Publica las snapshots del evento. refs=None → todas; si no, las páginas del evento más las
+    de esos ("heat"|"workout", id). Devuelve {"written", "unchanged", "removed", "skipped"}.
+    """
+    wanted = None if refs is None else {tuple(r) for r in refs}
+    pages = event_pages(event)
+    stats = {"written": 0, "unchanged": 0, "removed": 0, "skipped": 0}
+
+    for page in pages:
+        if wanted is not None and page.scopes and not (page.scopes & wanted):
+            continue
+        path = snapshot_path(page.url, page.filename)
+        status, content = render_page(page.url)
+        if status == 200:
+            stats["written" if write_snapshot(path, content) else "unchanged"] += 1
+        elif status == 404:
+            stats["removed"] += remove_snapshot(path)
+        else:
+            # Se conserva la anterior: mejor una snapshot algo vieja que un error publicado
+            log.warning("snapshot %s: la vista respondió %s", page.url, status)
+            stats["skipped"] += 1
+
+    stats["removed"] += _prune(event, {snapshot_path(p.url, p.filename) for p in pages})
+    return stats
+
+
+# ------------------------------
+# Re-publicación al cambiar resultados
+# ------------------------------
+def _merge_refs(a: Optional[List[List]], b: Optional[List[List]]) -> Optional[List[List]]:
+    if a is None or b is None:
+        return None
+    return sorted({tuple(r) for r in a} | {tuple(r) for r in b})
+
+
+def schedule_publish(event_id: int, refs: Optional[Iterable[Ref]] = None) -> None:
+    """
+    Encola la re-publicación del evento. Si ya hay una tarea en cola para el mismo evento se le
+    suman los refs (UPDATE condicional a status=queued: si el worker la tomó justo, se encola otra).
+    """
+    from compcore.apps.jobs.models import Job
+    from compcore.apps.jobs.services.queue import enqueue
+
+    new_refs = None if refs is None else sorted(tuple(r) for r in refs)
+    pending = (
+        Job.objects.filter(kind=TASK, status=Job.QUEUED, params__event_id=event_id)
+        .order_by("id").values_list("id", "params").first()
+    )
+    if pending is not None:
+        pk, params = pending
+        params = dict(params, refs=_merge_refs(params.get("refs"), new_refs))
+        if Job.objects.filter(pk=pk, status=Job.QUEUED).update(params=params):
+            return
+    enqueue(TASK, {"event_id": event_id, "refs": new_refs}, label=f"Snapshots evento #{event_id}")
+
+
+def on_results_changed(sender, event_id: int, refs=None, **kwargs) -> None:
+    if getattr(settings, "PUBLIC_SNAPSHOTS", False):
+        schedule_publish(event_id, refs)
@@ -0,0 +1,43 @@
+# compcore/apps/events/signals.py
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save
+
+from .services.results_version import bump_for_heat, bump_for_workout, bump_results_version
+
+
+def _bump_from_heat_result(sender, instance, **kwargs):
+    bump_for_heat(instance.heat_id)
+
+
+def _bump_from_heat(sender, instance, **kwargs):
+    bump_for_workout(instance.workout_id)
+
+
+def _bump_from_workout(sender, instance, **kwargs):
+    bump_results_version(instance.event_id, ("workout", instance.pk))
+
+
+def _bump_from_division(sender, instance, created=False, **kwargs):
+    # Renombrar una división cambia encabezados y tablas ya publicadas (ETag de las páginas)
+    if not created:
+        bump_results_version(instance.event_id)
+
+
+def _bump_from_event(sender, instance, created=False, **kwargs):
+    if not created:
+        bump_results_version(instance.pk)
+
+
+def connect_results_version_signals() -> None:
+    uid = "events.results_version"
+    # HeatResult solo en post_save: un post_delete por lane impediría el borrado en bloque de los
+    # lanes y dispararía una señal por fila al re-sembrar. Los lanes se borran con su heat (cubierto
+    # por la señal del heat, una vez por workout y transacción) o en trim_lane_rows(), que solo
+    # borra lanes vacíos.
+    post_save.connect(_bump_from_heat_result, sender="judging.HeatResult", dispatch_uid=f"{uid}.heat_result")
+    for signal in (post_save, post_delete):
+        signal.connect(_bump_from_heat, sender="events.WorkoutHeat", dispatch_uid=f"{uid}.heat")
+        signal.connect(_bump_from_workout, sender="events.Workout", dispatch_uid=f"{uid}.workout")
+    post_save.connect(_bump_from_division, sender="events.Division", dispatch_uid=f"{uid}.division")
+    post_save.connect(_bump_from_event, sender="events.Event", dispatch_uid=f"{uid}.event")
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import threading
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+
+from compcore.apps.events.models import Division, Event, Workout, WorkoutHeat, WorkoutHeatCounter
+from compcore.apps.events.services.heat_numbers import release_heat_numbers, reserve_heat_numbers
+from compcore.apps.events.services.heats import _assign_to_heats
+from compcore.apps.registration.models import AthleteEntry
+
+User = get_user_model()
+
+
+class HeatNumberCounterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Counter Games", slug="counter-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        cls.workout = Workout.objects.create(event=cls.event, order=1, name="W1")
+        users = User.objects.bulk_create([User(username=f"c{i}") for i in range(5)])
+        AthleteEntry.objects.bulk_create([AthleteEntry(user=u, event=cls.event, division=cls.division) for u in users])
+        cls.entrants = [("athlete", pk) for pk in AthleteEntry.objects.order_by("id").values_list("id", flat=True)]
+
+    def _heat(self, number=None):
+        return WorkoutHeat.objects.create(workout=self.workout, division=self.division, heat_number=number)
+
+    def test_sequential_reservations(self):
+        self.assertEqual(reserve_heat_numbers(self.workout.id, 3), (0, False))
+        self.assertEqual(reserve_heat_numbers(self.workout.id, 2), (3, False))
+        self.assertEqual(self._heat().heat_number, 6)
+        # Un número pedido que choca se corre al final
+        self._heat(7)
+        self.assertEqual(reserve_heat_numbers(self.workout.id, 2, start_heat_number=7), (7, True))
+
+    def test_rewind_when_draft_heats_are_freed(self):
+        _assign_to_heats(self.workout, self.division, self.entrants, 2)
+        numbers = list(WorkoutHeat.objects.order_by("heat_number").values_list("heat_number", flat=True))
+        self.assertEqual(numbers, [1, 2, 3])
+        # La re-siembra borra los borradores y reutiliza la misma numeración
+        _assign_to_heats(self.workout, self.division, self.entrants, 2)
+        numbers = list(WorkoutHeat.objects.order_by("heat_number").values_list("heat_number", flat=True))
+        self.assertEqual(numbers, [1, 2, 3])
+
+        WorkoutHeat.objects.filter(heat_number__in=[2, 3]).delete()
+        release_heat_numbers(self.workout.id, [2, 3])
+        self.assertEqual(WorkoutHeatCounter.objects.get(pk=self.workout.id).last_number, 1)
+        self.assertEqual(self._heat().heat_number, 2)
+
+    def test_raising_existing_heat_number_moves_counter(self):
+        heat = self._heat()
+        heat = WorkoutHeat.objects.get(pk=heat.pk)
+        heat.heat_number = 10
+        heat.save()
+        self.assertEqual(WorkoutHeatCounter.objects.get(pk=self.workout.id).last_number, 10)
+        self.assertEqual(self._heat().heat_number, 11)  # sin chocar con uniq_workout_heatnumber
+
+
+@unittest.skipIf(
+    connection.vendor == "sqlite",
+    "SQLite no tiene SELECT ... FOR UPDATE: el lock del contador se prueba con PostgreSQL/MySQL",
+)
+class ConcurrentSeedTest(TransactionTestCase):
+    def test_two_concurrent_seeds_get_disjoint_numbers(self):
+        event = Event.objects.create(name="Race Games", slug="race-games")
+        division = Division.objects.create(event=event, name="RX", slug="rx")
+        workout = Workout.objects.create(event=event, order=1, name="W1")
+        WorkoutHeat.objects.create(workout=workout, division=division, heat_number=1)
+        barrier = threading.Barrier(2)
+        errors = []
+
+        def seed():
+            try:
+                barrier.wait()
+                with transaction.atomic():
+                    base, _ = reserve_heat_numbers(workout.id, 5)
+                    WorkoutHeat.objects.bulk_create([
+                        WorkoutHeat(workout=workout, division=division, heat_number=base + i + 1) for i in range(5)
+                    ])
+            except Exception as exc:  # noqa: BLE001 - se reporta en el hilo principal
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=seed) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        numbers = sorted(WorkoutHeat.objects.filter(workout=workout).values_list("heat_number", flat=True))
+        self.assertEqual(numbers, list(range(1, 12)))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from compcore.apps.events.models import Division, Event, HeatAssignment, Workout, WorkoutHeat
+from compcore.apps.events.services.heats import (
+    _assign_to_heats,
+    apply_plan,
+    clear_auto_assignments,
+    participants_for_division,
+    plan_distribution,
+    rank_participants,
+)
+from compcore.apps.registration.models import AthleteEntry
+
+User = get_user_model()
+
+
+class HeatPlanTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Plan Games", slug="plan-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        cls.workout = Workout.objects.create(event=cls.event, order=1, name="W1", scoring="TIME")
+        users = User.objects.bulk_create([User(username=f"p{i}") for i in range(5)])
+        AthleteEntry.objects.bulk_create([AthleteEntry(user=u, event=cls.event, division=cls.division) for u in users])
+
+    def _plan(self, best_last=False):
+        parts = participants_for_division(self.event, self.division)
+        return plan_distribution(self.workout, self.division, parts, best_last, lane_count=2)
+
+    def _layout(self):
+        """{participante: (heat relativo, lane)}: la numeración absoluta depende del contador."""
+        heats = list(WorkoutHeat.objects.filter(workout=self.workout).order_by("heat_number").values_list("id", flat=True))
+        return {
+            ("athlete", a.athlete_entry_id): (heats.index(a.heat_id) + 1, a.lane)
+            for a in HeatAssignment.objects.filter(heat__workout=self.workout)
+        }
+
+    def test_preview_writes_nothing(self):
+        with CaptureQueriesContext(connection) as ctx:
+            parts = participants_for_division(self.event, self.division)
+            ranked, best_last = rank_participants(self.workout, self.division, parts)
+            plans = [plan_distribution(self.workout, self.division, ranked, best_last, lane_count=n) for n in (2, 3)]
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].split()[0] in ("INSERT", "UPDATE", "DELETE")]
+        self.assertEqual(writes, [])
+        self.assertFalse(WorkoutHeat.objects.filter(workout=self.workout).exists())
+
+        data = json.loads(json.dumps(plans[0].to_dict()))
+        self.assertEqual(data["needed_heats"], 3)
+        self.assertEqual([len(h["lanes"]) for h in data["heats"]], [2, 2, 1])
+        self.assertEqual(
+            [(lane["kind"], lane["id"]) for h in data["heats"] for lane in h["lanes"]], plans[0].seeding_order()
+        )
+        self.assertEqual(plans[1].needed_heats, 2)
+
+    def test_apply_plan_matches_assign_to_heats(self):
+        plan = self._plan(best_last=True)
+        self.assertTrue(plan.assign_best_to_last)
+        self.assertEqual(apply_plan(plan), 5)
+        applied = self._layout()
+        # Los mejores (primeros de `ranked`) quedan en el último heat
+        self.assertEqual(applied[plan.ranked[0].key][0], 3)
+
+        _assign_to_heats(self.workout, self.division, plan.seeding_order(), plan.heat_capacity)
+        self.assertEqual(self._layout(), applied)
+
+    def test_clear_keeps_manual_and_locked(self):
+        apply_plan(self._plan())
+        manual, locked = HeatAssignment.objects.filter(heat__workout=self.workout).order_by("id")[:2]
+        HeatAssignment.objects.filter(pk=manual.pk).update(is_manual=True)
+        HeatAssignment.objects.filter(pk=locked.pk).update(locked=True)
+
+        self.assertEqual(clear_auto_assignments(self.workout, self.division), 3)
+        self.assertEqual(
+            set(HeatAssignment.objects.filter(heat__workout=self.workout).values_list("pk", flat=True)),
+            {manual.pk, locked.pk},
+        )
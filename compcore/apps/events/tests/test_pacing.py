@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from compcore.apps.events.models import Division, Event, Workout, WorkoutHeat
+from compcore.apps.events.services.pacing import pace_grouping, predict_finish_times
+from compcore.apps.judging.models import HeatResult
+from compcore.apps.registration.models import AthleteEntry
+
+User = get_user_model()
+
+
+class PredictFinishTimesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Pace Games", slug="pace-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        users = User.objects.bulk_create([User(username=f"pace-{i}") for i in range(3)])
+        AthleteEntry.objects.bulk_create([AthleteEntry(user=u, event=cls.event, division=cls.division) for u in users])
+        cls.entries = list(AthleteEntry.objects.order_by("id"))
+        cls.published = cls._workout(1, True, [200, 300, 400])
+        cls.draft = cls._workout(2, False, [900, 100, 100])  # sin publicar: no debe contar
+        cls.target = Workout.objects.create(event=cls.event, order=3, name="W3", scoring="TIME")
+
+    @classmethod
+    def _workout(cls, order, published, times):
+        w = Workout.objects.create(event=cls.event, order=order, name=f"W{order}", scoring="TIME", is_published=published)
+        heat = WorkoutHeat.objects.create(workout=w, division=cls.division, heat_number=1, lane_count=3)
+        HeatResult.objects.bulk_create(
+            [HeatResult(heat=heat, lane=i + 1, time_seconds=t, athlete_entry=e) for i, (e, t) in enumerate(zip(cls.entries, times))],
+            update_conflicts=True, unique_fields=["heat", "lane"], update_fields=["time_seconds", "athlete_entry"],
+        )
+        return w
+
+    def test_only_published_workouts_count(self):
+        predicted = predict_finish_times(self.target, [self.division.id])[self.division.id]
+        self.assertEqual([round(predicted[("athlete", e.id)]) for e in self.entries], [200, 300, 400])
+
+        Workout.objects.filter(pk=self.draft.pk).update(is_published=True)
+        predicted = predict_finish_times(self.target, [self.division.id])[self.division.id]
+        self.assertNotEqual([round(predicted[("athlete", e.id)]) for e in self.entries], [200, 300, 400])
+
+
+class PaceGroupingTest(SimpleTestCase):
+    def test_slow_athletes_share_a_heat_within_tolerance(self):
+        entrants = [("athlete", i) for i in range(4)]
+        predicted = {entrants[0]: 100, entrants[1]: 500, entrants[2]: 480, entrants[3]: 120}
+        grouped = pace_grouping(entrants, predicted, lane_count=2, tolerance=1)
+        self.assertEqual(sorted(grouped), entrants)
+        self.assertEqual({frozenset(grouped[:2]), frozenset(grouped[2:])},
+                         {frozenset([entrants[0], entrants[3]]), frozenset([entrants[1], entrants[2]])})
+        self.assertEqual(pace_grouping(entrants, predicted, lane_count=2, tolerance=0), entrants)
+
+    def test_unconstrained_grouping_keeps_heat_sizes(self):
+        entrants = [("athlete", i) for i in range(5)]
+        # El más rápido va primero en la siembra: su heat (el incompleto) no debe pasar adelante
+        predicted = dict(zip(entrants, (100, 500, 490, 300, 310)))
+        grouped = pace_grouping(entrants, predicted, lane_count=2, tolerance=None)
+        self.assertEqual(sorted(grouped), entrants)
+        heats = [frozenset(grouped[i:i + 2]) for i in range(0, len(grouped), 2)]
+        self.assertEqual(heats, [frozenset(entrants[1:3]), frozenset(entrants[3:5]), frozenset(entrants[:1])])
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from compcore.apps.events.models import Division, Event, HeatAssignment, Workout, WorkoutHeat
+from compcore.apps.events.services.heats import _reseed_diff
+from compcore.apps.registration.models import AthleteEntry
+
+User = get_user_model()
+
+
+class ReseedDiffTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Reseed Games", slug="reseed-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        cls.workout = Workout.objects.create(event=cls.event, order=1, name="W1", scoring="TIME")
+        users = User.objects.bulk_create([User(username=f"r{i}") for i in range(5)])
+        AthleteEntry.objects.bulk_create([AthleteEntry(user=u, event=cls.event, division=cls.division) for u in users])
+        cls.entrants = [("athlete", pk) for pk in AthleteEntry.objects.order_by("id").values_list("id", flat=True)]
+
+    def _seed(self, entrants):
+        return _reseed_diff(self.workout, self.division, entrants, 2)
+
+    def _layout(self):
+        return {
+            (a.athlete_entry_id, a.heat.heat_number, a.lane)
+            for a in HeatAssignment.objects.filter(heat__workout=self.workout).select_related("heat")
+        }
+
+    def test_identical_reseed_writes_nothing(self):
+        self._seed(self.entrants)
+        before = self._layout()
+        with CaptureQueriesContext(connection) as ctx:
+            res = self._seed(self.entrants)
+        writes = [q["sql"] for q in ctx.captured_queries if q["sql"].split()[0] in ("INSERT", "UPDATE", "DELETE")]
+        self.assertEqual(writes, [])
+        self.assertEqual((res["inserted"], res["updated"], res["deleted"], res["heats_touched"]), (0, 0, 0, 0))
+        self.assertEqual(self._layout(), before)
+
+    def test_locked_heat_keeps_its_lanes(self):
+        self._seed(self.entrants)
+        first = WorkoutHeat.objects.filter(workout=self.workout).order_by("heat_number").first()
+        HeatAssignment.objects.filter(heat=first).update(locked=True)
+        locked = {(a, n, ln) for a, n, ln in self._layout() if n == first.heat_number}
+
+        res = self._seed(list(reversed(self.entrants)))  # el ranking se invierte
+        layout = self._layout()
+        self.assertTrue(locked <= layout)
+        self.assertEqual(res["kept_pinned"], 2)
+        self.assertEqual(len({a for a, _n, _ln in layout}), 5)  # nadie duplicado ni perdido
+
+    def test_manual_move_is_preserved(self):
+        self._seed(self.entrants)
+        last = WorkoutHeat.objects.filter(workout=self.workout).order_by("heat_number").last()
+        moved = HeatAssignment.objects.get(athlete_entry_id=self.entrants[0][1])
+        moved.heat, moved.lane, moved.is_manual = last, 2, True
+        moved.save()
+
+        self._seed(self.entrants)
+        moved.refresh_from_db()
+        self.assertEqual((moved.heat_id, moved.lane), (last.pk, 2))
+        # Los automáticos se reacomodan alrededor sin pisar el lane reservado
+        taken = list(HeatAssignment.objects.filter(heat=last).values_list("lane", flat=True))
+        self.assertEqual(sorted(taken), sorted(set(taken)))
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from compcore.apps.events.decorators import versioned_results
+from compcore.apps.events.models import Division, Event, Workout, WorkoutHeat
+from compcore.apps.events.services.results_version import bump_results_version
+from compcore.apps.judging.models import HeatResult
+from compcore.apps.judging.services.lanes import ensure_lane_rows
+
+
+class VersionedResultsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Cache Games", slug="cache-games")
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+        @versioned_results("test")
+        def view(request, slug):
+            self.calls += 1
+            return HttpResponse(f"render {self.calls}")
+
+        self.view = view
+
+    def _get(self, **headers):
+        request = RequestFactory().get("/r/cache-games/", **headers)
+        request.user = AnonymousUser()
+        return self.view(request, slug="cache-games")
+
+    def _bump(self):
+        Event.objects.filter(pk=self.event.pk).update(results_version=F("results_version") + 1)
+
+    def test_etag_and_not_modified(self):
+        first = self._get()
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("ETag", first)
+        again = self._get(HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(self._get().content, b"render 1")  # copia en caché, sin volver a la vista
+        self.assertEqual(self.calls, 1)
+
+    def test_version_bump_invalidates(self):
+        old = self._get()
+        self._bump()
+        new = self._get(HTTP_IF_NONE_MATCH=old["ETag"])
+        self.assertEqual(new.status_code, 200)
+        self.assertEqual(new.content, b"render 2")
+        self.assertNotEqual(new["ETag"], old["ETag"])
+
+    def test_stale_copy_served_while_locked(self):
+        old = self._get()
+        self._bump()
+        cache.add("results-page:test:latest:a:/r/cache-games/:lock", 2, 30)  # otro worker recalcula
+        stale = self._get()
+        self.assertEqual(stale.content, b"render 1")
+        self.assertEqual(stale["ETag"], old["ETag"])
+        self.assertNotIn("Last-Modified", stale)  # el próximo poll no recibe 304 sobre lo viejo
+        self.assertEqual(self.calls, 1)
+
+
+    def test_timed_out_waiter_keeps_foreign_lock(self):
+        lock_key = "results-page:test:latest:a:/r/cache-games/:lock"
+        cache.add(lock_key, 1, 30)  # otro worker recalcula y todavía no hay copia vieja
+        with mock.patch("compcore.apps.events.decorators.WAIT_SECONDS", 0):
+            self.assertEqual(self._get().content, b"render 1")
+        self.assertEqual(cache.get(lock_key), 1)
+
+
+class ResultsVersionBumpTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Bump Games", slug="bump-games")
+
+    def _version(self):
+        return Event.objects.values_list("results_version", flat=True).get(pk=self.event.pk)
+
+    def test_bumps_coalesce_per_transaction(self):
+        before = self._version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            bump_results_version(self.event.pk, ("heat", 1))
+            bump_results_version(self.event.pk, ("heat", 2))
+            bump_results_version(self.event.pk)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self._version(), before + 1)
+
+    def test_bump_after_rolled_back_savepoint_is_kept(self):
+        before = self._version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    bump_results_version(self.event.pk)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            bump_results_version(self.event.pk)  # el bump descartado no lo absorbe
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self._version(), before + 1)
+
+    def test_heat_delete_bumps_once_without_per_lane_signals(self):
+        division = Division.objects.create(event=self.event, name="RX", slug="rx")
+        # En bloque (sin señales) para que no quede un bump pendiente de la transacción del test
+        workout, = Workout.objects.bulk_create([Workout(event=self.event, order=1, name="W1", scoring="TIME")])
+        ensure_lane_rows(WorkoutHeat.objects.bulk_create([
+            WorkoutHeat(workout=workout, division=division, heat_number=number, lane_count=8) for number in (1, 2, 3)
+        ]))
+        self.assertEqual(HeatResult.objects.filter(heat__workout=workout).count(), 24)
+        # Sin receptor por fila: los lanes se borran en bloque junto con su heat
+        self.assertFalse(post_delete.has_listeners(HeatResult))
+
+        before = self._version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            WorkoutHeat.objects.filter(workout=workout).delete()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self._version(), before + 1)
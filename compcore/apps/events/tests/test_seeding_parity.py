@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from compcore.apps.events.models import Division, Event, Workout, WorkoutHeat
+from compcore.apps.events.services.heats import _ranking_for_division
+from compcore.apps.judging.models import HeatResult
+from compcore.apps.leaderboard.models import DivisionStanding
+from compcore.apps.leaderboard.services.standings import rebuild_standings
+from compcore.apps.registration.models import AthleteEntry
+
+User = get_user_model()
+
+# Marca por lane (1..6): empate en lanes 2 y 3, lane 4 sin marca
+SCORES = {
+    "TIME": ("time_seconds", [300, 280, 280, None, 250, 310]),
+    "REPS": ("reps", [40, 50, 50, None, 60, 30]),
+    "POINTS": ("reps", [40, 50, 50, None, 60, 30]),
+    "WEIGHT": ("weight_kg", [Decimal("80.5"), Decimal("90"), Decimal("90"), None, Decimal("100.25"), Decimal("70")]),
+}
+BEST_TO_WORST = [5, 2, 3, 1, 6, 4]  # el empate conserva el orden de lane; sin marca, último
+
+
+class SeedingLeaderboardParityTest(TestCase):
+    def _event(self, scoring: str):
+        event = Event.objects.create(name=f"Parity {scoring or 'lane'}", slug=f"parity-{scoring.lower() or 'lane'}")
+        division = Division.objects.create(event=event, name="RX", slug="rx")
+        w1 = Workout.objects.create(event=event, order=1, name="W1", scoring=scoring or "TIME", is_published=True)
+        if not scoring:
+            Workout.objects.filter(pk=w1.pk).update(scoring="")  # dato viejo sin tipo: fallback por lane
+            w1.refresh_from_db()
+        w2 = Workout.objects.create(event=event, order=2, name="W2", scoring="TIME")
+        users = User.objects.bulk_create([User(username=f"p{scoring or 'lane'}-{i}") for i in range(6)])
+        AthleteEntry.objects.bulk_create([AthleteEntry(user=u, event=event, division=division) for u in users])
+        entries = list(AthleteEntry.objects.filter(division=division).order_by("id"))
+        heat = WorkoutHeat.objects.create(workout=w1, division=division, heat_number=1, lane_count=6)
+        field, values = SCORES.get(scoring, ("reps", [60, 10, 50, 20, 40, 30]))
+        HeatResult.objects.bulk_create(
+            [HeatResult(heat=heat, lane=i + 1, athlete_entry=e, **{field: values[i]}) for i, e in enumerate(entries)],
+            update_conflicts=True, unique_fields=["heat", "lane"], update_fields=[field, "athlete_entry"],
+        )
+        return event, division, w2, {e.id: lane for lane, e in enumerate(entries, start=1)}
+
+    def _check(self, scoring: str, expected):
+        event, division, w2, lane_of = self._event(scoring)
+        seeder = [lane_of[pk] for _kind, pk in reversed(_ranking_for_division(w2, division))]
+        rebuild_standings(event)
+        board = [
+            lane_of[pk] for pk in DivisionStanding.objects.filter(division=division)
+            .order_by("rank", "id").values_list("athlete_entry_id", flat=True)
+        ]
+        page = list(
+            HeatResult.objects.filter(heat__workout__order=1, heat__workout__event=event)
+            .order_by("rank_key", "lane").values_list("lane", flat=True)
+        )
+        self.assertEqual(seeder, expected)
+        self.assertEqual(board, expected)
+        self.assertEqual(page, expected)
+
+    def test_each_scoring_type_with_ties(self):
+        for scoring in SCORES:
+            with self.subTest(scoring=scoring):
+                self._check(scoring, BEST_TO_WORST)
+
+    def test_lane_fallback_without_scoring(self):
+        self._check("", [1, 2, 3, 4, 5, 6])
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import gzip
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from compcore.apps.events.models import Division, Event, Workout, WorkoutHeat
+from compcore.apps.events.services.snapshots import publish_event, snapshot_path
+
+TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[str(settings.BASE_DIR.parent / "templates")])]
+
+
+class SnapshotsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Snap Games", slug="snap-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        cls.workout = Workout.objects.create(event=cls.event, order=1, name="W1", scoring="REPS", is_published=True)
+        cls.heats = [
+            WorkoutHeat.objects.create(workout=cls.workout, division=cls.division, heat_number=n, is_published=True)
+            for n in (1, 2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        overrides = override_settings(TEMPLATES=TEMPLATES, PUBLIC_SNAPSHOTS_ROOT=self.root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_publish_only_changes_and_prunes(self):
+        stats = publish_event(self.event)
+        self.assertEqual(stats["written"], 7)  # results, leaderboard, api, api/rx, heats, h1, h2
+        heat_url = reverse("heat_detail", args=[self.event.slug, 1, 2])
+        html = snapshot_path(heat_url, "index.html")
+        self.assertEqual(gzip.decompress(html.with_name("index.html.gz").read_bytes()), html.read_bytes())
+
+        # Sin cambios no se reescribe nada; con refs solo se renderizan las páginas de ese heat
+        self.assertEqual(publish_event(self.event)["written"], 0)
+        stats = publish_event(self.event, [("heat", self.heats[0].id)])
+        self.assertEqual(stats["unchanged"], 5)
+
+        WorkoutHeat.objects.filter(pk=self.heats[1].pk).update(is_published=False)
+        self.assertEqual(publish_event(self.event, [("heat", self.heats[0].id)])["removed"], 1)
+        self.assertFalse(html.exists())
+
+    def test_middleware_serves_snapshot_to_anonymous(self):
+        publish_event(self.event)
+        url = reverse("public_heats", args=[self.event.slug, 1])
+        with override_settings(PUBLIC_SNAPSHOTS=True):
+            with self.assertNumQueries(0):
+                r = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(r["Content-Encoding"], "gzip")
+            self.assertIn(b"W1", gzip.decompress(b"".join(r.streaming_content)))
+
+            # Con query string (o sesión) se sigue usando la vista
+            self.assertFalse(self.client.get(url, {"x": 1}).streaming)
@@ -0,0 +1,23 @@
+from django.contrib import admin, messages
+from django.utils.translation import gettext_lazy as _
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "label", "status", "progress", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    search_fields = ("label", "kind")
+    readonly_fields = (
+        "kind", "label", "params", "status", "progress", "progress_message", "result", "error",
+        "worker", "created_by", "created_at", "started_at", "finished_at", "updated_at",
+    )
+    actions = ["action_requeue"]
+
+    @admin.action(description=_("Reencolar jobs fallidos"))
+    def action_requeue(self, request, queryset):
+        updated = queryset.filter(status=Job.FAILED).update(
+            status=Job.QUEUED, progress=0, progress_message="", error="", started_at=None, finished_at=None
+        )
+        self.message_user(request, f"{updated} jobs reencolados.", level=messages.SUCCESS)
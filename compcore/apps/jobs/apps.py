@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "compcore.apps.jobs"
+    verbose_name = "Jobs (segundo plano)"
+
+    def ready(self):
+        # Registra las tareas disponibles para run_jobs
+        from . import tasks  # noqa: F401
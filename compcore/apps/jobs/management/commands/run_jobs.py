@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from compcore.apps.jobs.models import Job
+from compcore.apps.jobs.services.queue import claim_next, fail_stale, registered_kinds, run_job_in_thread, worker_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker de la cola de trabajos (siembra, importaciones, rebuild del leaderboard). "
+        "Toma Jobs en cola de la BD y los ejecuta en un pool de threads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Threads en paralelo")
+        parser.add_argument("--poll", type=float, default=2.0, help="Segundos entre consultas cuando no hay trabajo")
+        parser.add_argument("--once", action="store_true", help="Vaciar la cola y salir")
+        parser.add_argument("--stale-minutes", type=int, default=30, help="Marca como fallidos los jobs colgados")
+
+    def handle(self, *args, **opts):
+        workers = max(1, opts["workers"])
+        stale = fail_stale(opts["stale_minutes"])
+        if stale:
+            self.stdout.write(self.style.WARNING(f"{stale} jobs colgados marcados como fallidos."))
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"run_jobs · workers={workers} · tareas: {', '.join(registered_kinds())}"
+        ))
+
+        running = {}
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job") as pool:
+            try:
+                while True:
+                    for fut in [f for f in running if f.done()]:
+                        job = running.pop(fut)
+                        done += 1
+                        job.refresh_from_db(fields=["status"])
+                        if fut.exception() is not None or job.status != Job.DONE:
+                            self.stdout.write(self.style.ERROR(f"✗ Job #{job.pk} {job.label or job.kind} falló"))
+                        else:
+                            self.stdout.write(f"✓ Job #{job.pk} {job.label or job.kind} terminado")
+
+                    job = claim_next(worker_name()) if len(running) < workers else None
+                    if job is not None:
+                        self.stdout.write(f"▶ Job #{job.pk} {job.label or job.kind}")
+                        running[pool.submit(run_job_in_thread, job.pk)] = job
+                        continue
+
+                    if opts["once"] and not running:
+                        break
+                    time.sleep(0.2 if running else opts["poll"])
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING("Deteniendo: se esperan los jobs en curso..."))
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Worker detenido ({done} jobs procesados)."))
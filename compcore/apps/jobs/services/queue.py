@@ -0,0 +1,130 @@
+# compcore/apps/jobs/services/queue.py
+"""
+Cola de trabajos sobre la BD existente (sin broker).
+
+- enqueue(): crea un Job en cola y vuelve de inmediato.
+- claim_next(): el worker toma el próximo Job con un UPDATE condicional
+  (status=queued → running); si otro worker lo tomó antes, el UPDATE afecta 0 filas.
+  Funciona igual en SQLite y PostgreSQL.
+- run_job(): ejecuta la tarea registrada y guarda progreso / resultado / error.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from ..models import Job
+
+# tarea(params, progress) -> dict JSON-serializable
+Progress = Callable[..., None]
+TaskFn = Callable[[Dict[str, Any], Progress], Optional[Dict[str, Any]]]
+
+_REGISTRY: Dict[str, TaskFn] = {}
+
+
+# ------------------------------
+# Registro de tareas
+# ------------------------------
+def register(kind: str) -> Callable[[TaskFn], TaskFn]:
+    def deco(fn: TaskFn) -> TaskFn:
+        _REGISTRY[kind] = fn
+        return fn
+    return deco
+
+
+def registered_kinds() -> list:
+    return sorted(_REGISTRY)
+
+
+# ------------------------------
+# Productor
+# ------------------------------
+def enqueue(kind: str, params: Optional[Dict[str, Any]] = None, user=None, label: str = "") -> Job:
+    if kind not in _REGISTRY:
+        raise ValueError(f"Tarea '{kind}' no registrada.")
+    return Job.objects.create(
+        kind=kind,
+        params=params or {},
+        label=label[:200],
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+    )
+
+
+# ------------------------------
+# Worker
+# ------------------------------
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"[:120]
+
+
+def claim_next(worker: str = "") -> Optional[Job]:
+    """Toma el Job más antiguo en cola (o None)."""
+    candidates = Job.objects.filter(status=Job.QUEUED).order_by("created_at", "id").values_list("pk", flat=True)[:10]
+    for pk in candidates:
+        now = timezone.now()
+        if Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, started_at=now, updated_at=now, worker=worker or worker_name()
+        ):
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def fail_stale(minutes: int) -> int:
+    """Jobs 'running' sin progreso hace `minutes` (worker caído) → failed."""
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return Job.objects.filter(status=Job.RUNNING, updated_at__lt=cutoff).update(
+        status=Job.FAILED, finished_at=timezone.now(), error="Worker interrumpido (sin progreso)."
+    )
+
+
+class _Reporter:
+    """Callback de progreso con throttle: como mucho una escritura cada `interval` segundos."""
+
+    def __init__(self, job_id: int, interval: float = 0.5):
+        self.job_id = job_id
+        self.interval = interval
+        self._last = 0.0
+
+    def __call__(self, pct: float, message: str = "") -> None:
+        now = time.monotonic()
+        if pct < 100 and now - self._last < self.interval:
+            return
+        self._last = now
+        Job.objects.filter(pk=self.job_id).update(
+            progress=max(0, min(100, int(pct))), progress_message=str(message)[:255], updated_at=timezone.now()
+        )
+
+
+def run_job(job: Job) -> Job:
+    """Ejecuta un Job ya reclamado (status=running) y persiste el desenlace."""
+    fn = _REGISTRY.get(job.kind)
+    update: Dict[str, Any] = {"finished_at": None}
+    try:
+        if fn is None:
+            raise ValueError(f"Tarea '{job.kind}' no registrada en este worker.")
+        result = fn(dict(job.params or {}), _Reporter(job.pk))
+        update.update(status=Job.DONE, progress=100, result=result or {})
+    except Exception:
+        update.update(status=Job.FAILED, error=traceback.format_exc()[-8000:])
+    update["finished_at"] = timezone.now()
+    update["updated_at"] = update["finished_at"]
+    Job.objects.filter(pk=job.pk).update(**update)
+    job.refresh_from_db()
+    return job
+
+
+def run_job_in_thread(job_id: int) -> None:
+    """Entrada para el pool de threads: cada thread usa (y cierra) su propia conexión."""
+    close_old_connections()
+    try:
+        run_job(Job.objects.get(pk=job_id))
+    finally:
+        connections.close_all()
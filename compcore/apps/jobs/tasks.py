@@ -0,0 +1,106 @@
+# compcore/apps/jobs/tasks.py
+"""
+Tareas disponibles para el worker. Cada una recibe (params, progress) y devuelve un dict JSON.
+Los servicios se importan dentro de cada tarea para no crear ciclos al cargar apps.
+"""
+from __future__ import annotations
+
+from io import StringIO
+from typing import Any, Dict
+
+from django.core.management import call_command
+
+from .services.queue import Progress, register
+
+
+@register("events.seed_all")
+def seed_all(params: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    """params: workout_ids, mode ("W1"|"W2P"), default_lane_count, strategy, pace_tolerance."""
+    from django.db.models import Count
+
+    from compcore.apps.events.models import Division, Workout
+    from compcore.apps.events.services.heats import seed_all_divisions_for_workout
+
+    workout_ids = list(params.get("workout_ids") or [])
+    workouts = list(Workout.objects.filter(pk__in=workout_ids).order_by("event_id", "order"))
+    divisions_by_event = dict(
+        Division.objects.filter(event_id__in={w.event_id for w in workouts})
+        .values("event_id").annotate(n=Count("id")).values_list("event_id", "n")
+    )
+    total = max(1, len(workouts))
+    out = []
+    for i, workout in enumerate(workouts):
+        label = f"W{workout.order} · {workout.name}"
+        progress(100 * i / total, label)
+        span = max(1, divisions_by_event.get(workout.event_id, 0))
+        seeded = [0]
+
+        # Cada división avanza su fracción del tramo de este workout
+        def on_division(division, summary, i=i, label=label, span=span, seeded=seeded):
+            seeded[0] += 1
+            progress(100 * (i + seeded[0] / span) / total, f"{label} · {division.name}")
+
+        res = seed_all_divisions_for_workout(
+            workout.id,
+            mode=params.get("mode", "W2P"),
+            default_lane_count=int(params.get("default_lane_count") or 0),
+            progress=on_division,
+            strategy=params.get("strategy", "rank"),
+            pace_tolerance=params.get("pace_tolerance", 1),
+        )
+        out.append({
+            "workout_id": workout.id,
+            "workout": f"W{workout.order}",
+            "heats_touched": res["heats_touched"],
+            "assignments": res["assignments"],
+            "divisions": res["divisions"],
+        })
+    return {"workouts": out}
+
+
+@register("leaderboard.rebuild_standings")
+def rebuild_standings_task(params: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    """params: event_ids (vacío = todos los eventos)."""
+    from compcore.apps.events.models import Event
+    from compcore.apps.leaderboard.services.standings import rebuild_standings
+
+    qs = Event.objects.all().order_by("id")
+    if params.get("event_ids"):
+        qs = qs.filter(pk__in=params["event_ids"])
+    events = list(qs)
+    totals: Dict[str, int] = {}
+    for i, event in enumerate(events):
+        progress(100 * i / max(1, len(events)), event.name)
+        for key, value in rebuild_standings(event).items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+@register("events.publish_snapshots")
+def publish_snapshots_task(params: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    """params: event_id, refs (None = todas las páginas del evento)."""
+    from compcore.apps.events.models import Event
+    from compcore.apps.events.services.snapshots import publish_event
+
+    event = Event.objects.filter(pk=params["event_id"]).first()
+    if event is None:
+        return {"skipped": "evento inexistente"}
+    progress(0, event.name)
+    return publish_event(event, params.get("refs"))
+
+
+@register("registration.import_teams_xlsx")
+def import_teams_xlsx_task(params: Dict[str, Any], progress: Progress) -> Dict[str, Any]:
+    """params: xlsx_path, event_slug, sheet, dry_run. El archivo debe ser legible por el worker."""
+    progress(0, params.get("xlsx_path", ""))
+    out = StringIO()
+    call_command(
+        "import_teams_xlsx",
+        params["xlsx_path"],
+        event_slug=params["event_slug"],
+        sheet=params.get("sheet"),
+        dry_run=bool(params.get("dry_run")),
+        stdout=out,
+        stderr=out,
+    )
+    return {"output": out.getvalue().splitlines()[-200:]}
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from compcore.apps.events.models import Division, Event, Workout
+from compcore.apps.jobs.models import Job
+from compcore.apps.jobs.services.queue import claim_next, enqueue, fail_stale, register, run_job
+from compcore.apps.registration.models import AthleteEntry
+
+User = get_user_model()
+
+
+@register("tests.echo")
+def _echo(params, progress):
+    progress(50, "mitad")
+    return {"echo": params.get("value")}
+
+
+@register("tests.boom")
+def _boom(params, progress):
+    raise RuntimeError("boom")
+
+
+class JobQueueTest(TestCase):
+    def test_claim_takes_oldest_once(self):
+        first = enqueue("tests.echo", {"value": 1})
+        second = enqueue("tests.echo", {"value": 2})
+        claimed = claim_next("w1")
+        self.assertEqual((claimed.pk, claimed.status, claimed.worker), (first.pk, Job.RUNNING, "w1"))
+        self.assertIsNotNone(claimed.started_at)
+        self.assertEqual(claim_next("w2").pk, second.pk)
+        self.assertIsNone(claim_next("w3"))
+
+    def test_claim_retries_next_candidate_when_another_worker_wins(self):
+        lost = enqueue("tests.echo")
+        won = enqueue("tests.echo")
+        raced = []
+
+        def other_worker(execute, sql, params, many, context):
+            # Justo antes del primer UPDATE condicional, otro worker toma el mismo job
+            if sql.startswith("UPDATE") and not raced:
+                raced.append(True)
+                Job.objects.filter(pk=lost.pk).update(status=Job.RUNNING, worker="other")
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(other_worker):
+            claimed = claim_next("me")
+        self.assertEqual(claimed.pk, won.pk)
+        self.assertEqual(Job.objects.get(pk=lost.pk).worker, "other")
+
+    def test_run_job_records_status(self):
+        enqueue("tests.echo")
+        ok = run_job(claim_next("w"))
+        self.assertEqual((ok.status, ok.progress, ok.result), (Job.DONE, 100, {"echo": None}))
+        self.assertIsNotNone(ok.finished_at)
+
+        enqueue("tests.boom")
+        failed = run_job(claim_next("w"))
+        self.assertEqual(failed.status, Job.FAILED)
+        self.assertIn("RuntimeError: boom", failed.error)
+        # Un fallo no vuelve a la cola
+        self.assertIsNone(claim_next("w"))
+
+        with self.assertRaises(ValueError):
+            enqueue("tests.unknown")
+
+    def test_stale_running_jobs_fail(self):
+        job = enqueue("tests.echo")
+        claim_next("w")
+        Job.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(minutes=45))
+        self.assertEqual(fail_stale(30), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertTrue(job.is_finished)
+
+    def test_status_json(self):
+        staff = User.objects.create(username="ops", is_staff=True)
+        job = enqueue("tests.echo", {"value": 3}, user=staff, label="Eco")
+        self.client.force_login(staff)
+        data = self.client.get(reverse("job_detail", args=[job.pk]), {"format": "json"}).json()
+        self.assertEqual((data["status"], data["label"], data["progress"]), (Job.QUEUED, "Eco", 0))
+        run_job(claim_next("w"))
+        data = self.client.get(reverse("job_detail", args=[job.pk]), {"format": "json"}).json()
+        self.assertEqual((data["status"], data["result"]), (Job.DONE, {"echo": 3}))
+
+
+class SeedAllTaskTest(TestCase):
+    def test_progress_per_division(self):
+        from compcore.apps.jobs.tasks import seed_all
+
+        event = Event.objects.create(name="Job Games", slug="job-games")
+        workout = Workout.objects.create(event=event, order=1, name="W1", scoring="TIME")
+        for n, name in enumerate(("Masters", "RX")):
+            division = Division.objects.create(event=event, name=name, slug=name.lower())
+            users = User.objects.bulk_create([User(username=f"{name}-{i}") for i in range(3 + n)])
+            AthleteEntry.objects.bulk_create([AthleteEntry(user=u, event=event, division=division) for u in users])
+
+        calls = []
+        out = seed_all({"workout_ids": [workout.id], "mode": "W1", "default_lane_count": 2},
+                       lambda pct, message="": calls.append((pct, message)))
+        self.assertEqual(calls, [(0, "W1 · W1"), (50, "W1 · W1 · Masters"), (100, "W1 · W1 · RX")])
+        self.assertEqual(out["workouts"][0]["assignments"], 7)
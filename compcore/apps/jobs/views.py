@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+
+from .models import Job
+
+
+@staff_member_required
+def job_list(request):
+    """Últimos trabajos; la página se refresca sola mientras haya algo en cola o ejecutándose."""
+    jobs = list(Job.objects.select_related("created_by")[:100])
+    if request.GET.get("format") == "json":
+        return JsonResponse({"jobs": [j.as_dict() for j in jobs]})
+    active = any(not j.is_finished for j in jobs)
+    return render(request, "jobs/list.html", {"jobs": jobs, "active": active})
+
+
+@staff_member_required
+def job_detail(request, pk: int):
+    job = get_object_or_404(Job, pk=pk)
+    if request.GET.get("format") == "json":
+        return JsonResponse(job.as_dict())
+    return render(request, "jobs/detail.html", {"job": job})
@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, post_save
 
 
 def ensure_judges_group(sender, **kwargs):
@@ -8,10 +8,22 @@ def ensure_judges_group(sender, **kwargs):
     Group.objects.get_or_create(name="judges")
 
 
+def ensure_heat_lanes(sender, instance, raw=False, **kwargs):
+    # Filas HeatResult vacías al crear/agrandar un heat y fuera las sobrantes al achicarlo
+    # (los bulk_create/bulk_update de la siembra llaman a estos servicios directamente)
+    if raw:
+        return
+    from .services.lanes import ensure_lane_rows, trim_lane_rows
+    if not kwargs.get("created"):
+        trim_lane_rows([instance])
+    ensure_lane_rows([instance])
+
+
 class JudgingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'compcore.apps.judging'
 
     def ready(self):
         # Conectamos el hook post_migrate una sola vez
-        post_migrate.connect(ensure_judges_group, dispatch_uid="judging.ensure_judges_group")
\ No newline at end of file
+        post_migrate.connect(ensure_judges_group, dispatch_uid="judging.ensure_judges_group")
+        post_save.connect(ensure_heat_lanes, sender="events.WorkoutHeat", dispatch_uid="judging.ensure_heat_lanes")
\ No newline at end of file
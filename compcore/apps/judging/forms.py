@@ -68,6 +68,7 @@ class LaneResultForm(forms.ModelForm):
         # No incluimos FKs de participante: team/athlete_entry se definen por la asignación del lane
         fields = [
             "id",            # IMPORTANTE: oculto para formset (edición)
+            "version",       # oculto: versión que vio el juez (concurrencia optimista)
             "lane",          # mostrado solo lectura
             "time_display",  # -> time_seconds
             "reps",
@@ -80,6 +81,7 @@ class LaneResultForm(forms.ModelForm):
         ]
         widgets = {
             "id": forms.HiddenInput(),
+            "version": forms.HiddenInput(),
             "lane": forms.NumberInput(attrs={"readonly": True, "class": "rf-input rf-input--sm"}),
             "reps": forms.NumberInput(attrs={"min": 0, "step": 1, "class": "rf-input rf-input--sm"}),
             "weight_kg": forms.NumberInput(attrs={"min": 0, "step": "0.5", "class": "rf-input rf-input--sm"}),
@@ -114,6 +116,10 @@ class LaneResultForm(forms.ModelForm):
         # Mostrar lane como lectura (pero viajará en POST)
         self.fields["lane"].disabled = True
 
+    def has_changed(self):
+        # La versión no es un dato del lane: si el juez reenvía los mismos valores no hay conflicto
+        return any(name != "version" for name in self.changed_data)
+
     # --------- Cleans: convertir strings a segundos ----------
     def clean_time_display(self):
         val = self.cleaned_data.get("time_display")
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.24 on 2026-10-17 04:17
+
+from django.db import migrations, models
+
+
+# Copia congelada de leaderboard.services.ranking.rank_key tal como era al crear el campo: la
+# migración no debe cambiar si la fórmula viva cambia (refresh_rank_keys recalcula con la vigente).
+_PEN_SPAN = 1000
+_TIME_SPAN = 10**6
+_REPS_SPAN = 10**9
+_CENTS_SPAN = 10**8
+
+
+def _clamp(value, span):
+    return min(max(int(value), 0), span - 1)
+
+
+def rank_key(scoring, time_seconds, reps, weight_kg, penalties, tiebreak_seconds, lane):
+    pen = _clamp((penalties or 0) + _PEN_SPAN // 2, _PEN_SPAN)
+    if scoring == 'TIME':
+        t = _TIME_SPAN - 1 if time_seconds is None else _clamp(time_seconds, _TIME_SPAN - 1)
+        tb = _TIME_SPAN - 1 if tiebreak_seconds is None else _clamp(tiebreak_seconds, _TIME_SPAN - 1)
+        return (t * _TIME_SPAN + tb) * _PEN_SPAN + pen
+    if scoring in ('REPS', 'POINTS'):
+        return (_REPS_SPAN - 1 - _clamp(reps or 0, _REPS_SPAN)) * _PEN_SPAN + pen
+    if scoring == 'WEIGHT':
+        cents = round((weight_kg or 0) * 100)
+        return (_CENTS_SPAN - 1 - _clamp(cents, _CENTS_SPAN)) * _PEN_SPAN + pen
+    return lane or 10**6
+
+
+def backfill_rank_keys(apps, schema_editor):
+    HeatResult = apps.get_model('judging', 'HeatResult')
+    db = schema_editor.connection.alias
+
+    rows = HeatResult.objects.using(db).values_list(
+        'id', 'heat__workout__scoring', 'time_seconds', 'reps', 'weight_kg', 'penalties', 'tiebreak_seconds', 'lane',
+    )
+    HeatResult.objects.using(db).bulk_update(
+        [HeatResult(pk=pk, rank_key=rank_key(*values)) for pk, *values in rows.iterator()],
+        ['rank_key'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('judging', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='heatresult',
+            name='rank_key',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='heatresult',
+            index=models.Index(fields=['heat', 'rank_key'], name='judging_hr_rank_idx'),
+        ),
+        migrations.RunPython(backfill_rank_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.24 on 2026-10-17 09:02
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+# Copia congelada de leaderboard.services.ranking.rank_key (igual que en 0002): la migración no
+# debe cambiar si la fórmula viva cambia.
+_PEN_SPAN = 1000
+_TIME_SPAN = 10**6
+_REPS_SPAN = 10**9
+_CENTS_SPAN = 10**8
+
+
+def _clamp(value, span):
+    return min(max(int(value), 0), span - 1)
+
+
+def rank_key(scoring, time_seconds, reps, weight_kg, penalties, tiebreak_seconds, lane):
+    pen = _clamp((penalties or 0) + _PEN_SPAN // 2, _PEN_SPAN)
+    if scoring == 'TIME':
+        t = _TIME_SPAN - 1 if time_seconds is None else _clamp(time_seconds, _TIME_SPAN - 1)
+        tb = _TIME_SPAN - 1 if tiebreak_seconds is None else _clamp(tiebreak_seconds, _TIME_SPAN - 1)
+        return (t * _TIME_SPAN + tb) * _PEN_SPAN + pen
+    if scoring in ('REPS', 'POINTS'):
+        return (_REPS_SPAN - 1 - _clamp(reps or 0, _REPS_SPAN)) * _PEN_SPAN + pen
+    if scoring == 'WEIGHT':
+        cents = round((weight_kg or 0) * 100)
+        return (_CENTS_SPAN - 1 - _clamp(cents, _CENTS_SPAN)) * _PEN_SPAN + pen
+    return lane or 10**6
+
+
+def backfill_versions_and_lanes(apps, schema_editor):
+    # Filas existentes con algo cargado (marca, juez o notas) → versión 1 (se siguen mostrando en
+    # /results/). Las filas vacías que abrió el editor quedan en 0, como un lane sin cargar.
+    # Heats sin filas: lanes vacíos (versión 0), como los crea ahora ensure_lane_rows() al crear el heat.
+    HeatResult = apps.get_model('judging', 'HeatResult')
+    WorkoutHeat = apps.get_model('events', 'WorkoutHeat')
+    db = schema_editor.connection.alias
+
+    HeatResult.objects.using(db).filter(
+        Q(time_seconds__isnull=False)
+        | Q(reps__isnull=False)
+        | Q(weight_kg__isnull=False)
+        | ~Q(judge_name='')
+        | ~Q(notes='')
+    ).update(version=1)
+    existing = set(HeatResult.objects.using(db).values_list('heat_id', 'lane'))
+    missing = [
+        HeatResult(heat_id=heat_id, lane=lane, rank_key=rank_key(scoring, None, None, None, 0, None, lane))
+        for heat_id, lane_count, scoring in WorkoutHeat.objects.using(db).values_list(
+            'id', 'lane_count', 'workout__scoring'
+        ).iterator()
+        for lane in range(1, (lane_count or 0) + 1)
+        if (heat_id, lane) not in existing
+    ]
+    HeatResult.objects.using(db).bulk_create(missing, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('judging', '0002_heatresult_rank_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='heatresult',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_versions_and_lanes, migrations.RunPython.noop),
+    ]
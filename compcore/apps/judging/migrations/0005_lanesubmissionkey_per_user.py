@@ -0,0 +1,22 @@
+# Generated by Django 4.2.24 on 2026-10-17 04:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('judging', '0004_lanesubmissionkey'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lanesubmissionkey',
+            name='key',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='lanesubmissionkey',
+            constraint=models.UniqueConstraint(fields=('user', 'key'), name='uniq_lanekey_user_key'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+from django.db.models import F
+
+# Copia congelada de leaderboard.services.ranking._STATUS_STEP: DNF/DNS/DQ van detrás de las marcas OK
+_STATUS_STEP = 10**16
+
+
+def forwards(apps, schema_editor):
+    HeatResult = apps.get_model("judging", "HeatResult")
+    HeatResult.objects.exclude(status="OK").filter(rank_key__isnull=False).update(
+        rank_key=F("rank_key") + _STATUS_STEP
+    )
+
+
+def backwards(apps, schema_editor):
+    HeatResult = apps.get_model("judging", "HeatResult")
+    HeatResult.objects.filter(rank_key__gte=_STATUS_STEP).update(rank_key=F("rank_key") - _STATUS_STEP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("judging", "0005_lanesubmissionkey_per_user"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
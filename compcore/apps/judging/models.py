@@ -1,6 +1,7 @@
 # compcore/apps/judging/models.py
 from __future__ import annotations
 
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
@@ -42,6 +43,12 @@ class HeatResult(models.Model):
     penalties = models.IntegerField(default=0)
     tiebreak_seconds = models.PositiveIntegerField(null=True, blank=True, help_text="Tie-break en segundos.")
     status = models.CharField(max_length=3, choices=STATUS_CHOICES, default="OK")
+    # Clave de orden según el scoring del WOD (menor = mejor), ver leaderboard.services.ranking.rank_key.
+    # Se recalcula en save(); las escrituras en bloque deben llamar a refresh_rank_keys().
+    rank_key = models.BigIntegerField(null=True, blank=True, editable=False)
+    # Concurrencia optimista: sube con cada guardado; el editor por heat rechaza el lane si el juez
+    # envió una versión vieja (ver services/lanes.py).
+    version = models.PositiveIntegerField(default=0)
 
     judge_name = models.CharField(max_length=120, blank=True, default="")
     notes = models.TextField(blank=True, default="")
@@ -52,7 +59,53 @@ class HeatResult(models.Model):
     class Meta:
         unique_together = (("heat", "lane"),)
         ordering = ("heat_id", "lane")
+        indexes = [
+            models.Index(fields=("heat", "rank_key"), name="judging_hr_rank_idx"),
+        ]
 
     def __str__(self) -> str:
         who = self.team or self.athlete_entry
-        return f"{self.heat} · Lane {self.lane} · {who or '—'}"
\ No newline at end of file
+        return f"{self.heat} · Lane {self.lane} · {who or '—'}"
+
+    def _scoring(self):
+        heat = self.heat if type(self).heat.is_cached(self) else None
+        if heat is not None and type(heat).workout.is_cached(heat):
+            return heat.workout.scoring
+        from compcore.apps.events.models import WorkoutHeat
+
+        return WorkoutHeat.objects.filter(pk=self.heat_id).values_list("workout__scoring", flat=True).first()
+
+    def save(self, *args, **kwargs):
+        from compcore.apps.leaderboard.services.ranking import rank_key
+
+        self.rank_key = rank_key(
+            self._scoring(), self.time_seconds, self.reps, self.weight_kg,
+            self.penalties, self.tiebreak_seconds, self.lane, self.status,
+        )
+        if not self._state.adding:
+            self.version = (self.version or 0) + 1
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | {"rank_key", "version"}
+        super().save(*args, **kwargs)
+
+
+class LaneSubmissionKey(models.Model):
+    """
+    Clave de idempotencia de la API de carga por lotes (services/batch.py): la primera vez que llega
+    una clave se guarda el desenlace del ítem; los reintentos con la misma clave devuelven ese
+    desenlace sin volver a escribir. Las claves las genera cada tablet: son únicas por usuario.
+    """
+    key = models.CharField(max_length=64)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    heat_result = models.ForeignKey(HeatResult, on_delete=models.CASCADE, null=True, blank=True, related_name="+")
+    outcome = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("user", "key"), name="uniq_lanekey_user_key"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.key} · {self.outcome.get('status', '?')}"
\ No newline at end of file
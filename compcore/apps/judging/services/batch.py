@@ -0,0 +1,196 @@
+# compcore/apps/judging/services/batch.py
+"""
+Carga de resultados por lotes (API JSON para tablets de jueces).
+
+Cada ítem es un lane de un heat con su clave de idempotencia:
+    {"key": "tab3-000123", "heat": 41, "lane": 3, "version": 2,
+     "time": "05:30", "tiebreak": "", "reps": null, "weight_kg": null,
+     "penalties": 0, "status": "OK", "judge_name": "Ana", "notes": ""}
+- Se valida con LaneResultForm (mismas reglas que el editor por heat).
+- `version` es la que vio el juez (export del roster); si falta, se toma la vigente (sin control).
+- Se escribe con save_lane_results(): un bulk_update por heat y rechazo por lane si la versión es vieja.
+- El desenlace de cada clave se guarda (LaneSubmissionKey, única por usuario) en la misma transacción
+  que la escritura, y las claves se vuelven a buscar dentro de ella con el heat bloqueado: un reintento
+  con la misma clave, aunque llegue en paralelo, devuelve ese desenlace y no escribe nada. Vale
+  también para los ítems inválidos: corregir un ítem requiere una clave nueva.
+Desenlaces: ok | unchanged | conflict | invalid | not_found.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+
+from compcore.apps.events.models import HeatAssignment, WorkoutHeat
+from compcore.apps.leaderboard.services.standings import refresh_standings
+
+from ..forms import LaneResultForm
+from ..models import HeatResult, LaneSubmissionKey
+from .lanes import save_lane_results
+
+MAX_ITEMS = 200
+
+# clave JSON → campo de LaneResultForm
+FIELD_MAP = {
+    "time": "time_display",
+    "tiebreak": "tiebreak_display",
+    "reps": "reps",
+    "weight_kg": "weight_kg",
+    "penalties": "penalties",
+    "status": "status",
+    "judge_name": "judge_name",
+    "notes": "notes",
+}
+
+
+class BatchError(ValueError):
+    """El lote completo es inválido (forma del JSON, tamaño): se responde 400 sin escribir nada."""
+
+
+def _int(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_items(items: Any) -> List[Dict[str, Any]]:
+    if not isinstance(items, list) or not items:
+        raise BatchError("'items' debe ser una lista no vacía")
+    if len(items) > MAX_ITEMS:
+        raise BatchError(f"Máximo {MAX_ITEMS} ítems por lote")
+    keys = set()
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise BatchError(f"items[{i}] debe ser un objeto")
+        key = item.get("key")
+        if not isinstance(key, str) or not 0 < len(key) <= 64:
+            raise BatchError(f"items[{i}].key debe ser un texto de 1 a 64 caracteres")
+        if key in keys:
+            raise BatchError(f"items[{i}].key repetida en el lote")
+        keys.add(key)
+    return items
+
+
+def _form_data(item: Dict[str, Any], row: HeatResult) -> Dict[str, Any]:
+    data = {field: item.get(name) for name, field in FIELD_MAP.items()}
+    data = {k: ("" if v is None else v) for k, v in data.items()}
+    if data["penalties"] == "":
+        data["penalties"] = 0
+    if not data["status"]:
+        data["status"] = "OK"
+    version = item.get("version")
+    data["version"] = row.version if version is None else version
+    return data
+
+
+def _outcome(item: Dict[str, Any], status: str, **extra) -> Dict[str, Any]:
+    return dict({"key": item["key"], "heat": item.get("heat"), "lane": item.get("lane"), "status": status}, **extra)
+
+
+def submit_batch(items: Any, user=None, event=None) -> List[Dict[str, Any]]:
+    """
+    Procesa el lote y devuelve un desenlace por ítem, en el mismo orden.
+    Con `event`, los heats de otros eventos cuentan como inexistentes (sync de la página offline).
+    """
+    items = _parse_items(items)
+    owner = user if getattr(user, "is_authenticated", False) else None
+    user_keys = LaneSubmissionKey.objects.filter(user=owner)
+
+    replayed = dict(user_keys.filter(key__in=[it["key"] for it in items]).values_list("key", "outcome"))
+    pending = [it for it in items if it["key"] not in replayed]
+
+    heat_ids = {_int(it.get("heat")) for it in pending} - {None}
+    heats_qs = WorkoutHeat.objects.filter(pk__in=heat_ids).select_related("workout", "division")
+    if event is not None:
+        heats_qs = heats_qs.filter(workout__event=event)
+    heats = {h.pk: h for h in heats_qs}
+    rows: Dict[Tuple[int, int], HeatResult] = {
+        (r.heat_id, r.lane): r for r in HeatResult.objects.filter(heat_id__in=list(heats))
+    }
+    assigned = {
+        (heat_id, lane): (team_id, entry_id)
+        for heat_id, lane, team_id, entry_id in HeatAssignment.objects.filter(
+            heat_id__in=list(heats), lane__isnull=False
+        ).values_list("heat_id", "lane", "team_id", "athlete_entry_id")
+    }
+
+    outcomes: Dict[str, Dict[str, Any]] = {}
+    edited: Dict[int, List[Tuple[Dict[str, Any], HeatResult]]] = {}
+    seen_lanes = set()
+    for item in pending:
+        slot = (_int(item.get("heat")), _int(item.get("lane")))
+        row = rows.get(slot)
+        if row is None:
+            outcomes[item["key"]] = _outcome(item, "not_found", errors={"__all__": ["Heat/lane inexistente."]})
+            continue
+        if slot in seen_lanes:
+            outcomes[item["key"]] = _outcome(
+                item, "invalid", errors={"__all__": ["Lane repetido en el lote: enviar solo la última carga."]}
+            )
+            continue
+        seen_lanes.add(slot)
+
+        form = LaneResultForm(data=_form_data(item, row), instance=row)
+        if not form.is_valid():
+            outcomes[item["key"]] = _outcome(item, "invalid", errors=form.errors.get_json_data())
+            continue
+        if not form.has_changed():
+            outcomes[item["key"]] = _outcome(item, "unchanged", version=row.version)
+            continue
+        inst = form.save(commit=False)
+        inst.team_id, inst.athlete_entry_id = assigned.get(slot, (inst.team_id, inst.athlete_entry_id))
+        edited.setdefault(row.heat_id, []).append((item, inst))
+
+    def store(done: List[Dict[str, Any]]) -> None:
+        LaneSubmissionKey.objects.bulk_create(
+            [LaneSubmissionKey(key=o["key"], user=owner, heat_result_id=o.pop("_row", None), outcome=o)
+             for o in done],
+            ignore_conflicts=True,  # misma clave en dos pedidos simultáneos: gana la primera
+        )
+
+    touched = set()
+    for heat_id, pairs in edited.items():
+        heat = heats[heat_id]
+        with transaction.atomic():
+            # Con el heat bloqueado, un pedido paralelo con las mismas claves ya guardó o espera
+            WorkoutHeat.objects.select_for_update().filter(pk=heat_id).values_list("pk", flat=True).first()
+            stored_now = dict(
+                user_keys.filter(key__in=[item["key"] for item, _ in pairs]).values_list("key", "outcome")
+            )
+            replayed.update(stored_now)
+            pairs = [(item, inst) for item, inst in pairs if item["key"] not in stored_now]
+            saved, conflicts = save_lane_results(heat, heat.workout.scoring, [inst for _, inst in pairs])
+            saved_ids = {r.pk for r in saved}
+            current = {}
+            if conflicts:  # versión vigente, para que la tablet sepa contra qué re-cargar
+                current = dict(HeatResult.objects.filter(pk__in=[r.pk for r in conflicts]).values_list("id", "version"))
+            done = []
+            for item, inst in pairs:
+                if inst.pk in saved_ids:
+                    outcomes[item["key"]] = _outcome(item, "ok", version=inst.version)
+                else:
+                    outcomes[item["key"]] = _outcome(item, "conflict", version=current.get(inst.pk))
+                done.append(dict(outcomes[item["key"]], _row=inst.pk))
+            store(done)
+        if saved:
+            touched.add((heat.workout, heat.division))
+
+    store([o for key, o in outcomes.items() if o["status"] in ("invalid", "not_found", "unchanged")])
+
+    # Re-rankear una vez por (workout, división) tocado
+    for workout, division in touched:
+        refresh_standings(workout, division)
+
+    # Con claves que otro pedido guardó primero, vale el desenlace guardado
+    stored = dict(user_keys.filter(key__in=list(outcomes)).values_list("key", "outcome"))
+    result = []
+    for item in items:
+        key = item["key"]
+        if key in replayed:
+            result.append(dict(replayed[key], replay=True))
+        else:
+            result.append(stored.get(key, outcomes[key]))
+    return result
@@ -0,0 +1,128 @@
+# compcore/apps/judging/services/lanes.py
+"""
+Escritura de resultados por lane.
+
+- ensure_lane_rows(): crea las filas HeatResult vacías 1..lane_count UNA vez, al crear (o agrandar)
+  el heat; el editor ya no escribe nada en los GET.
+- trim_lane_rows(): al achicar un heat borra las filas vacías por encima de lane_count; si alguna
+  ya tiene resultado, rechaza el cambio (LaneShrinkError) sin borrar nada.
+- save_lane_results(): guarda los lanes editados con control de concurrencia optimista
+  (HeatResult.version). Cada lane viaja con la versión que vio el juez; si otro juez guardó ese lane
+  antes, ese lane se rechaza (no pisa datos más nuevos) y el resto se guarda igual.
+  Son dos sentencias dentro de una transacción corta: un UPDATE condicional que reclama los lanes
+  vigentes (y toma el lock de escritura, como en events.services.heat_numbers) y un bulk_update.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, Sequence, Tuple
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from compcore.apps.events.models import WorkoutHeat
+from compcore.apps.events.services.results_version import bump_for_heat
+from compcore.apps.leaderboard.services.ranking import rank_key
+
+from ..models import HeatResult
+
+# Campos que escribe el editor (además de version/rank_key/updated_at)
+LANE_FIELDS = (
+    "team", "athlete_entry", "time_seconds", "reps", "weight_kg", "penalties",
+    "tiebreak_seconds", "status", "judge_name", "notes",
+)
+
+
+def filled_lane(prefix: str = "") -> Q:
+    """Lane con resultado: guardado por un juez o con marca cargada. `prefix` para filtrar desde
+    otra tabla, p.ej. filled_lane("results__") sobre WorkoutHeat."""
+    return (
+        Q(**{f"{prefix}version__gt": 0})
+        | Q(**{f"{prefix}time_seconds__isnull": False})
+        | Q(**{f"{prefix}reps__isnull": False})
+        | Q(**{f"{prefix}weight_kg__isnull": False})
+    )
+
+
+FILLED_LANE = filled_lane()
+
+
+class LaneShrinkError(ValueError):
+    """Bajar lane_count dejaría afuera lanes que ya tienen resultados."""
+
+
+def ensure_lane_rows(heats: Iterable) -> int:
+    """Filas vacías para los lanes 1..lane_count que falten (2 lecturas + 1 INSERT para todos los heats)."""
+    heats = [h for h in heats if h.pk and h.lane_count]
+    if not heats:
+        return 0
+    existing = set(
+        HeatResult.objects.filter(heat_id__in=[h.pk for h in heats]).values_list("heat_id", "lane")
+    )
+    scoring = dict(WorkoutHeat.objects.filter(pk__in=[h.pk for h in heats]).values_list("id", "workout__scoring"))
+    missing = [
+        HeatResult(
+            heat_id=h.pk, lane=lane,
+            rank_key=rank_key(scoring.get(h.pk), None, None, None, 0, None, lane),
+        )
+        for h in heats
+        for lane in range(1, h.lane_count + 1)
+        if (h.pk, lane) not in existing
+    ]
+    # ignore_conflicts: dos procesos creando el mismo heat no chocan con unique (heat, lane)
+    HeatResult.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+    return len(missing)
+
+
+def trim_lane_rows(heats: Iterable) -> int:
+    """Borra las filas por encima de lane_count de cada heat (1 lectura + 1 DELETE); devuelve cuántas."""
+    heats = [h for h in heats if h.pk and h.lane_count]
+    if not heats:
+        return 0
+    above = Q()
+    for h in heats:
+        above |= Q(heat_id=h.pk, lane__gt=h.lane_count)
+    rows = HeatResult.objects.filter(above)
+    blocked = list(rows.filter(FILLED_LANE).order_by("heat_id", "lane").values_list("heat__heat_number", "lane"))
+    if blocked:
+        lanes = ", ".join(f"heat #{number} lane {lane}" for number, lane in blocked)
+        raise LaneShrinkError(f"No se puede achicar el heat: {lanes} ya tiene(n) resultados.")
+    deleted, _ = rows.delete()
+    return deleted
+
+
+def _claim(heat_id: int, seen: Sequence[Tuple[int, int]]) -> List[int]:
+    """
+    version += 1 en los lanes cuya versión sigue siendo la vista por el juez; devuelve sus ids.
+    select_for_update bloquea los lanes hasta el commit: dos envíos del mismo lane no pasan ambos.
+    """
+    expected = dict(seen)
+    current = HeatResult.objects.select_for_update().filter(heat_id=heat_id, pk__in=list(expected))
+    ok = [pk for pk, version in current.values_list("id", "version") if expected[pk] == version]
+    HeatResult.objects.filter(pk__in=ok).update(version=F("version") + 1)
+    return ok
+
+
+def save_lane_results(heat, scoring: str, edited: Sequence[HeatResult]) -> Tuple[List[HeatResult], List[HeatResult]]:
+    """
+    `edited`: instancias con los valores nuevos y, en .version, la versión que vio el juez.
+    Devuelve (guardados, en conflicto). Los guardados quedan con su versión nueva.
+    """
+    if not edited:
+        return [], []
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = set(_claim(heat.pk, [(r.pk, r.version) for r in edited]))
+        saved = [r for r in edited if r.pk in claimed]
+        for r in saved:
+            r.version += 1
+            r.updated_at = now
+            if r.penalties is None:
+                r.penalties = 0
+            r.rank_key = rank_key(
+                scoring, r.time_seconds, r.reps, r.weight_kg, r.penalties, r.tiebreak_seconds, r.lane, r.status,
+            )
+        HeatResult.objects.bulk_update(saved, LANE_FIELDS + ("rank_key", "updated_at"))
+        if saved:
+            bump_for_heat(heat.pk)  # bulk_update no dispara señales
+    return saved, [r for r in edited if r.pk not in claimed]
@@ -0,0 +1,63 @@
+# compcore/apps/judging/services/progress.py
+"""
+Avance de carga por heat para el dashboard de jueces, en UNA consulta agrupada (heats LEFT JOIN
+lanes, GROUP BY heat): lanes cargados, vacíos y con problema (DNF/DQ) y última actualización.
+
+Un lane cuenta como cargado si algún juez lo guardó (version > 0) o si ya tiene marca; las filas
+vacías 1..lane_count existen desde que se creó el heat (services/lanes.ensure_lane_rows).
+"""
+from __future__ import annotations
+
+from typing import Dict, List
+
+from django.db.models import Count, Max, Q
+
+from compcore.apps.events.models import WorkoutHeat
+
+from .lanes import filled_lane
+
+PROBLEM_STATUSES = ("DNF", "DQ")
+
+# Misma regla que lanes.FILLED_LANE, vista desde el heat
+FILLED = filled_lane("results__")
+
+
+def heat_progress(event, division=None) -> List[WorkoutHeat]:
+    """
+    Heats del evento (opcionalmente de una división) por WOD y número, cada uno con
+    .lanes_total, .lanes_filled, .lanes_empty, .lanes_problem, .last_updated y .progress
+    ("done" | "partial" | "pending").
+    """
+    qs = WorkoutHeat.objects.filter(workout__event=event)
+    if division is not None:
+        qs = qs.filter(division=division)
+    heats = list(
+        qs.select_related("workout", "division")
+        .annotate(
+            lanes_total=Count("results"),
+            lanes_filled=Count("results", filter=FILLED),
+            lanes_problem=Count("results", filter=Q(results__status__in=PROBLEM_STATUSES)),
+            last_updated=Max("results__updated_at", filter=FILLED),
+        )
+        .order_by("workout__order", "heat_number")
+    )
+    for h in heats:
+        h.lanes_empty = h.lanes_total - h.lanes_filled
+        if h.lanes_filled and not h.lanes_empty:
+            h.progress = "done"
+        elif h.lanes_filled:
+            h.progress = "partial"
+        else:
+            h.progress = "pending"
+    return heats
+
+
+def progress_by_workout(heats: List[WorkoutHeat]) -> Dict[int, Dict[str, int]]:
+    """Totales por WOD (workout.order): heats completos / con carga / sin carga."""
+    totals: Dict[int, Dict[str, int]] = {}
+    for h in heats:
+        t = totals.setdefault(h.workout.order, {"heats": 0, "done": 0, "partial": 0, "pending": 0, "problem": 0})
+        t["heats"] += 1
+        t[h.progress] += 1
+        t["problem"] += h.lanes_problem
+    return totals
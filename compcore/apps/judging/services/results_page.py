@@ -0,0 +1,114 @@
+# compcore/apps/judging/services/results_page.py
+"""
+Bloques HTML por heat para la página pública de resultados (views.results_event).
+
+- La página es un WOD y una página de heats por vez; la vista arma el esqueleto y transmite los
+  bloques a medida que salen (StreamingHttpResponse), sin juntar todo el evento en memoria.
+- Cada bloque se guarda en caché con una clave que cambia con la última actualización del heat
+  (máx. updated_at, suma de versiones y cantidad de lanes) y con su encabezado (WOD, número de heat,
+  división): un juez que guarda un heat solo obliga a re-renderizar ese bloque; el resto de la
+  página sale de la caché. Renombrar la división también invalida sus bloques.
+- Los lanes faltantes se leen en UNA consulta con .iterator(), ya ordenados en la BD (estado OK
+  primero, luego rank_key: la misma clave del leaderboard), sin ordenar en Python.
+"""
+from __future__ import annotations
+
+import zlib
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Max, Sum, Value, When
+from django.template.loader import render_to_string
+
+from ..forms import format_seconds
+from ..models import HeatResult
+
+HEATS_PER_PAGE = 12
+BLOCK_TTL = 60 * 60 * 6  # segundos; la clave ya cambia con el heat, el TTL solo limpia
+BLOCK_TEMPLATE = "judging/_public_results_heat.html"
+
+ROW_FIELDS = (
+    "heat_id", "lane", "time_seconds", "reps", "weight_kg", "tiebreak_seconds", "penalties", "status",
+    "judge_name", "notes", "team__name", "athlete_entry__user__first_name",
+    "athlete_entry__user__last_name", "athlete_entry__user__username",
+)
+
+
+def _header(heat: Any, workout: Any) -> str:
+    """Lo que el bloque muestra del heat fuera de sus lanes (WorkoutHeat/Division no tienen updated_at)."""
+    return f"{workout.order}|{heat.heat_number}|{heat.division.name}"
+
+
+def block_keys(heats: List[Any], workout: Any) -> Dict[int, str]:
+    """Clave de caché de cada heat según su última actualización (una consulta agrupada) y su encabezado."""
+    stamps = {
+        row["heat_id"]: row
+        for row in HeatResult.objects.filter(heat_id__in=[h.id for h in heats])
+        .values("heat_id")
+        .annotate(last=Max("updated_at"), versions=Sum("version"), lanes=Count("id"))
+        .order_by()
+    }
+    keys = {}
+    for h in heats:
+        s = stamps.get(h.id) or {}
+        last = s["last"].timestamp() if s.get("last") else 0
+        header = zlib.crc32(_header(h, workout).encode())
+        keys[h.id] = f"results-heat:{h.id}:{header}:{last}:{s.get('versions', 0)}:{s.get('lanes', 0)}"
+    return keys
+
+
+def _participant(r: Dict[str, Any]) -> str:
+    if r["team__name"]:
+        return f"Equipo: {r['team__name']}"
+    if r["athlete_entry__user__username"]:
+        full = f"{r['athlete_entry__user__first_name']} {r['athlete_entry__user__last_name']}".strip()
+        return f"Atleta: {full or r['athlete_entry__user__username']}"
+    return "—"
+
+
+def _row(r: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "lane": r["lane"],
+        "participant": _participant(r),
+        "time_display": format_seconds(r["time_seconds"]),
+        "reps": r["reps"],
+        "weight_kg": r["weight_kg"],
+        "tiebreak_display": format_seconds(r["tiebreak_seconds"]),
+        "penalties": r["penalties"] or 0,
+        "status": r["status"],
+        "judge_name": r["judge_name"],
+        "notes": r["notes"],
+    }
+
+
+def _rows_by_heat(heat_ids: List[int]) -> Iterator[Tuple[int, Iterable[Dict[str, Any]]]]:
+    qs = (
+        HeatResult.objects.filter(heat_id__in=heat_ids)
+        .annotate(bad=Case(When(status="OK", then=Value(0)), default=Value(1), output_field=IntegerField()))
+        .order_by("-heat__heat_number", "bad", "rank_key", "lane")
+        .values_list(*ROW_FIELDS)
+    )
+    dicts = (dict(zip(ROW_FIELDS, row)) for row in qs.iterator(chunk_size=500))
+    return groupby(dicts, key=lambda r: r["heat_id"])
+
+
+def heat_blocks(heats: List[Any], workout: Any) -> Iterator[str]:
+    """HTML de cada heat en el orden de `heats` (mismo WOD, heat_number DESC): caché o render."""
+    keys = block_keys(heats, workout)
+    cached = cache.get_many(list(keys.values()))
+    missing = [h.id for h in heats if keys[h.id] not in cached]
+    groups = _rows_by_heat(missing) if missing else iter(())
+    pending = next(groups, None)
+    for heat in heats:
+        key = keys[heat.id]
+        if key in cached:
+            yield cached[key]
+            continue
+        rows: List[Dict[str, Any]] = []
+        if pending is not None and pending[0] == heat.id:
+            rows = [_row(r) for r in pending[1]]
+            pending = next(groups, None)
+        html = render_to_string(BLOCK_TEMPLATE, {"workout": workout, "heat": heat, "rows": rows})
+        cache.set(key, html, BLOCK_TTL)
+        yield html
@@ -0,0 +1,89 @@
+# compcore/apps/judging/services/roster.py
+"""
+Roster del evento para la página offline de jueces (templates/judging/offline.html).
+
+- export_roster(): heats del evento con sus lanes (participante asignado + valores y versión
+  vigentes). La tablet lo guarda en IndexedDB y carga resultados sin red.
+- lane_state(): solo los lanes (valores + versión) de unos heats; es lo que devuelve el sync para
+  que la tablet se ponga al día después de mandar su lote.
+Tres consultas en total (heats, lanes, asignaciones), sin lookups por fila. Los campos de cada lane
+usan los mismos nombres que los ítems de services/batch.py, así la tablet reenvía lo que recibió.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db.models.functions import Coalesce
+
+from compcore.apps.events.models import HeatAssignment, WorkoutHeat
+
+from ..forms import format_seconds
+from ..models import HeatResult
+
+
+def _lanes(heat_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    names = {
+        (heat_id, lane): name
+        for heat_id, lane, name in HeatAssignment.objects.filter(heat_id__in=heat_ids, lane__isnull=False)
+        .annotate(entrant=Coalesce("team__name", "athlete_entry__user__username"))
+        .values_list("heat_id", "lane", "entrant")
+    }
+    lanes: Dict[int, List[Dict[str, Any]]] = {heat_id: [] for heat_id in heat_ids}
+    for r in (
+        HeatResult.objects.filter(heat_id__in=heat_ids)
+        .order_by("heat_id", "lane")
+        .values("heat_id", "lane", "version", "time_seconds", "tiebreak_seconds", "reps", "weight_kg",
+                "penalties", "status", "judge_name", "notes", "updated_at")
+    ):
+        lanes[r["heat_id"]].append({
+            "lane": r["lane"],
+            "entrant": names.get((r["heat_id"], r["lane"]), ""),
+            "version": r["version"],
+            "time": format_seconds(r["time_seconds"]),
+            "tiebreak": format_seconds(r["tiebreak_seconds"]),
+            "reps": r["reps"],
+            "weight_kg": None if r["weight_kg"] is None else str(r["weight_kg"]),
+            "penalties": r["penalties"] or 0,
+            "status": r["status"],
+            "judge_name": r["judge_name"],
+            "notes": r["notes"],
+            "updated_at": r["updated_at"].isoformat() if r["updated_at"] else None,
+        })
+    return lanes
+
+
+def lane_state(event, heat_ids: Iterable[int]) -> Dict[str, List[Dict[str, Any]]]:
+    """{heat_id (texto, como en JSON): [lanes]} solo para heats de este evento."""
+    ids = list(
+        WorkoutHeat.objects.filter(workout__event=event, pk__in=list(heat_ids)).values_list("id", flat=True)
+    )
+    return {str(heat_id): lanes for heat_id, lanes in _lanes(ids).items()}
+
+
+def export_roster(event, workout_order: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Heats del evento (opcionalmente de un solo WOD) en orden de WOD y heat, con sus lanes."""
+    qs = WorkoutHeat.objects.filter(workout__event=event)
+    if workout_order is not None:
+        qs = qs.filter(workout__order=workout_order)
+    heats = list(
+        qs.order_by("workout__order", "heat_number").values(
+            "id", "heat_number", "lane_count", "start_time", "division_id",
+            "division__name", "workout__order", "workout__name", "workout__scoring",
+        )
+    )
+    lanes = _lanes([h["id"] for h in heats])
+    return [
+        {
+            "id": h["id"],
+            "workout": h["workout__order"],
+            "workout_name": h["workout__name"],
+            "scoring": h["workout__scoring"],
+            "division": h["division_id"],
+            "division_name": h["division__name"],
+            "heat_number": h["heat_number"],
+            "lane_count": h["lane_count"],
+            "start_time": h["start_time"].isoformat() if h["start_time"] else None,
+            "lanes": lanes[h["id"]],
+        }
+        for h in heats
+    ]
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from compcore.apps.events.models import Division, Event, Workout, WorkoutHeat
+from compcore.apps.judging.models import HeatResult, LaneSubmissionKey
+from compcore.apps.judging.services.batch import submit_batch
+
+User = get_user_model()
+
+TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[str(settings.BASE_DIR.parent / "templates")])]
+
+
+@override_settings(TEMPLATES=TEMPLATES)
+class HeatResultsEditTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Lane Games", slug="lane-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        cls.workout = Workout.objects.create(event=cls.event, order=1, name="W1", scoring="REPS", is_published=True)
+        cls.heat = WorkoutHeat.objects.create(workout=cls.workout, division=cls.division, heat_number=1, lane_count=2)
+        cls.judge = User.objects.create(username="judge", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.judge)
+        self.url = reverse("judging:judging_heat_results", args=[self.event.slug, 1, self.division.id, 1])
+
+    def _post(self, reps, versions):
+        data = {"form-TOTAL_FORMS": "2", "form-INITIAL_FORMS": "2", "form-MIN_NUM_FORMS": "0", "form-MAX_NUM_FORMS": "1000"}
+        for i, row in enumerate(HeatResult.objects.filter(heat=self.heat).order_by("lane")):
+            data.update({
+                f"form-{i}-id": row.id, f"form-{i}-version": versions[i], f"form-{i}-reps": reps[i],
+                f"form-{i}-penalties": 0, f"form-{i}-status": "OK",
+            })
+        return self.client.post(self.url, data, follow=True)
+
+    def test_stale_lane_is_rejected(self):
+        # Los lanes vacíos nacen con el heat; abrir el editor no escribe nada
+        self.assertEqual(HeatResult.objects.filter(heat=self.heat).count(), 2)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self._post([10, 20], [0, 0])
+        self.assertEqual(list(HeatResult.objects.filter(heat=self.heat).values_list("reps", "version")), [(10, 1), (20, 1)])
+
+        # Segundo juez con la página vieja: lane 1 igual (sin cambios), lane 2 distinto → rechazado
+        r = self._post([10, 25], [0, 0])
+        self.assertIn("Lane(s) 2", r.content.decode())
+        self.assertEqual(list(HeatResult.objects.filter(heat=self.heat).values_list("reps", "version")), [(10, 1), (20, 1)])
+
+        self._post([10, 25], [1, 1])
+        self.assertEqual(HeatResult.objects.get(heat=self.heat, lane=2).reps, 25)
+
+
+class ResultsBatchApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Batch Games", slug="batch-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        cls.workout = Workout.objects.create(event=cls.event, order=1, name="W1", scoring="TIME", is_published=True)
+        cls.heat = WorkoutHeat.objects.create(workout=cls.workout, division=cls.division, heat_number=1, lane_count=3)
+        cls.judge = User.objects.create(username="tablet", is_staff=True)
+
+    def _send(self, *items):
+        r = self.client.post(reverse("judging:judging_results_batch"), {"items": list(items)}, content_type="application/json")
+        self.assertEqual(r.status_code, 200)
+        return [x["status"] for x in r.json()["results"]]
+
+    def test_per_item_outcomes_and_replay(self):
+        self.client.force_login(self.judge)
+        ok = {"key": "t1-1", "heat": self.heat.id, "lane": 1, "version": 0, "time": "05:30"}
+        bad = {"key": "t1-2", "heat": self.heat.id, "lane": 2, "status": "DNF", "time": "04:00"}
+        stale = {"key": "t1-3", "heat": self.heat.id, "lane": 1, "version": 0, "time": "06:00"}
+        self.assertEqual(self._send(ok, bad, {"key": "t1-4", "heat": self.heat.id, "lane": 9}), ["ok", "invalid", "not_found"])
+        self.assertEqual(HeatResult.objects.get(heat=self.heat, lane=1).time_seconds, 330)
+
+        # Reintento: mismo desenlace, sin escribir; versión vieja: conflicto por lane
+        with self.assertNumQueries(3):  # sesión + usuario + claves
+            self.client.post(reverse("judging:judging_results_batch"), {"items": [ok]}, content_type="application/json")
+        self.assertEqual(self._send(ok, stale), ["ok", "conflict"])
+        self.assertEqual(HeatResult.objects.get(heat=self.heat, lane=1).version, 1)
+
+    def test_keys_are_per_judge(self):
+        other = User.objects.create(username="tablet-2", is_staff=True)
+        self.client.force_login(self.judge)
+        self.assertEqual(self._send({"key": "k1", "heat": self.heat.id, "lane": 1, "version": 0, "time": "05:30"}), ["ok"])
+        # Otra tablet genera la misma clave: no es un reintento del primer juez
+        self.client.force_login(other)
+        self.assertEqual(self._send({"key": "k1", "heat": self.heat.id, "lane": 2, "version": 0, "time": "06:00"}), ["ok"])
+        self.assertEqual(LaneSubmissionKey.objects.filter(key="k1").count(), 2)
+
+    def test_replay_checked_inside_write_transaction(self):
+        item = {"key": "race-1", "heat": self.heat.id, "lane": 1, "version": 0, "time": "05:30"}
+        parallel = {"key": "race-1", "heat": self.heat.id, "lane": 1, "status": "ok", "version": 1}
+
+        def other_request(execute, sql, params, many, context):
+            # Un pedido paralelo guarda la misma clave después de la primera búsqueda de replays
+            if "events_heatassignment" in sql and not LaneSubmissionKey.objects.filter(key="race-1").exists():
+                LaneSubmissionKey.objects.create(key="race-1", user=self.judge, outcome=parallel)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(other_request):
+            result = submit_batch([item], self.judge)
+        self.assertEqual(result, [dict(parallel, replay=True)])
+        self.assertEqual(HeatResult.objects.get(heat=self.heat, lane=1).version, 0)  # sin doble escritura
+
+
+@override_settings(TEMPLATES=TEMPLATES)
+class OfflineJudgeTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from compcore.apps.events.models import HeatAssignment
+        from compcore.apps.registration.models import Team
+
+        cls.event = Event.objects.create(name="Offline Games", slug="offline-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        cls.workout = Workout.objects.create(event=cls.event, order=1, name="W1", scoring="REPS", is_published=True)
+        cls.heat = WorkoutHeat.objects.create(workout=cls.workout, division=cls.division, heat_number=1, lane_count=2)
+        cls.judge = User.objects.create(username="offline", is_staff=True)
+        team = Team.objects.create(event=cls.event, division=cls.division, name="Lobos", captain=cls.judge)
+        HeatAssignment.objects.create(heat=cls.heat, team=team, lane=2)
+        other = Event.objects.create(name="Otro", slug="otro")
+        other_workout = Workout.objects.create(event=other, order=1, name="W1", scoring="REPS")
+        cls.foreign = WorkoutHeat.objects.create(
+            workout=other_workout, division=Division.objects.create(event=other, name="RX", slug="rx"),
+            heat_number=1, lane_count=1,
+        )
+
+    def test_page_roster_and_sync(self):
+        self.client.force_login(self.judge)
+        page = self.client.get(reverse("judging:judging_offline", args=[self.event.slug]))
+        self.assertContains(page, "offline-config")
+        sw = self.client.get(reverse("judging:judging_offline_sw"))
+        self.assertEqual(sw["Content-Type"], "application/javascript")
+
+        roster = self.client.get(reverse("judging:judging_roster", args=[self.event.slug])).json()
+        lanes = roster["heats"][0]["lanes"]
+        self.assertEqual([(l["lane"], l["entrant"], l["version"]) for l in lanes], [(1, "", 0), (2, "Lobos", 0)])
+
+        # El sync devuelve el desenlace por ítem y la versión vigente de los lanes del heat
+        r = self.client.post(
+            reverse("judging:judging_sync", args=[self.event.slug]),
+            {"items": [
+                {"key": "off-a-1", "heat": self.heat.id, "lane": 2, "version": 0, "reps": 40},
+                {"key": "off-a-2", "heat": self.foreign.id, "lane": 1, "version": 0, "reps": 1},
+            ]},
+            content_type="application/json",
+        ).json()
+        self.assertEqual([x["status"] for x in r["results"]], ["ok", "not_found"])
+        self.assertEqual([(l["lane"], l["reps"], l["version"]) for l in r["lanes"][str(self.heat.id)]], [(1, None, 0), (2, 40, 1)])
+        self.assertEqual(list(r["lanes"]), [str(self.heat.id)])
+        self.assertEqual(HeatResult.objects.get(heat=self.heat, lane=2).team.name, "Lobos")
+
+
+@override_settings(TEMPLATES=TEMPLATES)
+class PublicResultsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Stream Games", slug="stream-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        cls.w1 = Workout.objects.create(event=cls.event, order=1, name="Uno", scoring="REPS", is_published=True)
+        cls.w2 = Workout.objects.create(event=cls.event, order=2, name="Dos", scoring="REPS", is_published=True)
+        cls.h1 = WorkoutHeat.objects.create(workout=cls.w1, division=cls.division, heat_number=1, lane_count=3)
+        cls.h2 = WorkoutHeat.objects.create(workout=cls.w2, division=cls.division, heat_number=1, lane_count=3)
+        WorkoutHeat.objects.create(workout=cls.w1, division=cls.division, heat_number=2, lane_count=3)  # sin cargas
+        for heat, values in ((cls.h1, [(1, 10, "DNF"), (2, 30, "OK"), (3, 20, "OK")]), (cls.h2, [(1, 5, "OK")])):
+            for lane, reps, status in values:
+                r = HeatResult.objects.get(heat=heat, lane=lane)
+                r.reps, r.status = reps, status
+                r.save()
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.url = reverse("public_results", args=[self.event.slug])
+
+    def _html(self, **params):
+        r = self.client.get(self.url, params)
+        self.assertTrue(r.streaming)
+        return b"".join(r.streaming_content).decode()
+
+    def test_one_workout_per_page_rows_sorted_and_cached(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        html = self._html()  # por defecto el último WOD con resultados
+        self.assertIn("W2 — Heat #1", html)
+        self.assertNotIn("W1 — Heat", html)
+
+        html = self._html(w=1)
+        self.assertNotIn("Heat #2", html)  # solo lanes vacíos: no es resultado
+        lanes = [html.index(f"#{n}</td>") for n in (2, 3, 1)]  # 30, 20 reps y el DNF al final
+        self.assertEqual(lanes, sorted(lanes))
+
+        # Segunda vez: el bloque del heat sale de la caché, sin leer lanes
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self._html(w=1, page=1), html)
+        self.assertFalse([q for q in ctx.captured_queries if "judge_name" in q["sql"]])
+
+        r = HeatResult.objects.get(heat=self.h1, lane=3)
+        r.reps = 40
+        r.save()  # cambia la clave del bloque: se vuelve a renderizar
+        html = self._html(w=1)
+        self.assertLess(html.index("#3</td>"), html.index("#2</td>"))
+
+    def test_division_rename_refreshes_cached_block(self):
+        self.assertIn("W1 — Heat #1 · RX</h3>", self._html(w=1))
+        self.division.name = "Elite"
+        self.division.save()
+        html = self._html(w=1)
+        self.assertIn("W1 — Heat #1 · Elite</h3>", html)
+        self.assertNotIn("· RX", html)
+
+    def test_streaming_page_skips_single_flight_lock(self):
+        import time
+        from django.core.cache import cache
+
+        # Con el lock de otro worker tomado, la página no espera una copia en caché que nunca se escribe
+        cache.add(f"results-page:results:latest:a:{self.url}:lock", 1, 30)
+        started = time.monotonic()
+        r = self.client.get(self.url)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertTrue(r.streaming)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=r["ETag"]).status_code, 304)
+
+
+@override_settings(TEMPLATES=TEMPLATES)
+class JudgeDashboardTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Dash Games", slug="dash-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        workouts = [
+            Workout.objects.create(event=cls.event, order=n, name=f"W{n}", scoring="REPS") for n in (1, 2, 3)
+        ]
+        cls.heat = WorkoutHeat.objects.create(workout=workouts[0], division=cls.division, heat_number=1, lane_count=3)
+        for w in workouts[1:]:
+            WorkoutHeat.objects.create(workout=w, division=cls.division, heat_number=1, lane_count=3)
+        for lane, reps, status in ((1, 10, "OK"), (2, None, "DNF")):
+            r = HeatResult.objects.get(heat=cls.heat, lane=lane)
+            r.reps, r.status = reps, status
+            r.save()
+        cls.judge = User.objects.create(username="head", is_staff=True)
+
+    def test_progress_for_all_heats_in_one_query(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_login(self.judge)
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get(reverse("event_judges", args=[self.event.slug]), {"workout": 1})
+        heat_queries = [q for q in ctx.captured_queries if 'FROM "events_workoutheat"' in q["sql"]]
+        self.assertEqual(len(heat_queries), 1)
+
+        heats = {order: hs[0] for order, hs in r.context["heats_by_workout"].items()}
+        first = heats[1]
+        self.assertEqual((first.lanes_filled, first.lanes_empty, first.lanes_problem, first.progress), (2, 1, 1, "partial"))
+        self.assertIsNotNone(first.last_updated)
+        self.assertEqual((heats[2].lanes_filled, heats[2].progress, heats[2].last_updated), (0, "pending", None))
+        self.assertEqual([h.pk for h in r.context["heats"]], [self.heat.pk])
+
+
+class LaneShrinkTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Shrink Games", slug="shrink-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        cls.workout = Workout.objects.create(event=cls.event, order=1, name="W1", scoring="REPS")
+
+    def _lanes(self, heat):
+        return list(HeatResult.objects.filter(heat=heat).order_by("lane").values_list("lane", flat=True))
+
+    def test_diff_reseed_shrink_drops_empty_lanes(self):
+        from compcore.apps.events.services.heats import _reseed_diff
+
+        from compcore.apps.events.models import HeatAssignment
+        from compcore.apps.registration.models import AthleteEntry
+
+        heat = WorkoutHeat.objects.create(workout=self.workout, division=self.division, heat_number=1, lane_count=4)
+        self.assertEqual(self._lanes(heat), [1, 2, 3, 4])
+        # Con un lane fijado (manual) el heat borrador se conserva y se achica de 4 a 3 lanes
+        [entry] = AthleteEntry.objects.bulk_create(
+            [AthleteEntry(user=User.objects.create(username="s1"), event=self.event, division=self.division)]
+        )
+        HeatAssignment.objects.create(heat=heat, athlete_entry=entry, lane=1, is_manual=True)
+        _reseed_diff(self.workout, self.division, [("athlete", entry.id)], 3)
+        heat.refresh_from_db()
+        self.assertEqual((heat.lane_count, self._lanes(heat)), (3, [1, 2, 3]))
+
+    def test_shrink_rejected_when_dropped_lane_has_result(self):
+        from django.core.exceptions import ValidationError
+        from compcore.apps.judging.services.lanes import LaneShrinkError
+
+        heat = WorkoutHeat.objects.create(workout=self.workout, division=self.division, heat_number=1, lane_count=4)
+        r = HeatResult.objects.get(heat=heat, lane=4)
+        r.reps = 12
+        r.save()
+
+        heat.lane_count = 3
+        with self.assertRaises(ValidationError):
+            heat.full_clean()
+        with self.assertRaises(LaneShrinkError):
+            heat.save()
+        heat.refresh_from_db()
+        self.assertEqual((heat.lane_count, self._lanes(heat)), (4, [1, 2, 3, 4]))
+
+        HeatResult.objects.filter(pk=r.pk).update(reps=None, version=0)
+        heat.lane_count = 3
+        heat.save()
+        self.assertEqual(self._lanes(heat), [1, 2, 3])
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, views_api
 
 # Namespace del app para usar 'judging:...' en {% url %}
 app_name = "judging"
@@ -11,4 +11,14 @@ urlpatterns = [
         views.heat_results_edit,
         name="judging_heat_results",
     ),
+
+    # API JSON para tablets: carga de lanes por lotes con claves de idempotencia
+    path("api/results/", views_api.results_batch_api, name="judging_results_batch"),
+
+    # Página offline para tablets (PWA): roster en IndexedDB y sync por lotes
+    path("offline/sw.js", views.offline_service_worker, name="judging_offline_sw"),
+    path("offline/<slug:event_slug>/", views.offline_judge, name="judging_offline"),
+    path("offline/<slug:event_slug>/manifest.webmanifest", views.offline_manifest, name="judging_offline_manifest"),
+    path("api/<slug:event_slug>/roster/", views_api.roster_api, name="judging_roster"),
+    path("api/<slug:event_slug>/sync/", views_api.sync_api, name="judging_sync"),
 ]
\ No newline at end of file
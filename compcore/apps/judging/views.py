@@ -1,19 +1,28 @@
 # compcore/apps/judging/views.py
 from __future__ import annotations
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional
 
-from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
-from django.shortcuts import render, get_object_or_404, redirect
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render, get_object_or_404, redirect, resolve_url
 from django.contrib import messages
 from django.forms import modelformset_factory
-from django.db import transaction
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.safestring import mark_safe
 
 from compcore.apps.events.models import (
     Event, Division, Workout, WorkoutHeat, HeatAssignment
 )
-from .models import HeatResult
+from compcore.apps.events.decorators import versioned_results
+from compcore.apps.leaderboard.services.standings import refresh_standings
+from .models import HeatResult, STATUS_CHOICES
 from .forms import LaneResultForm
+from .services.batch import MAX_ITEMS
+from .services.lanes import save_lane_results
+from .services.progress import heat_progress, progress_by_workout
+from .services.results_page import HEATS_PER_PAGE, heat_blocks
 
 
 # -------------------------------
@@ -35,31 +44,6 @@ def judge_required(view_func):
     return _wrapped
 
 
-def _fmt_seconds(sec: Optional[int]) -> str:
-    if sec in (None, "",):
-        return ""
-    try:
-        sec = int(sec)
-    except (TypeError, ValueError):
-        return ""
-    h = sec // 3600
-    m = (sec % 3600) // 60
-    s = sec % 60
-    if h:
-        return f"{h:d}:{m:02d}:{s:02d}"
-    return f"{m:d}:{s:02d}"
-
-
-def _status_bad(status: Optional[str]) -> int:
-    """
-    Devuelve 0 si la marca es válida (OK/ok), 1 si no (para empujar al final).
-    Si tu proyecto usa otros estados “buenos”, agrégalos aquí.
-    """
-    if not status:
-        return 1
-    return 0 if str(status).upper() == "OK" else 1
-
-
 # -------------------------------
 # Dashboard (compat)
 # -------------------------------
@@ -86,27 +70,28 @@ def dashboard(request: HttpRequest, slug: Optional[str] = None):
         except (Workout.DoesNotExist, ValueError, TypeError):
             current_workout = None
 
+    # Todos los heats (de la división elegida) con su avance de carga: una sola consulta agrupada
+    all_heats = heat_progress(event, current_division) if event else []
     heats_by_workout: Dict[int, List[WorkoutHeat]] = {}
-    for w in workouts_qs:
-        q = WorkoutHeat.objects.filter(workout=w)
-        if current_division:
-            q = q.filter(division=current_division)
-        heats_by_workout[w.order] = list(q.order_by("heat_number"))
-
-    heats = []
-    if current_workout:
-        q = WorkoutHeat.objects.filter(workout=current_workout)
-        if current_division:
-            q = q.filter(division=current_division)
-        heats = list(q.order_by("heat_number"))
+    for h in all_heats:
+        heats_by_workout.setdefault(h.workout.order, []).append(h)
+
+    heats = heats_by_workout.get(current_workout.order, []) if current_workout else []
+    workouts = list(workouts_qs)
+    totals = progress_by_workout(all_heats)
+    overview = [
+        {"workout": w, "heats": heats_by_workout.get(w.order, []), "totals": totals.get(w.order)}
+        for w in workouts
+    ]
 
     ctx = {
         "event": event,
         "divisions": list(divisions_qs),
         "current_division": current_division,
-        "workouts": list(workouts_qs),
+        "workouts": workouts,
         "current_workout": current_workout,
         "heats_by_workout": heats_by_workout,
+        "overview": overview,  # avance de carga de todo el evento, por WOD
         "heats": heats,
     }
     return render(request, "judging/dashboard.html", ctx)
@@ -117,7 +102,6 @@ def dashboard(request: HttpRequest, slug: Optional[str] = None):
 # URL: judging/<event_slug>/w<int:workout_order>/d<int:division_id>/heat/<int:heat_number>/
 # -------------------------------
 @judge_required
-@transaction.atomic
 def heat_results_edit(
     request: HttpRequest,
     event_slug: str,
@@ -125,6 +109,11 @@ def heat_results_edit(
     division_id: int,
     heat_number: int,
 ):
+    """
+    Editor de lanes del heat. Las filas HeatResult 1..lane_count ya existen desde que se creó el heat
+    (services/lanes.ensure_lane_rows): el GET no escribe. El POST guarda solo los lanes modificados
+    en un bulk_update; un lane que otro juez guardó mientras tanto se rechaza (HeatResult.version).
+    """
     event = get_object_or_404(Event, slug=event_slug)
     workout = get_object_or_404(Workout, event=event, order=workout_order)
     division = get_object_or_404(Division, event=event, pk=division_id)
@@ -136,15 +125,6 @@ def heat_results_edit(
     )
     lane_to_assignment = {a.lane: a for a in assignments if a.lane}
 
-    # Asegurar HeatResult 1..lane_count
-    existing = {hr.lane for hr in HeatResult.objects.filter(heat=heat)}
-    to_create: List[HeatResult] = []
-    for lane in range(1, (heat.lane_count or 0) + 1):
-        if lane not in existing:
-            to_create.append(HeatResult(heat=heat, lane=lane))
-    if to_create:
-        HeatResult.objects.bulk_create(to_create)
-
     qs = HeatResult.objects.filter(heat=heat).select_related("team", "athlete_entry__user").order_by("lane")
 
     LaneFormSet = modelformset_factory(
@@ -163,10 +143,20 @@ def heat_results_edit(
                 if a:
                     inst.team = a.team
                     inst.athlete_entry = a.athlete_entry
-                if inst.penalties is None:
-                    inst.penalties = 0
-                inst.save()
-            messages.success(request, "Resultados guardados.")
+            saved, conflicts = save_lane_results(heat, workout.scoring, instances)
+            if saved:
+                # Re-rankear solo este (workout, division) en la tabla materializada
+                refresh_standings(workout, division)
+                messages.success(request, "Resultados guardados.")
+            if conflicts:
+                lanes = ", ".join(str(r.lane) for r in sorted(conflicts, key=lambda r: r.lane))
+                messages.warning(
+                    request,
+                    f"Lane(s) {lanes}: otro juez guardó cambios mientras editabas; no se sobrescribieron. "
+                    "Revisa los valores actuales y vuelve a cargar.",
+                )
+            if not instances:
+                messages.info(request, "No hubo cambios.")
             return redirect(
                 reverse(
                     "judging:judging_heat_results",
@@ -205,127 +195,58 @@ def heat_results_edit(
 
 # -------------------------------
 # Resultados públicos (SIN divisiones)
-# Orden de heats: WOD DESC + Heat DESC (como ya tienes)
-# Orden interno de cada heat: mejor -> peor según scoring
+# Un WOD por vez (?w=<order>, por defecto el último con resultados) y heats paginados (?page=N),
+# Heat DESC. Orden interno de cada heat: mejor -> peor según scoring (services/results_page.py)
 # -------------------------------
+# Marca donde van los bloques de heats dentro del esqueleto de la página
+_HEATS_SLOT = "<!--results-heats-->"
+
+
+# Transmite la página (StreamingHttpResponse): el decorador solo aporta ETag / 304, la caché es por heat
+@versioned_results("results", slug_kwarg="event_slug", body_cache=False)
 def results_event(request: HttpRequest, event_slug: str):
     event = get_object_or_404(Event, slug=event_slug)
 
-    # Traemos todo y armamos lista plana de heats
-    results = (
-        HeatResult.objects.filter(heat__workout__event=event)
-        .select_related("heat", "heat__workout", "heat__division", "team", "athlete_entry__user")
-        .order_by("-created_at")
-    )
-
-    # key: (workout_order, heat_number)
-    heats_map: Dict[Tuple[int, int], Dict[str, Any]] = {}
-    ordered_keys: List[Tuple[int, int]] = []
-
-    for r in results:
-        heat = r.heat
-        w = heat.workout
-        key = (w.order, heat.heat_number)
-        if key not in heats_map:
-            heats_map[key] = {
-                "workout_order": w.order,
-                "workout_name": w.name,
-                "scoring": w.scoring,            # <- para ordenar filas según scoring
-                "heat_number": heat.heat_number,
-                "division_name": heat.division.name,
-                "lane_count": heat.lane_count,
-                "rows": [],
-            }
-            ordered_keys.append(key)
-
-        # Participante mostrado (equipo o atleta)
-        if r.team:
-            participant = f"Equipo: {r.team.name}"
-        elif r.athlete_entry and r.athlete_entry.user:
-            full = r.athlete_entry.user.get_full_name() or r.athlete_entry.user.username
-            participant = f"Atleta: {full}"
-        else:
-            participant = "—"
+    # Solo heats con algún lane guardado (version > 0): los lanes vacíos se crean junto con el heat
+    # y no cuentan como resultado.
+    saved_heats = WorkoutHeat.objects.filter(workout__event=event, results__version__gt=0).values("id")
+    workouts = list(Workout.objects.filter(event=event, workoutheat__in=saved_heats).distinct().order_by("-order"))
 
-        heats_map[key]["rows"].append(
-            {
-                # visibles
-                "lane": r.lane,
-                "participant": participant,
-                "time_display": _fmt_seconds(getattr(r, "time_seconds", None)),
-                "reps": r.reps,
-                "weight_kg": r.weight_kg,
-                "tiebreak_display": _fmt_seconds(getattr(r, "tiebreak_seconds", None)),
-                "penalties": r.penalties or 0,
-                "status": r.status,
-                "judge_name": r.judge_name,
-                "notes": r.notes,
-                # crudos (para ordenar internamente)
-                "_time": getattr(r, "time_seconds", None),
-                "_tiebreak": getattr(r, "tiebreak_seconds", None),
-                "_reps": r.reps,
-                "_weight": r.weight_kg,
-                "_created": r.created_at,
-            }
+    current_workout = workouts[0] if workouts else None
+    try:
+        wanted = int(request.GET.get("w", ""))
+    except ValueError:
+        wanted = None
+    current_workout = next((w for w in workouts if w.order == wanted), current_workout)
+
+    heats_qs = WorkoutHeat.objects.none()
+    if current_workout is not None:
+        heats_qs = (
+            WorkoutHeat.objects.filter(workout=current_workout, pk__in=saved_heats)
+            .select_related("division")
+            .order_by("-heat_number")
         )
-
-    # Orden global de heats: Workout.order DESC, Heat.number DESC
-    ordered_keys.sort(key=lambda k: (k[0], k[1]), reverse=True)
-
-    # Orden interno por scoring
-    def sort_rows(rows: List[Dict[str, Any]], scoring: Optional[str]) -> None:
-        s = (scoring or "").upper()
-        if s == "TIME":
-            # Mejor: menor tiempo; desempate por penalidades (menor), luego tiebreak (menor)
-            BIG = 10**9
-            rows.sort(
-                key=lambda r: (
-                    _status_bad(r.get("status")),
-                    r.get("_time") if r.get("_time") is not None else BIG,
-                    r.get("penalties", 0),
-                    r.get("_tiebreak") if r.get("_tiebreak") is not None else BIG,
-                    r.get("_created")  # último recurso para estabilidad
-                )
-            )
-        elif s == "WEIGHT":
-            # Mejor: mayor peso
-            INF = 10**9
-            rows.sort(
-                key=lambda r: (
-                    _status_bad(r.get("status")),
-                    -r.get("_weight") if r.get("_weight") is not None else INF,
-                    r.get("penalties", 0),
-                    -r.get("_reps") if r.get("_reps") is not None else 0,  # micro desempate
-                    r.get("_created")
-                )
-            )
-        elif s in ("REPS", "POINTS"):
-            # Mejor: mayor reps
-            INF = 10**9
-            rows.sort(
-                key=lambda r: (
-                    _status_bad(r.get("status")),
-                    -r.get("_reps") if r.get("_reps") is not None else INF,
-                    r.get("penalties", 0),
-                    r.get("_time") if r.get("_time") is not None else INF,  # opcional
-                    r.get("_created")
-                )
-            )
-        else:
-            # Desconocido: mantener recientes primero
-            rows.sort(key=lambda r: (r.get("_created"),), reverse=True)
-
-    all_heats: List[Dict[str, Any]] = []
-    for key in ordered_keys:
-        bucket = heats_map[key]
-        sort_rows(bucket["rows"], bucket.get("scoring"))
-        all_heats.append(bucket)
+    page = Paginator(heats_qs, HEATS_PER_PAGE).get_page(request.GET.get("page"))
+    heats = list(page.object_list)
 
     ctx = {
         "event": event,
-        "all_heats": all_heats,  # lista plana sin divisiones; heats ya están DESC; filas ya están mejor->peor
+        "workouts": workouts,
+        "current_workout": current_workout,
+        "page": page,
+        "has_heats": bool(heats),
+        "heats_slot": mark_safe(_HEATS_SLOT),
     }
-    return render(request, "judging/public_results.html", ctx)
+    # Sin heats la marca no aparece: todo queda en `head`
+    head, _, tail = render_to_string("judging/public_results.html", ctx, request).partition(_HEATS_SLOT)
+
+    def stream():
+        yield head
+        # Cada heat sale de la caché o se renderiza con sus lanes recién leídos (ver results_page)
+        yield from heat_blocks(heats, current_workout)
+        yield tail
+
+    return StreamingHttpResponse(stream(), content_type="text/html; charset=utf-8")
 
 
 # -------------------------------
@@ -349,4 +270,47 @@ def heat_detail(request: HttpRequest, event_slug: str, workout_order: int, heat_
         "heat": heat,
         "results": results,
     }
-    return render(request, "judging/confirm.html", ctx)
\ No newline at end of file
+    return render(request, "judging/confirm.html", ctx)
+
+# -------------------------------
+# Página offline para tablets (PWA)
+# El roster se baja a IndexedDB (api/<slug>/roster/) y los lanes se cargan sin red; una cola local
+# se sincroniza por lotes (api/<slug>/sync/) con reintentos. El service worker guarda la página.
+# -------------------------------
+@judge_required
+def offline_judge(request: HttpRequest, event_slug: str):
+    event = get_object_or_404(Event, slug=event_slug)
+    config = {
+        "event": event.slug,
+        "rosterUrl": reverse("judging:judging_roster", args=[event.slug]),
+        "syncUrl": reverse("judging:judging_sync", args=[event.slug]),
+        "swUrl": reverse("judging:judging_offline_sw"),
+        "swScope": reverse("judging:judging_offline_sw").rsplit("/", 1)[0] + "/",
+        "loginUrl": resolve_url(settings.LOGIN_URL),
+        "csrfCookie": settings.CSRF_COOKIE_NAME,
+        "maxItems": MAX_ITEMS,
+        "statuses": [code for code, _ in STATUS_CHOICES],
+    }
+    return render(request, "judging/offline.html", {"event": event, "config": config})
+
+
+def offline_manifest(request: HttpRequest, event_slug: str):
+    """Manifest para instalar la página (sin datos privados: el navegador lo pide sin cookies)."""
+    event = get_object_or_404(Event, slug=event_slug)
+    manifest = {
+        "name": f"TIM-SCORE Jueces — {event.name}",
+        "short_name": "Jueces",
+        "start_url": reverse("judging:judging_offline", args=[event.slug]),
+        "scope": reverse("judging:judging_offline_sw").rsplit("/", 1)[0] + "/",
+        "display": "standalone",
+        "background_color": "#ffffff",
+        "theme_color": "#111111",
+    }
+    return JsonResponse(manifest, content_type="application/manifest+json")
+
+
+def offline_service_worker(request: HttpRequest):
+    # Servido desde /judging/offline/ (no desde /static/) para que su scope cubra las páginas offline
+    response = render(request, "judging/offline_sw.js", content_type="application/javascript")
+    response["Cache-Control"] = "no-cache"
+    return response
\ No newline at end of file
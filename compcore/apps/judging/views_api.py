@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+
+from django.http import HttpRequest, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.decorators.http import require_GET, require_POST
+
+from compcore.apps.events.models import Event
+
+from .services.batch import MAX_ITEMS, BatchError, submit_batch
+from .services.roster import export_roster, lane_state
+from .views import _user_is_judge
+
+
+def _judge_error(request: HttpRequest):
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Requiere iniciar sesión"}, status=401)
+    if not _user_is_judge(request):
+        return JsonResponse({"error": "Solo jueces"}, status=403)
+    return None
+
+
+def _json_body(request: HttpRequest):
+    """Objeto JSON del cuerpo, o None si no es JSON válido."""
+    try:
+        return json.loads(request.body or b"{}")
+    except ValueError:
+        return None
+
+
+def _saved(results) -> int:
+    return sum(1 for r in results if r["status"] == "ok" and not r.get("replay"))
+
+
+@require_POST
+def results_batch_api(request: HttpRequest):
+    """
+    Carga por lotes para tablets: POST {"items": [...]} (ver services/batch.py) →
+    {"results": [{key, heat, lane, status, version?, errors?, replay?}, ...], "saved": n}.
+    Siempre 200 con un desenlace por ítem; 400 solo si el lote entero está mal formado.
+    """
+    denied = _judge_error(request)
+    if denied is not None:
+        return denied
+    payload = _json_body(request)
+    if payload is None:
+        return JsonResponse({"error": "JSON inválido"}, status=400)
+    try:
+        results = submit_batch(payload.get("items") if isinstance(payload, dict) else None, request.user)
+    except BatchError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse({"results": results, "saved": _saved(results)})
+
+
+@require_GET
+def roster_api(request: HttpRequest, event_slug: str):
+    """
+    Roster para la página offline: GET [?workout=<order>] →
+    {"event", "generated_at", "heats": [{id, workout, scoring, division, heat_number, lanes: [...]}, ...]}.
+    """
+    denied = _judge_error(request)
+    if denied is not None:
+        return denied
+    event = get_object_or_404(Event, slug=event_slug)
+    try:
+        workout_order = int(request.GET["workout"]) if request.GET.get("workout") else None
+    except ValueError:
+        return JsonResponse({"error": "'workout' debe ser un número"}, status=400)
+    return JsonResponse({
+        "event": {"slug": event.slug, "name": event.name},
+        "generated_at": timezone.now().isoformat(),
+        "heats": export_roster(event, workout_order),
+    })
+
+
+@require_POST
+def sync_api(request: HttpRequest, event_slug: str):
+    """
+    Sync de la página offline: POST {"items": [...], "heats": [ids]} →
+    {"results": [...], "saved": n, "lanes": {heat_id: [lanes]}}.
+    `items` (opcional) se procesa igual que results_batch_api pero solo para heats de este evento;
+    `lanes` trae valores y versión vigentes de los heats pedidos y de los tocados por el lote, para
+    que la tablet resuelva conflictos y siga cargando sobre la versión del servidor.
+    """
+    denied = _judge_error(request)
+    if denied is not None:
+        return denied
+    event = get_object_or_404(Event, slug=event_slug)
+    payload = _json_body(request)
+    if not isinstance(payload, dict):
+        return JsonResponse({"error": "JSON inválido"}, status=400)
+    heats = payload.get("heats") or []
+    if not isinstance(heats, list) or len(heats) > MAX_ITEMS:
+        return JsonResponse({"error": f"'heats' debe ser una lista de hasta {MAX_ITEMS} ids"}, status=400)
+
+    results = []
+    if payload.get("items"):
+        try:
+            results = submit_batch(payload["items"], request.user, event=event)
+        except BatchError as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+
+    heat_ids = {h for h in heats if isinstance(h, int) and not isinstance(h, bool)}
+    heat_ids.update(r["heat"] for r in results if isinstance(r.get("heat"), int))
+    return JsonResponse({
+        "results": results,
+        "saved": _saved(results),
+        "lanes": lane_state(event, heat_ids),
+        "server_time": timezone.now().isoformat(),
+    })
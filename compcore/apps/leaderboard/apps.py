@@ -3,3 +3,15 @@ from django.apps import AppConfig
 class LeaderboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'compcore.apps.leaderboard'
+
+    def ready(self):
+        from compcore.apps.events.services.results_version import results_changed
+        from .services.live_hub import hub
+        from .signals import connect_standings_signals
+
+        results_changed.connect(
+            lambda sender, event_id, **kwargs: hub.notify(event_id),
+            weak=False,
+            dispatch_uid="leaderboard.live_hub",
+        )
+        connect_standings_signals()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from compcore.apps.leaderboard.services import ranking
+from compcore.apps.leaderboard.services.ranking import ResultRow
+
+
+def _rows(n: int, rng: random.Random):
+    return [
+        ResultRow(
+            1, 1, None, i + 1, i % 10 + 1,
+            rng.randrange(300, 1200), rng.randrange(0, 300), Decimal(rng.randrange(2000, 20000)) / 100,
+            rng.choice([0, 0, 0, 1]), rng.randrange(60, 600), "OK", None, None,
+        )
+        for i in range(n)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark del ranking de un slice: Python puro vs. kernel NumPy (si está instalado) "
+        "sobre filas sintéticas. No toca la BD."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,100000", help="Filas por división separadas por coma")
+        parser.add_argument("--scoring", default="TIME", choices=["TIME", "REPS", "POINTS", "WEIGHT"])
+        parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por tamaño (se toma la mejor)")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def _best(self, fn, repeat: int) -> float:
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            elapsed = (time.perf_counter() - t0) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def handle(self, *args, **opts):
+        sizes = [int(x) for x in opts["sizes"].split(",") if x.strip()]
+        scoring = opts["scoring"]
+        repeat = max(1, opts["repeat"])
+        rng = random.Random(opts["seed"])
+        has_numpy = ranking.np is not None
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"rank_rows · scoring={scoring} · repeat={repeat} · numpy={'sí' if has_numpy else 'no instalado'}"
+        ))
+        self.stdout.write(f"{'N':>8} {'python ms':>10} {'numpy ms':>10} {'x':>6}")
+
+        for n in sizes:
+            rows = _rows(n, rng)
+            py = self._best(lambda: ranking.rank_rows_python(scoring, rows, n), repeat)
+            line = f"{n:>8} {py:>10.1f}"
+            if has_numpy:
+                if ranking.rank_rows_numpy(scoring, rows, n) != ranking.rank_rows_python(scoring, rows, n):
+                    self.stderr.write(self.style.ERROR(f"✗ Resultados distintos con N={n}"))
+                vec = self._best(lambda: ranking.rank_rows_numpy(scoring, rows, n), repeat)
+                line += f" {vec:>10.1f} {py / vec:>6.1f}"
+            else:
+                line += f" {'-':>10} {'-':>6}"
+            self.stdout.write(line)
+
+        self.stdout.write(self.style.SUCCESS("✓ Benchmark terminado."))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from compcore.apps.events.models import Event
+from compcore.apps.jobs.services.queue import enqueue
+from compcore.apps.leaderboard.services.standings import rebuild_standings
+
+
+class Command(BaseCommand):
+    help = "Reconstruye desde cero las tablas materializadas del leaderboard (WorkoutStanding / DivisionStanding)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", dest="event_slug", default="", help="Slug del evento (por defecto: todos)")
+        parser.add_argument("--enqueue", action="store_true", help="Encolar para el worker run_jobs y salir")
+
+    def handle(self, *args, **opts):
+        event = None
+        if opts["event_slug"]:
+            try:
+                event = Event.objects.get(slug=opts["event_slug"])
+            except Event.DoesNotExist:
+                raise CommandError(f"Event '{opts['event_slug']}' no existe.")
+
+        if opts["enqueue"]:
+            job = enqueue(
+                "leaderboard.rebuild_standings",
+                {"event_ids": [event.pk] if event else []},
+                label=f"Rebuild leaderboard · {event.name if event else 'todos los eventos'}",
+            )
+            self.stdout.write(self.style.SUCCESS(f"✓ Rebuild encolado (job #{job.pk}); lo ejecuta run_jobs."))
+            return
+
+        stats = rebuild_standings(event)
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Standings reconstruidos: {stats['events']} eventos · {stats['slices']} slices · "
+            f"{stats['workout_rows']} filas por WOD · {stats['division_rows']} filas de totales · "
+            f"{stats['rank_keys']} rank_key corregidos"
+        ))
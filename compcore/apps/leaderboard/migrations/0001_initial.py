@@ -0,0 +1,53 @@
+# Generated by Django 4.2.24 on 2026-10-17 03:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('registration', '0005_alter_team_options_alter_team_unique_together_and_more'),
+        ('events', '0013_alter_division_options_alter_heatassignment_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkoutStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('display_name', models.CharField(blank=True, default='', max_length=255)),
+                ('rank', models.PositiveIntegerField()),
+                ('points', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('athlete_entry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='registration.athleteentry')),
+                ('division', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workout_standings', to='events.division')),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='registration.team')),
+                ('workout', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='events.workout')),
+            ],
+            options={
+                'ordering': ('workout', 'division', 'rank'),
+                'indexes': [models.Index(fields=['workout', 'division', 'rank'], name='lb_wstanding_slice_idx'), models.Index(fields=['division', 'workout'], name='lb_wstanding_div_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DivisionStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('display_name', models.CharField(blank=True, default='', max_length=255)),
+                ('rank', models.PositiveIntegerField()),
+                ('total_points', models.PositiveIntegerField(default=0)),
+                ('points_by_order', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('athlete_entry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='registration.athleteentry')),
+                ('division', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='events.division')),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='registration.team')),
+            ],
+            options={
+                'ordering': ('division', 'rank', 'display_name'),
+                'indexes': [models.Index(fields=['division', 'rank'], name='lb_dstanding_rank_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.24 on 2026-10-17 04:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaderboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='divisionstanding',
+            name='changed_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='divisionstanding',
+            index=models.Index(fields=['division', 'changed_version'], name='lb_dstanding_changed_idx'),
+        ),
+    ]
@@ -1 +1,58 @@
+from __future__ import annotations
+
 from django.db import models
+
+
+class WorkoutStanding(models.Model):
+    """
+    Puntos materializados de un participante en un (workout, division).
+    Se recalcula SOLO el slice afectado cada vez que los jueces guardan resultados.
+    """
+    workout = models.ForeignKey("events.Workout", on_delete=models.CASCADE, related_name="standings")
+    division = models.ForeignKey("events.Division", on_delete=models.CASCADE, related_name="workout_standings")
+    team = models.ForeignKey("registration.Team", on_delete=models.CASCADE, null=True, blank=True)
+    athlete_entry = models.ForeignKey("registration.AthleteEntry", on_delete=models.CASCADE, null=True, blank=True)
+
+    display_name = models.CharField(max_length=255, blank=True, default="")
+    rank = models.PositiveIntegerField()
+    points = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("workout", "division", "rank"), name="lb_wstanding_slice_idx"),
+            models.Index(fields=("division", "workout"), name="lb_wstanding_div_idx"),
+        ]
+        ordering = ("workout", "division", "rank")
+
+    def __str__(self) -> str:
+        return f"{self.workout} · {self.display_name} · #{self.rank} ({self.points} pts)"
+
+
+class DivisionStanding(models.Model):
+    """
+    Total acumulado por división (solo WODs publicados).
+    points_by_order: {"<workout.order>": puntos} para pintar las columnas W1..Wn sin recalcular.
+    changed_version: Event.results_version en la que cambió por última vez rank/puntos de la fila
+    (la API con `since=` devuelve solo las filas con changed_version > since).
+    """
+    division = models.ForeignKey("events.Division", on_delete=models.CASCADE, related_name="standings")
+    team = models.ForeignKey("registration.Team", on_delete=models.CASCADE, null=True, blank=True)
+    athlete_entry = models.ForeignKey("registration.AthleteEntry", on_delete=models.CASCADE, null=True, blank=True)
+
+    display_name = models.CharField(max_length=255, blank=True, default="")
+    rank = models.PositiveIntegerField()
+    total_points = models.PositiveIntegerField(default=0)
+    points_by_order = models.JSONField(default=dict, blank=True)
+    changed_version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("division", "rank"), name="lb_dstanding_rank_idx"),
+            models.Index(fields=("division", "changed_version"), name="lb_dstanding_changed_idx"),
+        ]
+        ordering = ("division", "rank", "display_name")
+
+    def __str__(self) -> str:
+        return f"{self.division} · #{self.rank} {self.display_name} ({self.total_points} pts)"
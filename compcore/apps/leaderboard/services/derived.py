@@ -0,0 +1,200 @@
+# compcore/apps/leaderboard/services/derived.py
+"""
+Leaderboards derivados ("solo mujeres", "Masters 40+", "mi gym") sin divisiones nuevas.
+
+Por evento y por results_version se arma UNA vez un índice compacto: las filas de
+DivisionStanding (ya rankeadas) con sexo, edad a la fecha del evento y gym del participante,
+en una sola consulta con joins. Se guarda en la caché; cada filtro después es un recorte en
+memoria del índice y un re-rank del subconjunto, sin consultas extra por pedido.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from django.core.cache import cache
+from django.db.models.functions import Coalesce
+
+from compcore.apps.events.models import Event
+
+from ..models import DivisionStanding
+from .ranking import entrant_code, entrant_name
+
+INDEX_TTL = 60 * 30  # segundos; la versión en la clave ya invalida
+
+# Bandas de edad ofrecidas en la UI (la API acepta cualquier "min-max" o "min+")
+AGE_BANDS = ("14-15", "16-17", "35-39", "40-44", "45-49", "50-54", "55-59", "60+")
+
+
+class IndexRow(NamedTuple):
+    id: int
+    division_id: int
+    rank: int
+    entrant: str           # "t12" | "a34"
+    name: str
+    total: int
+    points: Dict[str, int]  # {"<workout.order>": puntos}
+    changed: int
+    sex: Optional[str]
+    age: Optional[int]
+    gym: str               # normalizado (minúsculas, sin espacios extra) para comparar
+    gym_label: str
+
+
+class DerivedFilter(NamedTuple):
+    sex: Optional[str] = None
+    age_min: Optional[int] = None
+    age_max: Optional[int] = None
+    gym: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return any(v is not None for v in self)
+
+
+def _norm_gym(value: Optional[str]) -> str:
+    return " ".join((value or "").split()).lower()
+
+
+def _age(dob: Optional[date], ref: date) -> Optional[int]:
+    if dob is None:
+        return None
+    return ref.year - dob.year - ((ref.month, ref.day) < (dob.month, dob.day))
+
+
+def parse_filter(params) -> DerivedFilter:
+    """?sex=F&age=40-44|40+&gym=Nombre → DerivedFilter (ValueError con mensaje si algo no cuadra)."""
+    sex = (params.get("sex") or "").upper() or None
+    if sex not in (None, "M", "F"):
+        raise ValueError("'sex' debe ser M o F")
+
+    age_min = age_max = None
+    band = (params.get("age") or "").strip()
+    if band:
+        try:
+            if band.endswith("+"):
+                age_min = int(band[:-1])
+            else:
+                lo, hi = band.split("-", 1)
+                age_min, age_max = int(lo), int(hi)
+        except ValueError:
+            raise ValueError("'age' debe ser min-max o min+ (p.ej. 40-44, 60+)")
+
+    gym = _norm_gym(params.get("gym")) or None
+    return DerivedFilter(sex, age_min, age_max, gym)
+
+
+# ------------------------------
+# Índice
+# ------------------------------
+def _build_index(event: Event) -> Dict[int, List[IndexRow]]:
+    ref = event.start_date or date.today()
+    qs = (
+        DivisionStanding.objects.filter(division__event=event)
+        # Atleta: su perfil. Equipo: sin sexo/edad propios; gym del capitán.
+        .annotate(
+            entrant=entrant_name(),
+            code=entrant_code(),
+            p_gym=Coalesce("athlete_entry__user__profile__gym", "team__captain__profile__gym"),
+        )
+        .order_by("division_id", "rank", "code")
+        .values_list(
+            "id", "division_id", "rank", "team_id", "athlete_entry_id", "entrant", "total_points",
+            "points_by_order", "changed_version",
+            "athlete_entry__user__profile__sex", "athlete_entry__user__profile__date_of_birth", "p_gym",
+        )
+    )
+    index: Dict[int, List[IndexRow]] = {}
+    for pk, division_id, rank, team_id, entry_id, name, total, by_order, changed, sex, dob, gym in qs:
+        index.setdefault(division_id, []).append(IndexRow(
+            pk, division_id, rank, f"t{team_id}" if team_id else f"a{entry_id}",
+            name or "", int(total), by_order or {}, changed,
+            sex, _age(dob, ref), _norm_gym(gym), (gym or "").strip(),
+        ))
+    return index
+
+
+def _index_key(event: Event) -> str:
+    return f"lb-index:{event.id}:{event.results_version}"
+
+
+def event_index(event: Event) -> Dict[int, List[IndexRow]]:
+    """{division_id: [IndexRow] por rank}; una consulta por versión de resultados del evento."""
+    key = _index_key(event)
+    index = cache.get(key)
+    if index is None:
+        index = _build_index(event)
+        cache.set(key, index, INDEX_TTL)
+    return index
+
+
+# ------------------------------
+# Filtros
+# ------------------------------
+def _matches(row: IndexRow, f: DerivedFilter) -> bool:
+    if f.sex is not None and row.sex != f.sex:
+        return False
+    if f.age_min is not None or f.age_max is not None:
+        if row.age is None:
+            return False
+        if f.age_min is not None and row.age < f.age_min:
+            return False
+        if f.age_max is not None and row.age > f.age_max:
+            return False
+    if f.gym is not None and row.gym != f.gym:
+        return False
+    return True
+
+
+def filter_rows(rows: List[IndexRow], f: DerivedFilter) -> List[Dict[str, Any]]:
+    """
+    Subconjunto en el orden del ranking base, re-rankeado (competición: empates en total
+    comparten puesto). `overall_rank` conserva el puesto en la división completa.
+    """
+    out: List[Dict[str, Any]] = []
+    rank = 0
+    prev_total = None
+    for pos, row in enumerate((r for r in rows if _matches(r, f)), start=1):
+        if row.total != prev_total:
+            rank, prev_total = pos, row.total
+        out.append({
+            "id": row.id, "rank": rank, "overall_rank": row.rank, "entrant": row.entrant, "name": row.name,
+            "total": row.total, "points": row.points, "changed": row.changed,
+        })
+    return out
+
+
+def gyms(index: Dict[int, List[IndexRow]]) -> List[str]:
+    """Gyms presentes en el evento (para el selector de la UI)."""
+    labels: Dict[str, str] = {}
+    for rows in index.values():
+        for row in rows:
+            if row.gym:
+                labels.setdefault(row.gym, row.gym_label)
+    return sorted(labels.values(), key=str.lower)
+
+
+def event_gyms(event: Event) -> List[str]:
+    """
+    Como gyms(event_index(event)) sin armar el índice cuando nadie filtra: si no está en la caché,
+    una consulta DISTINCT de los gyms (también en caché por versión).
+    """
+    key = f"lb-gyms:{event.id}:{event.results_version}"
+    found = cache.get(key)
+    if found is not None:
+        return found
+    index = cache.get(_index_key(event))
+    if index is not None:
+        found = gyms(index)
+    else:
+        labels: Dict[str, str] = {}
+        for raw in (
+            DivisionStanding.objects.filter(division__event=event)
+            .annotate(p_gym=Coalesce("athlete_entry__user__profile__gym", "team__captain__profile__gym"))
+            .order_by().values_list("p_gym", flat=True).distinct()
+        ):
+            if _norm_gym(raw):
+                labels.setdefault(_norm_gym(raw), raw.strip())
+        found = sorted(labels.values(), key=str.lower)
+    cache.set(key, found, INDEX_TTL)
+    return found
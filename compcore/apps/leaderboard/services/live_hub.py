@@ -0,0 +1,217 @@
+# compcore/apps/leaderboard/services/live_hub.py
+"""
+Hub en proceso para el stream SSE del live / leaderboard.
+
+Un canal por (tipo, id) — ("workout", workout_id) o ("event", event_id) — con UNA tarea que
+vigila Event.results_version (1 consulta mínima cada POLL_SECONDS, o al instante si el cambio
+ocurrió en este mismo proceso) y, solo cuando la versión cambia, recalcula el ranking una vez y
+reparte el delta a todas las conexiones abiertas. El costo en BD no depende de cuántos
+espectadores haya.
+
+Filas compactas: {division_id: {"t12"|"a34": [rank, puntos, métrica, nombre]}}.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+
+from compcore.apps.events.models import Division, Event, Workout
+
+from ..models import DivisionStanding
+from .ranking import entrant_name, rank_event
+
+POLL_SECONDS = 2.0
+QUEUE_SIZE = 32
+# Si una recarga falla (BD caída, etc.) el canal sigue vivo y reintenta con espera creciente
+RETRY_SECONDS = 1.0
+RETRY_MAX_SECONDS = 30.0
+
+log = logging.getLogger(__name__)
+
+Rows = Dict[str, Dict[str, list]]
+ChannelKey = Tuple[str, int]
+
+
+def _short_key(key: Tuple[str, int]) -> str:
+    return f"{key[0][0]}{key[1]}"
+
+
+# ------------------------------
+# Cargas (síncronas, se ejecutan en thread)
+# ------------------------------
+def _stamp(event_id: int) -> Optional[int]:
+    return Event.objects.filter(pk=event_id).values_list("results_version", flat=True).first()
+
+
+def load_workout_rows(event_id: int, workout_id: int) -> Rows:
+    event = Event.objects.get(pk=event_id)
+    workout = Workout.objects.get(pk=workout_id)
+    divisions = list(Division.objects.filter(event_id=event_id))
+    ranking = rank_event(event, [workout], divisions)
+    return {
+        str(d.id): {
+            _short_key(e.key): [e.rank, e.points, e.metric, ranking.names.get(e.key, "")]
+            for e in ranking.slices.get((workout.id, d.id), [])
+        }
+        for d in divisions
+    }
+
+
+def load_event_rows(event_id: int, _ref_id: int) -> Rows:
+    rows: Rows = {}
+    for division_id, team_id, entry_id, rank, total, name in DivisionStanding.objects.filter(
+        division__event_id=event_id
+    ).annotate(entrant=entrant_name()).values_list(
+        "division_id", "team_id", "athlete_entry_id", "rank", "total_points", "entrant"
+    ):
+        key = f"t{team_id}" if team_id else f"a{entry_id}"
+        rows.setdefault(str(division_id), {})[key] = [rank, total, None, name or ""]
+    return rows
+
+
+def _load(loader: Callable[[int, int], Rows], event_id: int, ref_id: int, known: Optional[int]):
+    """(versión, filas|None): las filas solo se recalculan si la versión cambió."""
+    close_old_connections()
+    try:
+        version = _stamp(event_id)
+        if version is None or version == known:
+            return version, None
+        return version, loader(event_id, ref_id)
+    finally:
+        close_old_connections()
+
+
+def diff_rows(prev: Rows, cur: Rows) -> Dict[str, Dict[str, Any]]:
+    """Delta por división: {"u": {key: fila} nuevas/cambiadas, "x": [keys que ya no están]}."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for division_id in set(prev) | set(cur):
+        before, after = prev.get(division_id, {}), cur.get(division_id, {})
+        upserts = {k: row for k, row in after.items() if before.get(k) != row}
+        removed = [k for k in before if k not in after]
+        if upserts or removed:
+            out[division_id] = {"u": upserts, "x": removed}
+    return out
+
+
+def sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {payload}\n\n"
+
+
+# ------------------------------
+# Hub
+# ------------------------------
+class _Channel:
+    def __init__(self, key: ChannelKey, event_id: int, loader: Callable[[int, int], Rows]):
+        self.key = key
+        self.event_id = event_id
+        self.loader = loader
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.wake = asyncio.Event()
+        self.ready = asyncio.Event()
+        self.error: Optional[BaseException] = None  # la primera carga falló: los que esperan también fallan
+        self.version: Optional[int] = None
+        self.rows: Rows = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> str:
+        return sse("snapshot", {"v": self.version, "rows": self.rows}, self.version)
+
+    def publish(self, message: str) -> None:
+        for queue in self.subscribers:
+            if queue.full():
+                # Conexión lenta: se descarta lo acumulado y se re-sincroniza con un snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot())
+            else:
+                queue.put_nowait(message)
+
+
+class LiveHub:
+    def __init__(self) -> None:
+        self._channels: Dict[ChannelKey, _Channel] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def subscribe(
+        self, key: ChannelKey, event_id: int, loader: Callable[[int, int], Rows]
+    ) -> Tuple[asyncio.Queue, str]:
+        self._loop = asyncio.get_running_loop()
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = _Channel(key, event_id, loader)
+            try:
+                channel.version, rows = await sync_to_async(_load)(loader, event_id, key[1], None)
+            except BaseException as exc:
+                # Se despierta a quienes esperaban este canal; el próximo subscribe reintenta desde cero
+                self._channels.pop(key, None)
+                channel.error = exc
+                channel.ready.set()
+                raise
+            channel.rows = rows or {}
+            channel.task = asyncio.ensure_future(self._run(channel))
+            channel.ready.set()
+        else:
+            # Otro espectador está cargando el primer snapshot del canal
+            await channel.ready.wait()
+            if channel.error is not None:
+                raise RuntimeError(f"no se pudo cargar el canal {key}") from channel.error
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        channel.subscribers.add(queue)
+        return queue, channel.snapshot()
+
+    def unsubscribe(self, key: ChannelKey, queue: asyncio.Queue) -> None:
+        channel = self._channels.get(key)
+        if channel is None:
+            return
+        channel.subscribers.discard(queue)
+        if not channel.subscribers:
+            if channel.task is not None:
+                channel.task.cancel()
+            self._channels.pop(key, None)
+
+    def notify(self, event_id: int) -> None:
+        """Thread-safe: un cambio confirmado en este proceso despierta los canales del evento."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        for channel in list(self._channels.values()):
+            if channel.event_id == event_id:
+                loop.call_soon_threadsafe(channel.wake.set)
+
+    async def _run(self, channel: _Channel) -> None:
+        failures = 0
+        while True:
+            try:
+                await asyncio.wait_for(channel.wake.wait(), POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            channel.wake.clear()
+            try:
+                # _load abre y cierra con close_old_connections(): el thread no arrastra conexiones rotas
+                version, rows = await sync_to_async(_load)(
+                    channel.loader, channel.event_id, channel.key[1], channel.version
+                )
+            except Exception:
+                # Una carga fallida no mata el canal: los espectadores conservan el último estado
+                failures += 1
+                log.exception("live hub %s: falló la recarga (intento %s)", channel.key, failures)
+                await asyncio.sleep(min(RETRY_SECONDS * 2 ** (failures - 1), RETRY_MAX_SECONDS))
+                continue
+            failures = 0
+            if rows is None:
+                continue
+            delta = diff_rows(channel.rows, rows)
+            channel.version, channel.rows = version, rows
+            if delta:
+                channel.publish(sse("delta", {"v": version, "d": delta}, version))
+
+
+hub = LiveHub()
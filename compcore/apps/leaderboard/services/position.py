@@ -0,0 +1,65 @@
+# compcore/apps/leaderboard/services/position.py
+"""
+"¿En qué puesto estoy?": la fila de un participante y sus vecinos, sin armar la tabla.
+
+Todo sale de DivisionStanding con el índice (division, rank): una búsqueda por participante y
+dos lecturas acotadas (LIMIT `around`) hacia arriba y hacia abajo. El costo no depende del
+tamaño de la división.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from ..models import DivisionStanding
+from .ranking import EntrantKey, entrant_name
+
+_FIELDS = ("id", "division_id", "rank", "team_id", "athlete_entry_id", "entrant", "total_points", "points_by_order")
+
+
+def standing_row(s: Dict[str, Any]) -> Dict[str, Any]:
+    """Fila pública; `s` trae `entrant` anotado con ranking.entrant_name()."""
+    return {
+        "rank": s["rank"],
+        "entrant": f"t{s['team_id']}" if s["team_id"] else f"a{s['athlete_entry_id']}",
+        "name": s["entrant"] or "",
+        "total": s["total_points"],
+        "points": s["points_by_order"],
+    }
+
+
+def parse_entrant(token: str) -> Optional[EntrantKey]:
+    """'t12' → ('team', 12); 'a34' → ('athlete', 34); cualquier otra cosa → None."""
+    if len(token) < 2 or token[0] not in "ta" or not token[1:].isdigit():
+        return None
+    return ("team" if token[0] == "t" else "athlete", int(token[1:]))
+
+
+def entrant_position(event_id: int, key: EntrantKey, around: int = 2) -> Optional[Dict[str, Any]]:
+    """Fila del participante en su división + `around` vecinos arriba y abajo (orden rank, id)."""
+    kind, pk = key
+    lookup = {"team_id": pk} if kind == "team" else {"athlete_entry_id": pk}
+    # order_by() vacío: el ordering del Meta obligaría a unir con Division
+    rows = (
+        DivisionStanding.objects.filter(division__event_id=event_id, **lookup)
+        .annotate(entrant=entrant_name()).order_by().values(*_FIELDS)[:1]
+    )
+    me = next(iter(rows), None)
+    if me is None:
+        return None
+
+    # Rango simple sobre (division, rank) + descarte de empatados del otro lado: un OR
+    # "rank < r OR (rank = r AND id < x)" impediría usar el índice.
+    division = DivisionStanding.objects.filter(division_id=me["division_id"]).annotate(entrant=entrant_name())
+    r, pk = me["rank"], me["id"]
+    above = list(
+        division.filter(rank__lte=r).exclude(rank=r, id__gte=pk).order_by("-rank", "-id").values(*_FIELDS)[:around]
+    )[::-1]
+    below = list(
+        division.filter(rank__gte=r).exclude(rank=r, id__lte=pk).order_by("rank", "id").values(*_FIELDS)[:around]
+    )
+    return {
+        "division_id": me["division_id"],
+        "me": standing_row(me),
+        "above": [standing_row(s) for s in above],
+        "below": [standing_row(s) for s in below],
+    }
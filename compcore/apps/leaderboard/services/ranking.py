@@ -0,0 +1,456 @@
+# compcore/apps/leaderboard/services/ranking.py
+"""
+Motor de ranking en memoria.
+
+Carga TODO lo necesario de un evento en pocas consultas planas (values_list),
+agrupa en Python y devuelve tuplas simples. La cantidad de consultas NO depende
+del número de divisiones ni de workouts:
+  • 2 consultas para participantes registrados (equipos + atletas individuales)
+  • 1 consulta para todos los HeatResult del evento
+
+Con NumPy instalado (opcional), los slices grandes (≥ NUMPY_MIN_ROWS filas, p.ej. un Open con
+miles de atletas por división) se ordenan con np.lexsort sobre columnas; el resultado es idéntico
+al camino en Python puro.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from compcore.apps.events.models import Event, Division, Workout
+from compcore.apps.judging.models import HeatResult
+from compcore.apps.registration.models import Team, AthleteEntry
+
+try:
+    import numpy as np
+except ImportError:  # opcional: sin NumPy se usa siempre el camino en Python
+    np = None
+
+# Debajo de esto armar las columnas cuesta más de lo que ahorra el sort vectorizado
+NUMPY_MIN_ROWS = 2000
+
+# ('team'|'athlete', pk) — misma convención que events.services.heats
+EntrantKey = Tuple[str, int]
+
+
+class ResultRow(NamedTuple):
+    workout_id: int
+    division_id: int
+    team_id: Optional[int]
+    athlete_entry_id: Optional[int]
+    lane: Optional[int]
+    time_seconds: Optional[int]
+    reps: Optional[int]
+    weight_kg: Any
+    penalties: Optional[int]
+    tiebreak_seconds: Optional[int]
+    status: str
+    entrant_name: Optional[str]
+    entrant_division: Optional[str]
+
+
+class RankedEntry(NamedTuple):
+    key: EntrantKey
+    rank: int      # posición 1-based dentro del slice
+    points: int
+    metric: Any    # valor mostrado en el live (tiempo/reps/peso)
+
+
+class TotalRow(NamedTuple):
+    key: EntrantKey
+    name: str
+    rank: int
+    total: int
+    cells: Dict[int, int]   # {workout.order: puntos}
+
+
+class EventRanking(NamedTuple):
+    labels: Dict[EntrantKey, str]
+    names: Dict[EntrantKey, str]                              # nombre pelado (equipo o usuario)
+    registered: Dict[int, List[EntrantKey]]                   # division_id -> participantes base
+    slices: Dict[Tuple[int, int], List[RankedEntry]]          # (workout_id, division_id) -> ranking
+
+
+# ------------------------------
+# Reglas de puntuación
+# ------------------------------
+def sort_key(
+    scoring: Optional[str],
+    time_seconds: Optional[int],
+    reps: Optional[int],
+    weight_kg: Any,
+    penalties: Optional[int],
+    tiebreak_seconds: Optional[int],
+    lane: Optional[int],
+    status: Optional[str] = "OK",
+) -> Tuple:
+    """
+    Clave de ordenamiento según tipo de scoring (antes que todo, OK por delante de DNF/DNS/DQ):
+      - TIME: menor tiempo mejor (tiebreak menor mejor, menos penalidades mejor)
+      - REPS: mayor reps mejor (menos penalidades mejor)
+      - WEIGHT: mayor peso mejor (menos penalidades mejor)
+      - POINTS: mayor puntaje mejor; el juez lo carga en `reps` (igual que results_event)
+    Peso como Decimal (sin truncar a int). Es la ÚNICA clave: leaderboard y siembra de heats la comparten.
+    """
+    st = status_rank(status)
+    if scoring == "TIME":
+        t = time_seconds if time_seconds is not None else 10**9
+        tb = tiebreak_seconds if tiebreak_seconds is not None else 10**9
+        return (st, t, tb, penalties or 0)
+    if scoring in ("REPS", "POINTS"):
+        r = reps if reps is not None else 0
+        return (st, -r, penalties or 0)
+    if scoring == "WEIGHT":
+        w = weight_kg if weight_kg is not None else 0
+        return (st, -w, penalties or 0)
+    # Fallback si no hay métrica: por lane
+    return (st, lane or 10**6)
+
+
+def status_rank(status: Optional[str]) -> int:
+    """0 para OK (o sin estado); 1 para DNF/DNS/DQ, que quedan detrás de cualquier marca válida."""
+    return 0 if status in (None, "", "OK") else 1
+
+
+# Anchos de cada componente de rank_key (todo entra holgado en un BIGINT con signo)
+_PEN_SPAN = 1000          # penalidades -500..499
+_TIME_SPAN = 10**6        # segundos (≈ 11 días); sin marca = último
+_REPS_SPAN = 10**9
+_CENTS_SPAN = 10**8       # peso en centésimas (DecimalField(6, 2) llega a 999999)
+_STATUS_STEP = 10**16     # por encima de cualquier clave de métrica (TIME llega a ~10**15)
+
+
+def _clamp(value: int, span: int) -> int:
+    return min(max(int(value), 0), span - 1)
+
+
+def rank_key(
+    scoring: Optional[str],
+    time_seconds: Optional[int],
+    reps: Optional[int],
+    weight_kg: Any,
+    penalties: Optional[int],
+    tiebreak_seconds: Optional[int],
+    lane: Optional[int],
+    status: Optional[str] = "OK",
+) -> int:
+    """
+    sort_key() aplanada a un entero (menor = mejor) para guardar en HeatResult.rank_key y
+    ordenar en la BD (página de resultados, índice por heat). El ranking con puntos lo sigue
+    haciendo rank_rows() en memoria. Mismo orden que sort_key dentro de rangos reales de
+    competencia; fuera de ellos los valores se recortan al extremo (empatan entre sí, nunca
+    saltan de lado).
+    """
+    st = status_rank(status) * _STATUS_STEP
+    pen = _clamp((penalties or 0) + _PEN_SPAN // 2, _PEN_SPAN)
+    if scoring == "TIME":
+        t = _TIME_SPAN - 1 if time_seconds is None else _clamp(time_seconds, _TIME_SPAN - 1)
+        tb = _TIME_SPAN - 1 if tiebreak_seconds is None else _clamp(tiebreak_seconds, _TIME_SPAN - 1)
+        return st + (t * _TIME_SPAN + tb) * _PEN_SPAN + pen
+    if scoring in ("REPS", "POINTS"):
+        return st + (_REPS_SPAN - 1 - _clamp(reps or 0, _REPS_SPAN)) * _PEN_SPAN + pen
+    if scoring == "WEIGHT":
+        cents = round((weight_kg or 0) * 100)
+        return st + (_CENTS_SPAN - 1 - _clamp(cents, _CENTS_SPAN)) * _PEN_SPAN + pen
+    return st + (lane or 10**6)
+
+
+def score_key(workout: Workout, r: Any) -> Tuple:
+    """Misma clave que sort_key, sobre un objeto con atributos de HeatResult."""
+    return sort_key(
+        getattr(workout, "scoring", None),
+        r.time_seconds, r.reps, r.weight_kg, r.penalties, r.tiebreak_seconds, r.lane,
+        getattr(r, "status", "OK"),
+    )
+
+
+def points_for_index(idx: int, n: int) -> int:
+    """1º = 100; decremento step=ceil(100/N); piso 2 puntos."""
+    step = math.ceil(100 / n) if n and n > 0 else 0
+    pts = 100 - idx * step
+    if pts < 2:
+        pts = 2
+    return int(pts)
+
+
+def entrant_key(team_id: Optional[int], athlete_entry_id: Optional[int]) -> Optional[EntrantKey]:
+    if team_id:
+        return ("team", team_id)
+    if athlete_entry_id:
+        return ("athlete", athlete_entry_id)
+    return None
+
+
+def entrant_name() -> Coalesce:
+    """Nombre pelado del participante (equipo o usuario) para anotar consultas con FK team / athlete_entry."""
+    return Coalesce("team__name", "athlete_entry__user__username")
+
+
+def entrant_code() -> Coalesce:
+    """
+    Entero único y estable por participante (equipo 2·pk, atleta 2·pk+1, igual que rank_rows_numpy):
+    desempate entre filas de standings con el mismo rank. Los id de DivisionStanding no sirven,
+    cambian en cada refresh (delete + bulk_create).
+    """
+    return Coalesce(F("team_id") * 2, F("athlete_entry_id") * 2 + 1)
+
+
+def entrant_label(name: Optional[str], event_name: str, division_name: Optional[str]) -> str:
+    """Mismo texto que str(Team) / str(AthleteEntry), sin lookups perezosos."""
+    return f"{name or '—'} · {event_name} · {division_name or ''}"
+
+
+def _metric(scoring: Optional[str], r: ResultRow) -> Any:
+    if scoring == "TIME" and r.time_seconds is not None:
+        return r.time_seconds
+    if scoring in ("REPS", "POINTS") and r.reps is not None:
+        return r.reps
+    if scoring == "WEIGHT" and r.weight_kg is not None:
+        return r.weight_kg
+    return "-"
+
+
+# ------------------------------
+# Carga plana
+# ------------------------------
+def load_registered_names(divisions: Sequence[Division]) -> Dict[int, Dict[EntrantKey, str]]:
+    """
+    Participantes “de referencia” por división (para N y para filas sin resultados), con su nombre:
+      - team_size == 1 -> atletas individuales (AthleteEntry sin team)
+      - team_size > 1  -> equipos (Team)
+    """
+    by_division: Dict[int, Dict[EntrantKey, str]] = {d.id: {} for d in divisions}
+    team_divs = [d.id for d in divisions if (getattr(d, "team_size", 1) or 1) > 1]
+    solo_divs = [d.id for d in divisions if d.id not in team_divs]
+
+    if team_divs:
+        for pk, division_id, name in Team.objects.filter(division_id__in=team_divs).values_list(
+            "id", "division_id", "name"
+        ):
+            by_division[division_id][("team", pk)] = name or "—"
+    if solo_divs:
+        for pk, division_id, username in AthleteEntry.objects.filter(
+            division_id__in=solo_divs, team__isnull=True
+        ).values_list("id", "division_id", "user__username"):
+            by_division[division_id][("athlete", pk)] = username or "—"
+    return by_division
+
+
+def load_registered(event: Event, divisions: Sequence[Division]) -> Dict[int, Dict[EntrantKey, str]]:
+    """Como load_registered_names(), con la etiqueta completa (ver entrant_label)."""
+    names = {d.id: d.name for d in divisions}
+    return {
+        division_id: {key: entrant_label(name, event.name, names[division_id]) for key, name in by_key.items()}
+        for division_id, by_key in load_registered_names(divisions).items()
+    }
+
+
+def load_results(
+    workout_ids: Iterable[int],
+    division_ids: Optional[Iterable[int]] = None,
+) -> List[ResultRow]:
+    """Todos los HeatResult de los workouts dados en UNA consulta plana."""
+    qs = HeatResult.objects.filter(heat__workout_id__in=list(workout_ids))
+    if division_ids is not None:
+        qs = qs.filter(heat__division_id__in=list(division_ids))
+    qs = qs.annotate(
+        entrant_name=entrant_name(),
+        entrant_division=Coalesce("team__division__name", "athlete_entry__division__name"),
+    ).order_by()
+    return [
+        ResultRow(*row)
+        for row in qs.values_list(
+            "heat__workout_id", "heat__division_id", "team_id", "athlete_entry_id", "lane",
+            "time_seconds", "reps", "weight_kg", "penalties", "tiebreak_seconds", "status",
+            "entrant_name", "entrant_division",
+        )
+    ]
+
+
+# ------------------------------
+# Cálculo en memoria
+# ------------------------------
+def rank_rows(scoring: Optional[str], rows: Iterable[ResultRow], n: int) -> List[RankedEntry]:
+    """
+    Ordena un slice (workout, division) y asigna puntos.
+    El índice cuenta todas las filas (como el leaderboard original); si un participante
+    aparece dos veces se conserva su mejor marca.
+    """
+    rows = list(rows)
+    if np is not None and len(rows) >= NUMPY_MIN_ROWS:
+        return rank_rows_numpy(scoring, rows, n)
+    return rank_rows_python(scoring, rows, n)
+
+
+def rank_rows_python(scoring: Optional[str], rows: Sequence[ResultRow], n: int) -> List[RankedEntry]:
+    ordered = sorted(
+        rows,
+        key=lambda r: sort_key(
+            scoring, r.time_seconds, r.reps, r.weight_kg, r.penalties, r.tiebreak_seconds, r.lane, r.status,
+        ),
+    )
+    ranked: List[RankedEntry] = []
+    seen = set()
+    for idx, r in enumerate(ordered):
+        key = entrant_key(r.team_id, r.athlete_entry_id)
+        if key is None or key in seen:
+            continue
+        seen.add(key)
+        ranked.append(RankedEntry(key, idx + 1, points_for_index(idx, n), _metric(scoring, r)))
+    return ranked
+
+
+def _sort_columns(scoring: Optional[str], rows: Sequence[ResultRow]) -> list:
+    """Columnas int64 equivalentes a sort_key(), de la clave más significativa a la menos."""
+    def col(values):
+        return np.fromiter(values, dtype=np.int64, count=len(rows))
+
+    status = col(status_rank(r.status) for r in rows)
+    penalties = col(r.penalties or 0 for r in rows)
+    if scoring == "TIME":
+        return [
+            status,
+            col(10**9 if r.time_seconds is None else r.time_seconds for r in rows),
+            col(10**9 if r.tiebreak_seconds is None else r.tiebreak_seconds for r in rows),
+            penalties,
+        ]
+    if scoring in ("REPS", "POINTS"):
+        return [status, col(-(r.reps or 0) for r in rows), penalties]
+    if scoring == "WEIGHT":
+        # Decimal(6,2) → centésimas enteras: mismo orden que comparar los Decimal
+        return [status, col(-round((r.weight_kg or 0) * 100) for r in rows), penalties]
+    return [status, col(r.lane or 10**6 for r in rows)]
+
+
+def rank_rows_numpy(scoring: Optional[str], rows: Sequence[ResultRow], n: int) -> List[RankedEntry]:
+    """Mismo resultado que rank_rows_python con np.lexsort (estable, igual que sorted)."""
+    if not rows:
+        return []
+    columns = _sort_columns(scoring, rows)
+    order = np.lexsort(columns[::-1])  # lexsort usa la ÚLTIMA columna como clave principal
+
+    # Participante codificado en un entero: equipo 2·pk, atleta 2·pk+1, sin participante -1
+    codes = np.fromiter(
+        (2 * r.team_id if r.team_id else (2 * r.athlete_entry_id + 1 if r.athlete_entry_id else -1) for r in rows),
+        dtype=np.int64, count=len(rows),
+    )[order]
+    _, first = np.unique(codes, return_index=True)
+    keep = np.zeros(len(rows), dtype=bool)
+    keep[first] = True
+    keep &= codes >= 0
+    idx = np.flatnonzero(keep)
+
+    step = math.ceil(100 / n) if n and n > 0 else 0
+    points = np.maximum(100 - idx * step, 2)
+
+    # Misma métrica que _metric(), resuelta una vez por slice y no por fila
+    field = {"TIME": "time_seconds", "REPS": "reps", "POINTS": "reps", "WEIGHT": "weight_kg"}.get(scoring)
+    make = RankedEntry._make  # sin el __new__ en Python de NamedTuple: pesa con 100k filas
+    out: List[RankedEntry] = []
+    append = out.append
+    for j, i, p in zip(order[idx].tolist(), idx.tolist(), points.tolist()):
+        r = rows[j]
+        metric = getattr(r, field) if field else None
+        key = ("team", r.team_id) if r.team_id else ("athlete", r.athlete_entry_id)
+        append(make((key, i + 1, p, "-" if metric is None else metric)))
+    return out
+
+
+def build_totals(labels: Dict[EntrantKey, str], cells_by_key: Dict[EntrantKey, Dict[int, int]]) -> List[TotalRow]:
+    """
+    Totales de una división: total desc, nombre asc; ranking de competición (1, 1, 3…).
+    cells_by_key debe incluir también a los registrados sin resultados (dict vacío).
+    """
+    rows = [
+        (key, labels.get(key, ""), sum(cells.values()), cells)
+        for key, cells in cells_by_key.items()
+    ]
+    rows.sort(key=lambda x: (-x[2], x[1]))
+
+    out: List[TotalRow] = []
+    rank = 0
+    prev_total = None
+    for pos, (key, name, total, cells) in enumerate(rows, start=1):
+        if total != prev_total:
+            rank = pos
+            prev_total = total
+        out.append(TotalRow(key, name, rank, int(total), cells))
+    return out
+
+
+def rank_event(event: Event, workouts: Sequence[Workout], divisions: Sequence[Division]) -> EventRanking:
+    """Un único pase para todo el evento: 3 consultas, sin importar divisiones × workouts."""
+    registered = load_registered_names(divisions) if divisions else {}
+    division_names = {d.id: d.name for d in divisions}
+    names: Dict[EntrantKey, str] = {}
+    labels: Dict[EntrantKey, str] = {}
+    for division_id, keys in registered.items():
+        names.update(keys)
+        for key, name in keys.items():
+            labels[key] = entrant_label(name, event.name, division_names[division_id])
+
+    grouped: Dict[Tuple[int, int], List[ResultRow]] = {}
+    division_ids = {d.id for d in divisions}
+    if workouts and divisions:
+        for r in load_results([w.id for w in workouts], division_ids):
+            grouped.setdefault((r.workout_id, r.division_id), []).append(r)
+            key = entrant_key(r.team_id, r.athlete_entry_id)
+            if key is not None and key not in labels:
+                names[key] = r.entrant_name or "—"
+                labels[key] = entrant_label(r.entrant_name, event.name, r.entrant_division)
+
+    scoring_by_id = {w.id: w.scoring for w in workouts}
+    slices = {
+        (workout_id, division_id): rank_rows(
+            scoring_by_id.get(workout_id), rows, len(registered.get(division_id, {}))
+        )
+        for (workout_id, division_id), rows in grouped.items()
+    }
+    return EventRanking(
+        labels=labels,
+        names=names,
+        registered={division_id: list(keys) for division_id, keys in registered.items()},
+        slices=slices,
+    )
+
+
+def division_totals(ranking: EventRanking, division_id: int, workouts: Sequence[Workout]) -> List[TotalRow]:
+    """Totales de una división a partir de un EventRanking ya calculado (sin consultas)."""
+    cells_by_key: Dict[EntrantKey, Dict[int, int]] = {
+        key: {} for key in ranking.registered.get(division_id, [])
+    }
+    for w in workouts:
+        for entry in ranking.slices.get((w.id, division_id), []):
+            cells_by_key.setdefault(entry.key, {})[w.order] = entry.points
+    return build_totals(ranking.labels, cells_by_key)
+
+
+def seeding_order(ranking: EventRanking, division_id: int, workouts: Sequence[Workout]) -> List[EntrantKey]:
+    """
+    Orden PEOR→MEJOR por puntos acumulados en `workouts` (para sembrar heats W2+).
+    Desempate: peor posición en el último WOD donde el participante tuvo resultado
+    (sin resultado = peor), luego nombre asc.
+    """
+    cells_by_key: Dict[EntrantKey, Dict[int, int]] = {
+        key: {} for key in ranking.registered.get(division_id, [])
+    }
+    last_rank: Dict[EntrantKey, int] = {}
+    for w in sorted(workouts, key=lambda w: w.order):
+        for entry in ranking.slices.get((w.id, division_id), []):
+            if entry.key not in cells_by_key:
+                continue
+            cells_by_key[entry.key][w.order] = entry.points
+            last_rank[entry.key] = entry.rank
+
+    no_result = 10**9
+    return sorted(
+        cells_by_key,
+        key=lambda key: (
+            sum(cells_by_key[key].values()),
+            -last_rank.get(key, no_result),
+            ranking.labels.get(key, ""),
+        ),
+    )
@@ -0,0 +1,217 @@
+# compcore/apps/leaderboard/services/standings.py
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+from django.db import transaction
+
+from compcore.apps.events.models import Event, Division, Workout
+from compcore.apps.judging.models import HeatResult
+from compcore.apps.events.services.results_version import claim_results_version
+
+from ..models import WorkoutStanding, DivisionStanding
+from .ranking import (
+    EntrantKey,
+    RankedEntry,
+    build_totals,
+    division_totals,
+    entrant_key,
+    entrant_label,
+    load_registered,
+    load_results,
+    rank_event,
+    rank_key,
+    rank_rows,
+)
+
+
+def _fk_kwargs(key: EntrantKey) -> Dict[str, Optional[int]]:
+    kind, pk = key
+    if kind == "team":
+        return {"team_id": pk, "athlete_entry_id": None}
+    return {"team_id": None, "athlete_entry_id": pk}
+
+
+def _registered_labels(division: Division) -> Dict[EntrantKey, str]:
+    return load_registered(division.event, [division])[division.id]
+
+
+def _slice_objects(
+    workout_id: int, division_id: int, ranked: Sequence[RankedEntry], labels: Dict[EntrantKey, str]
+) -> List[WorkoutStanding]:
+    return [
+        WorkoutStanding(
+            workout_id=workout_id,
+            division_id=division_id,
+            display_name=labels.get(entry.key, ""),
+            rank=entry.rank,
+            points=entry.points,
+            **_fk_kwargs(entry.key),
+        )
+        for entry in ranked
+    ]
+
+
+def refresh_rank_keys(workout_ids) -> int:
+    """
+    Recalcula HeatResult.rank_key de los workouts dados (p.ej. tras cambiar el scoring o tras
+    escrituras en bloque que no pasan por save()). Solo escribe las filas que cambian.
+    """
+    stale = []
+    for pk, current, scoring, t, reps, weight, pen, tb, lane, status in HeatResult.objects.filter(
+        heat__workout_id__in=list(workout_ids)
+    ).values_list(
+        "id", "rank_key", "heat__workout__scoring", "time_seconds", "reps", "weight_kg",
+        "penalties", "tiebreak_seconds", "lane", "status",
+    ):
+        key = rank_key(scoring, t, reps, weight, pen, tb, lane, status)
+        if key != current:
+            stale.append(HeatResult(pk=pk, rank_key=key))
+    HeatResult.objects.bulk_update(stale, ["rank_key"], batch_size=500)
+    return len(stale)
+
+
+# ------------------------------
+# Recalculo incremental
+# ------------------------------
+def _refresh_slice(workout: Workout, division: Division, registered: Dict[EntrantKey, str]) -> int:
+    """Re-rankea un único (workout, division) y reescribe sus WorkoutStanding."""
+    rows = load_results([workout.id], [division.id])
+    ranked = rank_rows(workout.scoring, rows, len(registered))
+
+    labels = dict(registered)
+    for r in rows:
+        key = entrant_key(r.team_id, r.athlete_entry_id)
+        if key is not None and key not in labels:
+            labels[key] = entrant_label(r.entrant_name, division.event.name, r.entrant_division)
+
+    WorkoutStanding.objects.filter(workout=workout, division=division).delete()
+    WorkoutStanding.objects.bulk_create(_slice_objects(workout.id, division.id, ranked, labels))
+    return len(ranked)
+
+
+def _write_totals(division_id: int, totals, version: int) -> int:
+    """
+    Reescribe los totales de la división. Las filas cuyo rank/puntos no cambiaron conservan su
+    changed_version; el resto queda marcado con `version` (ver claim_results_version).
+    """
+    previous = {
+        entrant_key(team_id, entry_id): (rank, total, by_order, changed)
+        for team_id, entry_id, rank, total, by_order, changed in DivisionStanding.objects.filter(
+            division_id=division_id
+        ).values_list("team_id", "athlete_entry_id", "rank", "total_points", "points_by_order", "changed_version")
+    }
+    objs = []
+    for row in totals:
+        by_order = {str(order): pts for order, pts in row.cells.items()}
+        before = previous.get(row.key)
+        unchanged = before is not None and before[:3] == (row.rank, row.total, by_order)
+        objs.append(
+            DivisionStanding(
+                division_id=division_id,
+                display_name=row.name,
+                rank=row.rank,
+                total_points=row.total,
+                points_by_order=by_order,
+                changed_version=before[3] if unchanged else version,
+                **_fk_kwargs(row.key),
+            )
+        )
+    DivisionStanding.objects.filter(division_id=division_id).delete()
+    DivisionStanding.objects.bulk_create(objs)
+    return len(objs)
+
+
+def _refresh_division_totals(division: Division, registered: Dict[EntrantKey, str], version: int) -> int:
+    """Recalcula los totales de una división a partir de los WorkoutStanding de WODs publicados."""
+    published = dict(
+        Workout.objects.filter(event_id=division.event_id, is_published=True).values_list("id", "order")
+    )
+
+    cells_by_key: Dict[EntrantKey, Dict[int, int]] = {key: {} for key in registered}
+    labels = dict(registered)
+    for workout_id, team_id, entry_id, pts, name in WorkoutStanding.objects.filter(
+        division=division, workout_id__in=list(published)
+    ).values_list("workout_id", "team_id", "athlete_entry_id", "points", "display_name"):
+        key = entrant_key(team_id, entry_id)
+        if key is None:
+            continue
+        cells_by_key.setdefault(key, {})[published[workout_id]] = int(pts)
+        labels.setdefault(key, name)
+
+    return _write_totals(division.id, build_totals(labels, cells_by_key), version)
+
+
+# ------------------------------
+# Entradas públicas de servicio
+# ------------------------------
+def refresh_standings(workout: Workout, division: Division) -> Dict[str, int]:
+    """
+    Punto de entrada tras guardar resultados de un heat:
+    re-rankea solo (workout, division) y actualiza los totales de esa división.
+    """
+    with transaction.atomic():
+        # Primero la versión: bloquea la fila del evento y marca las filas que cambian
+        version = claim_results_version(division.event_id)
+        registered = _registered_labels(division)
+        slice_rows = _refresh_slice(workout, division, registered)
+        total_rows = _refresh_division_totals(division, registered, version)
+    return {"workout_rows": slice_rows, "division_rows": total_rows}
+
+
+def refresh_division(division: Division) -> Dict[str, int]:
+    """
+    Altas, bajas o cambios de división en la inscripción: cambia N (y con él los puntos de cada
+    posición) y las etiquetas, así que se re-rankean todos los WODs de la división y sus totales.
+    """
+    with transaction.atomic():
+        version = claim_results_version(division.event_id)
+        registered = _registered_labels(division)
+        slice_rows = sum(
+            _refresh_slice(workout, division, registered)
+            for workout in Workout.objects.filter(event_id=division.event_id).order_by("order")
+        )
+        total_rows = _refresh_division_totals(division, registered, version)
+    return {"workout_rows": slice_rows, "division_rows": total_rows}
+
+
+def refresh_event_totals(event: Event) -> int:
+    """Recalcula solo los totales (p.ej. al publicar/despublicar WODs)."""
+    rows = 0
+    with transaction.atomic():
+        version = claim_results_version(event.id)
+        for division in Division.objects.filter(event=event).select_related("event"):
+            rows += _refresh_division_totals(division, _registered_labels(division), version)
+    return rows
+
+
+def rebuild_standings(event: Optional[Event] = None) -> Dict[str, int]:
+    """
+    Reconstrucción completa desde HeatResult (recuperación).
+    Usa el motor de ranking: un pase en memoria por evento (pocas consultas).
+    """
+    events = [event] if event is not None else list(Event.objects.all())
+    stats = {"events": 0, "slices": 0, "workout_rows": 0, "division_rows": 0, "rank_keys": 0}
+    for ev in events:
+        workouts = list(Workout.objects.filter(event=ev).order_by("order"))
+        stats["rank_keys"] += refresh_rank_keys([w.id for w in workouts])
+        divisions = list(Division.objects.filter(event=ev))
+        ranking = rank_event(ev, workouts, divisions)
+
+        objs: List[WorkoutStanding] = []
+        for (workout_id, division_id), ranked in ranking.slices.items():
+            objs.extend(_slice_objects(workout_id, division_id, ranked, ranking.labels))
+            stats["slices"] += 1
+
+        with transaction.atomic():
+            version = claim_results_version(ev.id)
+            WorkoutStanding.objects.filter(workout__event=ev).delete()
+            WorkoutStanding.objects.bulk_create(objs)
+            stats["workout_rows"] += len(objs)
+            published = [w for w in workouts if w.is_published]
+            for division in divisions:
+                stats["division_rows"] += _write_totals(
+                    division.id, division_totals(ranking, division.id, published), version
+                )
+        stats["events"] += 1
+    return stats
@@ -0,0 +1,81 @@
+# compcore/apps/leaderboard/signals.py
+"""
+Inscripción → standings. Un Team o AthleteEntry que se crea, se borra, cambia de división (o de
+equipo / nombre) cambia N de la división y por lo tanto los puntos: se re-rankea la división
+(services.standings.refresh_division) al COMMIT y una sola vez por división y transacción, así
+importar 200 equipos no recalcula 200 veces.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+# Campos que cambian N o la etiqueta del participante
+TRACKED = {"registration.Team": ("division_id", "name"), "registration.AthleteEntry": ("division_id", "team_id")}
+
+
+def _pending() -> set:
+    conn = transaction.get_connection()
+    if not hasattr(conn, "_standings_divisions"):
+        conn._standings_divisions = set()
+    return conn._standings_divisions
+
+
+def _flush() -> None:
+    from compcore.apps.events.models import Division
+    from .services.standings import refresh_division
+
+    pending = _pending()
+    ids = list(pending)
+    pending.clear()
+    # Divisiones borradas en la misma transacción (cascada) ya no están: se saltean
+    for division in Division.objects.filter(pk__in=ids).select_related("event"):
+        refresh_division(division)
+
+
+def schedule_division_refresh(division_ids: Iterable[Optional[int]]) -> None:
+    ids = {pk for pk in division_ids if pk}
+    if not ids:
+        return
+    _pending().update(ids)
+    # Un callback por cambio: el primero que corre vacía el conjunto y el resto no hace nada. Si la
+    # transacción se revierte, las divisiones quedan y se refrescan con el próximo commit (de más, no de menos).
+    transaction.on_commit(_flush)
+
+
+def _label(sender) -> str:
+    return sender._meta.label
+
+
+def _remember(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    fields = TRACKED[_label(sender)]
+    instance._standings_before = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+
+
+def _on_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, "_standings_before", None)
+    now = tuple(getattr(instance, f) for f in TRACKED[_label(sender)])
+    if created or before is None:
+        schedule_division_refresh([instance.division_id])
+    elif before != now:
+        schedule_division_refresh([before[0], instance.division_id])
+    instance._standings_before = now
+
+
+def _on_delete(sender, instance, **kwargs):
+    schedule_division_refresh([instance.division_id])
+
+
+def connect_standings_signals() -> None:
+    uid = "leaderboard.standings"
+    for label in TRACKED:
+        name = label.split(".")[1].lower()
+        pre_save.connect(_remember, sender=label, dispatch_uid=f"{uid}.{name}.pre")
+        post_save.connect(_on_save, sender=label, dispatch_uid=f"{uid}.{name}.save")
+        post_delete.connect(_on_delete, sender=label, dispatch_uid=f"{uid}.{name}.delete")
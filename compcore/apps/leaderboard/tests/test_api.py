@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from compcore.apps.accounts.models import Profile
+from compcore.apps.events.models import Event, Division, Workout, WorkoutHeat
+from compcore.apps.judging.models import HeatResult
+from compcore.apps.registration.models import AthleteEntry
+from compcore.apps.leaderboard.services.position import entrant_position
+from compcore.apps.leaderboard.services.standings import rebuild_standings, refresh_standings
+
+User = get_user_model()
+
+
+class DivisionApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Api Games", slug="api-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        cls.workout = Workout.objects.create(event=cls.event, order=1, name="W1", scoring="REPS", is_published=True)
+        users = User.objects.bulk_create([User(username=f"api-{i}") for i in range(5)])
+        cls.entries = AthleteEntry.objects.bulk_create(
+            [AthleteEntry(user=u, event=cls.event, division=cls.division) for u in users]
+        )
+        heat = WorkoutHeat.objects.create(workout=cls.workout, division=cls.division, heat_number=1)
+        HeatResult.objects.bulk_create(
+            [HeatResult(heat=heat, lane=i + 1, reps=50 - i, athlete_entry=e) for i, e in enumerate(cls.entries)],
+            update_conflicts=True, unique_fields=["heat", "lane"], update_fields=["reps", "athlete_entry"],
+        )
+
+    def setUp(self):
+        cache.clear()
+        rebuild_standings(self.event)
+        self.url = reverse("leaderboard_api_division", args=[self.event.slug, self.division.slug])
+
+    def _get(self, url, **params):
+        r = self.client.get(url, params)
+        self.assertEqual(r.status_code, 200)
+        return r.json()
+
+    def test_keyset_pagination(self):
+        first = self._get(self.url, limit=2)
+        self.assertEqual(first["count"], 5)
+        self.assertEqual([r["rank"] for r in first["rows"]], [1, 2])
+
+        seen = list(first["rows"])
+        page = first
+        while page["next"]:
+            page = self._get(page["next"])
+            seen.extend(page["rows"])
+        self.assertEqual([r["rank"] for r in seen], [1, 2, 3, 4, 5])
+        self.assertEqual(len({r["entrant"] for r in seen}), 5)
+
+    def test_cursor_survives_refresh_with_ties(self):
+        # Un segundo WOD con el orden invertido: todos suman lo mismo y empatan en rank 1
+        w2 = Workout.objects.create(event=self.event, order=2, name="W2", scoring="REPS", is_published=True)
+        heat = WorkoutHeat.objects.create(workout=w2, division=self.division, heat_number=1)
+        HeatResult.objects.bulk_create(
+            [HeatResult(heat=heat, lane=i + 1, reps=10 + i, athlete_entry=e) for i, e in enumerate(self.entries)],
+            update_conflicts=True, unique_fields=["heat", "lane"], update_fields=["reps", "athlete_entry"],
+        )
+        rebuild_standings(self.event)
+        first = self._get(self.url, limit=2)
+        self.assertEqual({r["rank"] for r in first["rows"]}, {1})
+
+        # El refresh recrea las filas (ids nuevos) entre una página y la siguiente
+        refresh_standings(self.workout, self.division)
+        seen = list(first["rows"])
+        page = first
+        while page["next"]:
+            page = self._get(page["next"])
+            seen.extend(page["rows"])
+        self.assertEqual(sorted(r["entrant"] for r in seen), sorted(f"a{e.id}" for e in self.entries))
+
+    def test_since_returns_only_changed_rows(self):
+        version = self._get(self.url)["version"]
+        self.assertEqual(self._get(self.url, since=version)["rows"], [])
+
+        # El último pasa al primer puesto: se corren todas las posiciones
+        last = self.entries[-1]
+        HeatResult.objects.filter(athlete_entry=last).update(reps=99)
+        refresh_standings(self.workout, self.division)
+
+        delta = self._get(self.url, since=version)
+        self.assertGreater(delta["version"], version)
+        self.assertEqual(delta["rows"][0], dict(delta["rows"][0], entrant=f"a{last.id}", rank=1))
+        self.assertEqual(len(delta["rows"]), 5)
+
+        # Mejor marca sin cambio de rank ni puntos: no hay delta
+        HeatResult.objects.filter(athlete_entry=self.entries[0]).update(reps=60)
+        refresh_standings(self.workout, self.division)
+        delta2 = self._get(self.url, since=delta["version"])
+        self.assertEqual(delta2["rows"], [])
+
+    def test_bad_params(self):
+        self.assertEqual(self.client.get(self.url, {"limit": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"cursor": "nope"}).status_code, 400)
+
+    def test_entrant_position_with_neighbours(self):
+        target = self.entries[2]  # 3º de 5
+        url = reverse("leaderboard_api_entrant", args=[self.event.slug, f"a{target.id}"])
+        with self.assertNumQueries(3):  # fila + arriba + abajo, sin importar el tamaño
+            entrant_position(self.event.id, ("athlete", target.id), around=1)
+        data = self._get(url, around=1)
+        self.assertEqual(data["me"]["rank"], 3)
+        self.assertEqual(data["me"]["name"], target.user.username)
+        self.assertEqual([r["rank"] for r in data["above"]], [2])
+        self.assertEqual([r["rank"] for r in data["below"]], [4])
+
+        self.client.force_login(target.user)
+        mine = self._get(reverse("leaderboard_api_me", args=[self.event.slug]))
+        self.assertEqual(mine["me"], data["me"])
+        self.assertEqual(len(mine["above"]), 2)
+
+        missing = reverse("leaderboard_api_entrant", args=[self.event.slug, "a999999"])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_derived_filters(self):
+        dobs = [date(1980, 1, 1), date(1995, 1, 1), date(1982, 6, 1), date(1990, 1, 1), date(1979, 1, 1)]
+        Profile.objects.bulk_create([
+            Profile(user_id=e.user_id, sex="F" if i % 2 else "M", date_of_birth=dobs[i], gym="Box Norte" if i < 2 else "Box Sur")
+            for i, e in enumerate(self.entries)
+        ])
+        Event.objects.filter(pk=self.event.pk).update(start_date=date(2026, 3, 1))
+        cache.clear()
+
+        women = self._get(self.url, sex="F")
+        self.assertEqual([(r["rank"], r["overall_rank"]) for r in women["rows"]], [(1, 2), (2, 4)])
+        self.assertEqual(women["count"], 2)
+
+        masters = self._get(self.url, age="40+", limit=1)
+        self.assertEqual([r["overall_rank"] for r in masters["rows"]], [1])
+        self.assertEqual([r["overall_rank"] for r in self._get(masters["next"])["rows"]], [3])
+
+        # Con el índice en caché, filtrar no agrega consultas (solo sello, evento y división)
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {"gym": "box  NORTE"})
+        self.assertEqual(self.client.get(self.url, {"age": "x"}).status_code, 400)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.db.models import F
+from django.test import TransactionTestCase
+
+from compcore.apps.events.models import Event
+from compcore.apps.leaderboard.services import live_hub
+from compcore.apps.leaderboard.services.live_hub import LiveHub
+
+
+class LiveHubSubscribeTest(TransactionTestCase):
+    def setUp(self):
+        self.event = Event.objects.create(name="Hub Games", slug="hub-games")
+
+    def test_failed_first_load_releases_waiters(self):
+        hub = LiveHub()
+        key = ("event", self.event.id)
+
+        def broken(event_id, ref_id):
+            time.sleep(0.05)  # el segundo espectador llega mientras carga
+            raise ValueError("boom")
+
+        async def scenario():
+            first = asyncio.ensure_future(hub.subscribe(key, self.event.id, broken))
+            await asyncio.sleep(0)
+            second = asyncio.wait_for(hub.subscribe(key, self.event.id, broken), 2)
+            return await asyncio.gather(first, second, return_exceptions=True)
+
+        first, second = asyncio.run(scenario())
+        self.assertIsInstance(first, ValueError)
+        self.assertIsInstance(second, RuntimeError)  # no un TimeoutError: nadie queda colgado
+        self.assertIsInstance(second.__cause__, ValueError)
+
+        # El canal fallido no queda registrado: el siguiente subscribe vuelve a cargar
+        async def retry():
+            queue, snapshot = await hub.subscribe(key, self.event.id, lambda event_id, ref_id: {})
+            hub.unsubscribe(key, queue)
+            return snapshot
+
+        self.assertIn("event: snapshot", asyncio.run(retry()))
+
+    def test_failed_reload_keeps_channel_alive(self):
+        hub = LiveHub()
+        key = ("event", self.event.id)
+        calls = []
+
+        def flaky(event_id, ref_id):
+            calls.append(ref_id)
+            if len(calls) == 2:
+                raise ValueError("boom")
+            return {"1": {"a1": [1, 100, None, "uno"]}} if len(calls) > 2 else {}
+
+        async def scenario():
+            queue, _snapshot = await hub.subscribe(key, self.event.id, flaky)
+            await sync_to_async(Event.objects.filter(pk=self.event.id).update)(results_version=F("results_version") + 1)
+            hub.notify(self.event.id)
+            try:
+                return await asyncio.wait_for(queue.get(), 2)
+            finally:
+                hub.unsubscribe(key, queue)
+
+        with mock.patch.object(live_hub, "RETRY_SECONDS", 0.01), \
+                mock.patch.object(live_hub, "POLL_SECONDS", 0.01), \
+                self.assertLogs(live_hub.log, "ERROR"):
+            message = asyncio.run(scenario())
+        self.assertIn("event: delta", message)
+        self.assertGreaterEqual(len(calls), 3)  # la carga que falló se reintentó
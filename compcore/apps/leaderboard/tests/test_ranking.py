@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import random
+import unittest
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from compcore.apps.events.models import Event, Division, Workout, WorkoutHeat
+from compcore.apps.judging.models import HeatResult
+from compcore.apps.registration.models import AthleteEntry, Team
+from compcore.apps.leaderboard.services import ranking as ranking_mod
+from compcore.apps.leaderboard.services.live_hub import load_workout_rows
+from compcore.apps.leaderboard.services.ranking import (
+    ResultRow, division_totals, rank_event, rank_key, sort_key,
+)
+from compcore.apps.leaderboard.services.standings import refresh_rank_keys
+
+User = get_user_model()
+
+
+class RankingEngineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Engine Games", slug="engine-games")
+        cls.captain = User.objects.create(username="captain")
+
+    def _add_division(self, idx: int, team_size: int = 1, size: int = 4) -> Division:
+        d = Division.objects.create(event=self.event, name=f"Div {idx}", team_size=team_size)
+        if team_size > 1:
+            Team.objects.bulk_create(
+                [Team(event=self.event, division=d, name=f"T{idx}-{i}", captain=self.captain, join_code=f"J{idx}X{i}")
+                 for i in range(size)]
+            )
+        else:
+            users = User.objects.bulk_create([User(username=f"u{idx}-{i}") for i in range(size)])
+            AthleteEntry.objects.bulk_create([AthleteEntry(user=u, event=self.event, division=d) for u in users])
+        return d
+
+    def _add_workout(self, order: int, scoring: str = "TIME") -> Workout:
+        return Workout.objects.create(event=self.event, order=order, name=f"W{order}", scoring=scoring, is_published=True)
+
+    def _score(self, workout: Workout, division: Division) -> None:
+        heat = WorkoutHeat.objects.create(workout=workout, division=division, heat_number=division.id * 10)
+        if division.team_size > 1:
+            entrants = [{"team": t} for t in Team.objects.filter(division=division).order_by("id")]
+        else:
+            entrants = [{"athlete_entry": a} for a in AthleteEntry.objects.filter(division=division).order_by("id")]
+        # El heat ya trae sus lanes vacíos: se cargan los resultados sobre esas filas
+        HeatResult.objects.bulk_create(
+            [HeatResult(heat=heat, lane=i + 1, time_seconds=300 + i, reps=50 - i, **who) for i, who in enumerate(entrants)],
+            update_conflicts=True, unique_fields=["heat", "lane"],
+            update_fields=["time_seconds", "reps", "team", "athlete_entry"],
+        )
+
+    def _count_queries(self) -> int:
+        workouts = list(Workout.objects.filter(event=self.event))
+        divisions = list(Division.objects.filter(event=self.event))
+        with CaptureQueriesContext(connection) as ctx:
+            ranking = rank_event(self.event, workouts, divisions)
+            for d in divisions:
+                division_totals(ranking, d.id, workouts)
+        return len(ctx.captured_queries)
+
+    def test_query_count_constant(self):
+        d1 = self._add_division(1)
+        d2 = self._add_division(2, team_size=3)
+        w1 = self._add_workout(1)
+        self._score(w1, d1)
+        self._score(w1, d2)
+        baseline = self._count_queries()
+
+        extra_divs = [self._add_division(i, team_size=(2 if i % 2 else 1)) for i in range(3, 9)]
+        extra_wods = [self._add_workout(o, scoring=("REPS" if o % 2 else "TIME")) for o in range(2, 6)]
+        for w in [w1] + extra_wods:
+            for d in extra_divs:
+                self._score(w, d)
+
+        self.assertEqual(self._count_queries(), baseline)
+        self.assertLessEqual(baseline, 3)
+
+    def test_points_and_totals(self):
+        d = self._add_division(1)
+        w1 = self._add_workout(1, "TIME")
+        w2 = self._add_workout(2, "REPS")
+        self._score(w1, d)
+        self._score(w2, d)
+
+        workouts = [w1, w2]
+        ranking = rank_event(self.event, workouts, [d])
+        points = [e.points for e in ranking.slices[(w1.id, d.id)]]
+        self.assertEqual(points, [100, 75, 50, 25])
+
+        totals = division_totals(ranking, d.id, workouts)
+        self.assertEqual([row.total for row in totals], [200, 150, 100, 50])
+        self.assertEqual(totals[0].name, "u1-0 · Engine Games · Div 1")
+
+    def test_rank_key_order_matches_engine(self):
+        d1 = self._add_division(1)
+        d2 = self._add_division(2, team_size=2)
+        workouts = [self._add_workout(1, "TIME"), self._add_workout(2, "REPS"), self._add_workout(3, "WEIGHT")]
+        for w in workouts:
+            self._score(w, d1)
+            self._score(w, d2)
+        HeatResult.objects.filter(heat__workout=workouts[2]).update(weight_kg=Decimal("80.5"))
+        self.assertGreater(refresh_rank_keys([w.id for w in workouts]), 0)
+
+        ranking = rank_event(self.event, workouts, [d1, d2])
+        for w in workouts:  # incluye el empate total de peso (desempate por lane)
+            for d in (d1, d2):
+                # Ordenar en la BD por rank_key (página de resultados) da el mismo orden que el motor
+                in_db = [
+                    ("team", t) if t else ("athlete", a)
+                    for t, a in HeatResult.objects.filter(heat__workout=w, heat__division=d)
+                    .exclude(team__isnull=True, athlete_entry__isnull=True).order_by("rank_key", "lane").values_list("team_id", "athlete_entry_id")
+                ]
+                self.assertEqual(in_db, [e.key for e in ranking.slices[(w.id, d.id)]])
+
+        # save() mantiene la clave al día
+        result = HeatResult.objects.filter(heat__workout=workouts[0], heat__division=d1).first()
+        result.time_seconds = 1
+        result.save(update_fields=["time_seconds"])
+        result.refresh_from_db()
+        self.assertEqual(result.rank_key, rank_key("TIME", 1, result.reps, None, 0, None, result.lane))
+
+    def test_bare_names_keep_separator(self):
+        d = self._add_division(1, team_size=2, size=2)
+        w = self._add_workout(1, "REPS")
+        Team.objects.filter(division=d, name="T1-0").update(name="Box · Norte")
+        self._score(w, d)
+        ranking = rank_event(self.event, [w], [d])
+        team = Team.objects.get(name="Box · Norte")
+        # El nombre pelado viene del loader, no de cortar la etiqueta en el primer " · "
+        self.assertEqual(ranking.names[("team", team.id)], "Box · Norte")
+        self.assertEqual(ranking.labels[("team", team.id)], "Box · Norte · Engine Games · Div 1")
+        rows = load_workout_rows(self.event.id, w.id)
+        self.assertEqual(rows[str(d.id)][f"t{team.id}"][3], "Box · Norte")
+
+
+class RankKeyParityTest(SimpleTestCase):
+    def test_same_order_as_sort_key(self):
+        rng = random.Random(3)
+
+        def maybe(value):
+            return None if rng.random() < 0.15 else value
+
+        for scoring in ("TIME", "REPS", "POINTS", "WEIGHT", None):
+            rows = [
+                (maybe(rng.randrange(0, 4000)), maybe(rng.randrange(0, 300)),
+                 maybe(Decimal(rng.randrange(0, 999999)) / 100), rng.choice([0, 1, 3, -2, None]),
+                 maybe(rng.randrange(0, 900)), maybe(rng.randrange(0, 20)),
+                 rng.choice(["OK", "OK", "OK", "DNF", "DQ"]))
+                for _ in range(400)
+            ]
+            with self.subTest(scoring=scoring):
+                for a, b in zip(rows, rows[1:]):
+                    ka, kb = sort_key(scoring, *a), sort_key(scoring, *b)
+                    ra, rb = rank_key(scoring, *a), rank_key(scoring, *b)
+                    self.assertEqual((ka > kb) - (ka < kb), (ra > rb) - (ra < rb), (a, b))
+                    self.assertLess(ra, 2**63)
+
+
+@unittest.skipUnless(ranking_mod.np is not None, "NumPy no instalado")
+class NumpyKernelParityTest(SimpleTestCase):
+    def _rows(self, n: int, seed: int):
+        rng = random.Random(seed)
+
+        def maybe(value):
+            return None if rng.random() < 0.1 else value
+
+        rows = []
+        for i in range(n):
+            who = rng.randrange(n)  # repetidos a propósito: se conserva la mejor marca
+            team = who if rng.random() < 0.3 else None
+            rows.append(ResultRow(
+                1, 1, team, None if team else maybe(who + 1), maybe(rng.randrange(0, 12)),
+                maybe(rng.randrange(200, 260)), maybe(rng.randrange(0, 40)),
+                maybe(Decimal(rng.randrange(4000, 4400)) / 100), rng.choice([0, 0, 1, -1, None]),
+                maybe(rng.randrange(60, 70)), "OK", None, None,
+            ))
+        return rows
+
+    def test_identical_to_python(self):
+        for scoring in ("TIME", "REPS", "POINTS", "WEIGHT", None):
+            for seed in range(3):
+                rows = self._rows(700, seed)
+                with self.subTest(scoring=scoring, seed=seed):
+                    self.assertEqual(
+                        ranking_mod.rank_rows_numpy(scoring, rows, 650),
+                        ranking_mod.rank_rows_python(scoring, rows, 650),
+                    )
+        self.assertEqual(ranking_mod.rank_rows_numpy("TIME", [], 0), [])
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from compcore.apps.events.admin import WorkoutAdmin
+
+from compcore.apps.events.models import Division, Event, Workout, WorkoutHeat
+from compcore.apps.judging.models import HeatResult
+from compcore.apps.leaderboard.models import DivisionStanding, WorkoutStanding
+from compcore.apps.leaderboard.services.ranking import division_totals, entrant_key, rank_event
+from compcore.apps.leaderboard.services.standings import rebuild_standings, refresh_standings
+from compcore.apps.registration.models import AthleteEntry
+
+User = get_user_model()
+
+TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[str(settings.BASE_DIR.parent / "templates")])]
+
+
+class StandingsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = Event.objects.create(name="Standings Games", slug="standings-games")
+        cls.division = Division.objects.create(event=cls.event, name="RX", slug="rx")
+        cls.workouts = [
+            Workout.objects.create(event=cls.event, order=1, name="W1", scoring="TIME", is_published=True),
+            Workout.objects.create(event=cls.event, order=2, name="W2", scoring="REPS", is_published=True),
+        ]
+        users = User.objects.bulk_create([User(username=f"s{i}") for i in range(5)])
+        AthleteEntry.objects.bulk_create([AthleteEntry(user=u, event=cls.event, division=cls.division) for u in users])
+        cls.entries = list(AthleteEntry.objects.order_by("id"))
+        for w in cls.workouts:
+            heat = WorkoutHeat.objects.create(workout=w, division=cls.division, heat_number=1, lane_count=4)
+            # El quinto inscripto no tiene resultados: cuenta para N igual
+            HeatResult.objects.bulk_create(
+                [HeatResult(heat=heat, lane=i + 1, time_seconds=300 + i, reps=40 - i, athlete_entry=e)
+                 for i, e in enumerate(cls.entries[:4])],
+                update_conflicts=True, unique_fields=["heat", "lane"],
+                update_fields=["time_seconds", "reps", "athlete_entry"],
+            )
+
+    def setUp(self):
+        rebuild_standings(self.event)
+
+    def _rows(self):
+        return {
+            entrant_key(t, a): (rank, total)
+            for t, a, rank, total in DivisionStanding.objects.filter(division=self.division)
+            .values_list("team_id", "athlete_entry_id", "rank", "total_points")
+        }
+
+    def _expected(self):
+        ranking = rank_event(self.event, self.workouts, [self.division])
+        return ranking, {row.key: (row.rank, row.total) for row in division_totals(ranking, self.division.id, self.workouts)}
+
+    def _versions(self):
+        return {
+            entrant_key(t, a): v
+            for t, a, v in DivisionStanding.objects.filter(division=self.division)
+            .values_list("team_id", "athlete_entry_id", "changed_version")
+        }
+
+    def test_refresh_matches_engine_after_save(self):
+        ranking, expected = self._expected()
+        self.assertEqual(self._rows(), expected)
+
+        result = HeatResult.objects.get(heat__workout=self.workouts[0], athlete_entry=self.entries[3])
+        result.time_seconds = 100
+        result.save()
+        refresh_standings(self.workouts[0], self.division)
+
+        ranking, expected = self._expected()
+        self.assertEqual(self._rows(), expected)
+        self.assertEqual(self._rows()[("athlete", self.entries[3].id)][1], 100 + 40)
+        self.assertEqual(
+            list(WorkoutStanding.objects.filter(workout=self.workouts[0], division=self.division)
+                 .order_by("rank").values_list("athlete_entry_id", "rank", "points")),
+            [(e.key[1], e.rank, e.points) for e in ranking.slices[(self.workouts[0].id, self.division.id)]],
+        )
+
+    def test_untouched_rows_keep_changed_version(self):
+        before = self._versions()
+        # 3º y 4º en W2 intercambian lugar: solo sus filas cambian
+        third, fourth = self.entries[2], self.entries[3]
+        HeatResult.objects.filter(heat__workout=self.workouts[1], athlete_entry=fourth).update(reps=38)
+        HeatResult.objects.filter(heat__workout=self.workouts[1], athlete_entry=third).update(reps=37)
+        refresh_standings(self.workouts[1], self.division)
+
+        after = self._versions()
+        for entry in (self.entries[0], self.entries[1], self.entries[4]):
+            self.assertEqual(after[("athlete", entry.id)], before[("athlete", entry.id)])
+        for entry in (third, fourth):
+            self.assertGreater(after[("athlete", entry.id)], before[("athlete", entry.id)])
+
+        # Reconstruir sin cambios no toca ninguna versión de fila
+        rebuild_standings(self.event)
+        self.assertEqual(self._versions(), after)
+
+    def test_registration_change_refreshes_points(self):
+        winner = ("athlete", self.entries[0].id)
+        self.assertEqual(self._rows()[winner], (1, 200))
+        second = WorkoutStanding.objects.filter(workout=self.workouts[0], athlete_entry=self.entries[1])
+        self.assertEqual(second.get().points, 80)  # N=5: paso de 20 puntos
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.entries[4].delete()  # baja del inscripto sin resultados: N pasa a 4
+
+        self.assertEqual(second.get().points, 75)
+        self.assertEqual(self._rows(), self._expected()[1])
+        self.assertNotIn(("athlete", self.entries[4].id), self._rows())
+
+    def test_dnf_ranks_behind_valid_marks(self):
+        # El más rápido queda DNF: su tiempo no cuenta, va detrás de todos los OK
+        result = HeatResult.objects.get(heat__workout=self.workouts[0], athlete_entry=self.entries[0])
+        result.status = "DNF"
+        result.save()
+        refresh_standings(self.workouts[0], self.division)
+
+        order = list(
+            WorkoutStanding.objects.filter(workout=self.workouts[0], division=self.division)
+            .order_by("rank").values_list("athlete_entry_id", flat=True)
+        )
+        self.assertEqual(order, [e.id for e in self.entries[1:4]] + [self.entries[0].id])
+        in_db = list(
+            HeatResult.objects.filter(heat__workout=self.workouts[0], athlete_entry__isnull=False)
+            .order_by("rank_key").values_list("athlete_entry_id", flat=True)
+        )
+        self.assertEqual(in_db, order)
+
+    def test_scoring_change_in_admin_rekeys(self):
+        workout = self.workouts[0]
+        for i, entry in enumerate(self.entries[:4]):
+            HeatResult.objects.filter(heat__workout=workout, athlete_entry=entry).update(reps=10 + i)
+        workout.scoring = "REPS"
+        workout.save()
+        model_admin = WorkoutAdmin(Workout, admin.site)
+        model_admin.save_model(None, workout, SimpleNamespace(changed_data=["scoring"]), True)
+
+        # Con REPS el orden se invierte (el último lane tiene más reps) y rank_key lo refleja
+        in_db = list(
+            HeatResult.objects.filter(heat__workout=workout, athlete_entry__isnull=False)
+            .order_by("rank_key").values_list("athlete_entry_id", flat=True)
+        )
+        self.assertEqual(in_db, [e.id for e in reversed(self.entries[:4])])
+        self.assertEqual(self._rows(), self._expected()[1])
+
+    @override_settings(TEMPLATES=TEMPLATES)
+    def test_page_materializes_missing_division_once(self):
+        DivisionStanding.objects.filter(division=self.division).delete()
+        cache.clear()
+        url = reverse("event_leaderboard", args=[self.event.slug])
+
+        # Sin filtros no se arma el índice derivado
+        with mock.patch("compcore.apps.leaderboard.views.event_index") as index:
+            page = self.client.get(url)
+        index.assert_not_called()
+        self.assertEqual(page.status_code, 200)
+        self.assertEqual(self._rows(), self._expected()[1])  # materializada, no rankeada al vuelo
+        self.assertContains(page, "s0")
+
+        before = self._versions()
+        cache.clear()
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self._versions(), before)  # la segunda visita solo lee
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, views_api, views_live
 
 urlpatterns = [
     # índice del leaderboard
@@ -7,6 +7,20 @@ urlpatterns = [
 
     # live por workout (se usa en los links "ver live")
     path("live/<slug:event_slug>/w<int:order>/", views.leaderboard_live_workout, name="leaderboard_live_workout"),
+    path(
+        "live/<slug:event_slug>/w<int:order>/stream/",
+        views_live.live_workout_stream,
+        name="leaderboard_live_workout_stream",
+    ),
+
+    # API JSON (paginada por cursor, con deltas `since=<version>`)
+    path("api/<slug:slug>/", views_api.event_api, name="leaderboard_api_event"),
+    path("api/<slug:slug>/me/", views_api.my_position_api, name="leaderboard_api_me"),
+    path("api/<slug:slug>/entrant/<str:entrant>/", views_api.entrant_position_api, name="leaderboard_api_entrant"),
+    path("api/<slug:slug>/<slug:division_slug>/", views_api.division_api, name="leaderboard_api_division"),
+
+    # stream SSE de totales (requiere ASGI)
+    path("<slug:slug>/stream/", views_live.event_leaderboard_stream, name="event_leaderboard_stream"),
 
     # leaderboard por evento (la vista principal que pediste)
     path("<slug:slug>/", views.event_leaderboard, name="event_leaderboard"),
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+from django.db.models import Count, Q
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from compcore.apps.events.decorators import versioned_results
+from compcore.apps.events.models import Division, Event
+from compcore.apps.registration.models import AthleteEntry
+
+from .models import DivisionStanding
+from .services.derived import event_index, filter_rows, parse_filter
+from .services.position import entrant_position, parse_entrant, standing_row
+from .services.ranking import EntrantKey, entrant_code, entrant_name
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class _BadRequest(Exception):
+    pass
+
+
+def _int_param(request, name: str, default: Optional[int] = None, minimum: int = 0) -> Optional[int]:
+    raw = request.GET.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise _BadRequest(f"'{name}' debe ser un entero")
+    if value < minimum:
+        raise _BadRequest(f"'{name}' debe ser >= {minimum}")
+    return value
+
+
+def _code(key: EntrantKey) -> int:
+    """Mismo valor que ranking.entrant_code() en SQL."""
+    kind, pk = key
+    return 2 * pk + (kind == "athlete")
+
+
+def _parse_cursor(raw: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Cursor opaco "<rank>.<t12|a34>": la última fila de la página anterior (keyset, sin OFFSET).
+    Desempata por participante y no por id: los id de DivisionStanding cambian en cada refresh.
+    """
+    if not raw:
+        return None
+    rank, _, token = raw.partition(".")
+    key = parse_entrant(token)
+    if key is None or not rank.isdigit():
+        raise _BadRequest("'cursor' inválido")
+    return int(rank), _code(key)
+
+
+def _row(s: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(standing_row(s), changed=s["changed_version"])
+
+
+@versioned_results("api")
+def event_api(request, slug: str):
+    """Divisiones del evento con su cantidad de filas y la URL paginada de cada una."""
+    event = Event.objects.filter(slug=slug).only("id", "slug", "name", "results_version").first()
+    if event is None:
+        raise Http404("Evento no encontrado")
+    divisions = (
+        Division.objects.filter(event=event).annotate(count=Count("standings")).order_by("name")
+        .values("id", "slug", "name", "count")
+    )
+    return JsonResponse({
+        "event": event.slug,
+        "name": event.name,
+        "version": event.results_version,
+        "divisions": [
+            dict(d, url=reverse("leaderboard_api_division", args=[event.slug, d["slug"]])) for d in divisions
+        ],
+    })
+
+
+@versioned_results("api")
+def division_api(request, slug: str, division_slug: str):
+    """
+    Totales de una división, ordenados por rank, con paginación por cursor:
+      ?limit=N (1..500)   ?cursor=<next de la página anterior>
+      ?since=<version>    solo filas cuyo rank/puntos cambiaron después de esa versión
+      ?sex=F&age=40-44&gym=...  leaderboard derivado (re-rankeado en el subconjunto, ver services.derived)
+    `version` en la respuesta es el valor a usar como próximo `since`. Las bajas (filas que
+    desaparecen) no se informan como delta: si `count` no coincide con lo acumulado, pedir sin `since`.
+    """
+    event = Event.objects.filter(slug=slug).only("id", "slug", "results_version", "start_date").first()
+    if event is None:
+        raise Http404("Evento no encontrado")
+    division = Division.objects.filter(event_id=event.id, slug=division_slug).values("id", "slug", "name").first()
+    if division is None:
+        raise Http404("División no encontrada")
+
+    try:
+        limit = min(_int_param(request, "limit", DEFAULT_LIMIT, minimum=1), MAX_LIMIT)
+        since = _int_param(request, "since")
+        cursor = _parse_cursor(request.GET.get("cursor"))
+        derived = parse_filter(request.GET)
+    except (_BadRequest, ValueError) as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    if derived.active:
+        rows = filter_rows(event_index(event).get(division["id"], []), derived)
+        count = len(rows)
+        if since is not None:
+            rows = [r for r in rows if r["changed"] > since]
+        if cursor is not None:
+            rows = [r for r in rows if (r["overall_rank"], _code(parse_entrant(r["entrant"]))) > cursor]
+        page = rows[: limit + 1]
+        next_cursor = f"{page[limit - 1]['overall_rank']}.{page[limit - 1]['entrant']}" if len(page) > limit else None
+        out_rows = [{k: v for k, v in r.items() if k != "id"} for r in page[:limit]]
+    else:
+        base = DivisionStanding.objects.filter(division_id=division["id"])
+        qs = base
+        if since is not None:
+            qs = qs.filter(changed_version__gt=since)
+        qs = qs.annotate(code=entrant_code())
+        if cursor is not None:
+            rank, code = cursor
+            qs = qs.filter(Q(rank__gt=rank) | Q(rank=rank, code__gt=code))
+        page = list(
+            qs.annotate(entrant=entrant_name()).order_by("rank", "code").values(
+                "rank", "team_id", "athlete_entry_id", "entrant", "total_points",
+                "points_by_order", "changed_version",
+            )[: limit + 1]
+        )
+        count = base.count()
+        out_rows = [_row(s) for s in page[:limit]]
+        next_cursor = f"{page[limit - 1]['rank']}.{out_rows[-1]['entrant']}" if len(page) > limit else None
+
+    next_url = None
+    if next_cursor is not None:
+        params = dict(request.GET.items(), limit=limit, cursor=next_cursor)
+        next_url = f"{request.path}?{urlencode(params)}"
+
+    return JsonResponse({
+        "event": event.slug,
+        "division": division,
+        "version": event.results_version,
+        "since": since,
+        "count": count,
+        "rows": out_rows,
+        "next": next_url,
+    })
+
+
+def _position_response(event: Dict[str, Any], key, around: int) -> JsonResponse:
+    found = entrant_position(event["id"], key, around)
+    if found is None:
+        return JsonResponse({"error": "El participante no tiene posición en este evento"}, status=404)
+    division = Division.objects.filter(pk=found.pop("division_id")).values("id", "slug", "name").first()
+    return JsonResponse(dict(found, event=event["slug"], version=event["results_version"], division=division))
+
+
+@versioned_results("api")
+def entrant_position_api(request, slug: str, entrant: str):
+    """Posición de un participante ('t<id>' equipo / 'a<id>' atleta) y sus vecinos: ?around=N (0..10)."""
+    event = Event.objects.filter(slug=slug).values("id", "slug", "results_version").first()
+    if event is None:
+        raise Http404("Evento no encontrado")
+    key = parse_entrant(entrant)
+    if key is None:
+        return JsonResponse({"error": "'entrant' debe ser t<id> o a<id>"}, status=400)
+    try:
+        around = min(_int_param(request, "around", 2), 10)
+    except _BadRequest as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return _position_response(event, key, around)
+
+
+def my_position_api(request, slug: str):
+    """Igual que entrant_position_api para el usuario logueado (sin caché compartida: depende del usuario)."""
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Requiere iniciar sesión"}, status=401)
+    event = Event.objects.filter(slug=slug).values("id", "slug", "results_version").first()
+    if event is None:
+        raise Http404("Evento no encontrado")
+    entry = AthleteEntry.objects.filter(event_id=event["id"], user=request.user).values("id", "team_id").first()
+    if entry is None:
+        return JsonResponse({"error": "No estás inscripto en este evento"}, status=404)
+    key = ("team", entry["team_id"]) if entry["team_id"] else ("athlete", entry["id"])
+    try:
+        around = min(_int_param(request, "around", 2), 10)
+    except _BadRequest as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return _position_response(event, key, around)
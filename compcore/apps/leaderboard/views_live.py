@@ -1,40 +1,77 @@
-from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponse
+from __future__ import annotations
+
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+
 from compcore.apps.events.models import Event, Workout
 
-try:
-    # Estos helpers pueden no existir en tu repo; los hacemos opcionales
-    from compcore.apps.events.services.heats import (
-        participants_for_division,
-        _workout_positions_for_individuals,
-        _workout_positions_for_teams,
-        _points_for_positions,
+from .services.live_hub import hub, load_event_rows, load_workout_rows
+
+HEARTBEAT_SECONDS = 15
+MAX_STREAM_SECONDS = 300   # el cliente (EventSource) reconecta solo; evita conexiones eternas
+
+
+def _event_ids(event_slug: str, order=None):
+    event_id = Event.objects.filter(slug=event_slug).values_list("id", flat=True).first()
+    if event_id is None:
+        raise Http404("Evento no encontrado")
+    if order is None:
+        return event_id, event_id
+    workout_id = (
+        Workout.objects.filter(event_id=event_id, order=order, is_published=True).values_list("id", flat=True).first()
     )
-except Exception:
-    participants_for_division = None
-    _workout_positions_for_individuals = None
-    _workout_positions_for_teams = None
-    _points_for_positions = None
-
-def leaderboard_live_workout(request, event_slug: str, order: int):
-    """Vista live por WOD. Renderiza una página básica aunque los servicios no estén disponibles."""
-    event = get_object_or_404(Event, slug=event_slug)
-    workout = get_object_or_404(Workout, event=event, order=order)
-
-    if participants_for_division is None:
-        # fallback muy simple para no romper
-        return render(request, "leaderboard/event_leaderboard.html", {
-            "event": event,
-            "workouts": [{"order": workout.order, "title": getattr(workout, "title", None)}],
-            "divisions": [],
-            "live_warning": "Servicios de puntuación no disponibles; mostrando vista básica.",
-        })
-
-    # Si tienes servicios completos, aquí construirías la tabla en vivo por división
-    # Dejamos placeholder para tu implementación específica.
-    return render(request, "leaderboard/event_leaderboard.html", {
-        "event": event,
-        "workouts": [{"order": workout.order, "title": getattr(workout, "title", None)}],
-        "divisions": [],
-        "live_warning": "Vista LIVE en construcción.",
-    })
\ No newline at end of file
+    if workout_id is None:
+        raise Http404("WOD no encontrado")
+    return event_id, workout_id
+
+
+async def _stream(key, event_id, loader):
+    queue, snapshot = await hub.subscribe(key, event_id, loader)
+    try:
+        yield snapshot
+        deadline = time.monotonic() + MAX_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                yield await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+    finally:
+        hub.unsubscribe(key, queue)
+
+
+def _sse_response(stream) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"   # nginx: no bufferizar el stream
+    return response
+
+
+def _asgi_only() -> HttpResponse:
+    return HttpResponse(
+        "El stream en vivo requiere servir la app por ASGI (compcore.compcore.asgi).",
+        status=501,
+        content_type="text/plain; charset=utf-8",
+    )
+
+
+async def live_workout_stream(request, event_slug: str, order: int):
+    """
+    SSE del live por WOD: primero un `snapshot` con todas las filas y luego solo `delta`
+    (filas que cambiaron de posición/puntos/métrica por división) cada vez que cambia un resultado.
+    """
+    if not isinstance(request, ASGIRequest):
+        return _asgi_only()
+    event_id, workout_id = await sync_to_async(_event_ids)(event_slug, order)
+    return _sse_response(_stream(("workout", workout_id), event_id, load_workout_rows))
+
+
+async def event_leaderboard_stream(request, slug: str):
+    """SSE de los totales por división (DivisionStanding), mismo formato snapshot/delta."""
+    if not isinstance(request, ASGIRequest):
+        return _asgi_only()
+    event_id, _ = await sync_to_async(_event_ids)(slug)
+    return _sse_response(_stream(("event", event_id), event_id, load_event_rows))
\ No newline at end of file
@@ -210,6 +210,7 @@ class Command(BaseCommand):
         parser.add_argument("--sheet", type=str, default=None, help="Nombre de la hoja (por defecto: primera)")
         parser.add_argument("--event-slug", required=True, help="Slug del evento destino (ej. force-games)")
         parser.add_argument("--dry-run", action="store_true", help="Simula sin escribir cambios")
+        parser.add_argument("--enqueue", action="store_true", help="Encolar para el worker run_jobs y salir")
 
     def handle(self, *args, **options):
         xlsx_path = Path(options["xlsx_path"])
@@ -220,6 +221,17 @@ class Command(BaseCommand):
         if not xlsx_path.exists():
             raise CommandError(f"Archivo no encontrado: {xlsx_path}")
 
+        if options.get("enqueue"):
+            from compcore.apps.jobs.services.queue import enqueue  # import local: solo para --enqueue
+
+            job = enqueue(
+                "registration.import_teams_xlsx",
+                {"xlsx_path": str(xlsx_path.resolve()), "event_slug": event_slug, "sheet": sheet_name, "dry_run": dry_run},
+                label=f"Importar {xlsx_path.name} → {event_slug}",
+            )
+            self.stdout.write(self.style.SUCCESS(f"✓ Importación encolada (job #{job.pk}); la ejecuta run_jobs."))
+            return
+
         try:
             event = Event.objects.get(slug=event_slug)
         except Event.DoesNotExist:
@@ -1,3 +1,44 @@
-from django.contrib import admin
+from __future__ import annotations
+
+from django.contrib import admin, messages
+from django.utils.translation import gettext_lazy as _
+
+from compcore.apps.events.models import Workout
+
 from .models import ScoreSubmission
-admin.site.register(ScoreSubmission)
+from .services.review import approve_submissions, reject_submissions, renormalize
+
+
+@admin.register(ScoreSubmission)
+class ScoreSubmissionAdmin(admin.ModelAdmin):
+    list_display = ("entry", "workout", "raw_value", "tie_break", "status", "rank", "points", "parse_error", "submitted_at")
+    list_filter = ("status", "workout__event", "workout")
+    search_fields = ("entry__user__username", "raw_value")
+    list_select_related = ("entry__user", "entry__event", "entry__division", "workout")
+    readonly_fields = ("time_seconds", "reps", "weight_kg", "tiebreak_seconds", "parse_error", "rank", "points")
+    ordering = ("workout", "rank", "submitted_at")
+    actions = ["action_approve", "action_reject", "action_renormalize"]
+
+    def _report(self, request, verb: str, stats) -> None:
+        msg = f"{stats['updated']} envíos {verb}; {stats['workouts']} WOD(s) re-rankeados."
+        if stats["skipped"]:
+            msg += f" {stats['skipped']} sin cambios (ya estaban así o con error de formato)."
+        self.message_user(request, msg, level=messages.SUCCESS if stats["updated"] else messages.WARNING)
+
+    @admin.action(description=_("Aprobar envíos seleccionados (re-rankea el WOD)"))
+    def action_approve(self, request, queryset):
+        self._report(request, "aprobados", approve_submissions(queryset.values_list("id", flat=True)))
+
+    @admin.action(description=_("Rechazar envíos seleccionados (re-rankea el WOD)"))
+    def action_reject(self, request, queryset):
+        self._report(request, "rechazados", reject_submissions(queryset.values_list("id", flat=True)))
+
+    @admin.action(description=_("Re-interpretar marcas (tras cambiar el scoring del WOD)"))
+    def action_renormalize(self, request, queryset):
+        total = 0
+        by_workout = {}
+        for pk, workout_id in queryset.values_list("id", "workout_id"):
+            by_workout.setdefault(workout_id, []).append(pk)
+        for workout in Workout.objects.filter(pk__in=list(by_workout)):
+            total += renormalize(workout, by_workout[workout.id])
+        self.message_user(request, f"{total} envíos re-interpretados.", level=messages.SUCCESS)
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.24 on 2026-10-17 04:18
+
+from django.db import migrations, models
+
+
+def backfill_normalized(apps, schema_editor):
+    # Mismo parseo que ScoreSubmission.save()
+    from compcore.apps.scoring.services.normalize import normalize_many
+
+    ScoreSubmission = apps.get_model('scoring', 'ScoreSubmission')
+    Workout = apps.get_model('events', 'Workout')
+    db = schema_editor.connection.alias
+
+    subs = list(ScoreSubmission.objects.using(db).only('id', 'workout_id', 'raw_value', 'tie_break'))
+    if not subs:
+        return
+    scoring = dict(Workout.objects.using(db).filter(pk__in={s.workout_id for s in subs}).values_list('id', 'scoring'))
+    normalize_many(subs, scoring)
+    ScoreSubmission.objects.using(db).bulk_update(
+        subs, ['time_seconds', 'reps', 'weight_kg', 'tiebreak_seconds', 'parse_error', 'rank_key'], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scoring', '0001_initial'),
+        ('events', '0015_event_results_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scoresubmission',
+            name='parse_error',
+            field=models.CharField(blank=True, default='', max_length=120),
+        ),
+        migrations.AddField(
+            model_name='scoresubmission',
+            name='points',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='scoresubmission',
+            name='rank',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='scoresubmission',
+            name='rank_key',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='scoresubmission',
+            name='reps',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scoresubmission',
+            name='tiebreak_seconds',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scoresubmission',
+            name='time_seconds',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scoresubmission',
+            name='weight_kg',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True),
+        ),
+        migrations.AlterField(
+            model_name='scoresubmission',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pendiente'), ('APPROVED', 'Aprobada'), ('REJECTED', 'Rechazada')], default='PENDING', max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='scoresubmission',
+            index=models.Index(fields=['workout', 'status', 'rank_key'], name='scoring_sub_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scoresubmission',
+            index=models.Index(fields=['workout', 'rank'], name='scoring_sub_pos_idx'),
+        ),
+        migrations.RunPython(backfill_normalized, migrations.RunPython.noop),
+    ]
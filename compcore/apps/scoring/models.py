@@ -2,13 +2,52 @@ from django.db import models
 from compcore.apps.registration.models import AthleteEntry
 from compcore.apps.events.models import Workout
 
+STATUS_PENDING = "PENDING"
+STATUS_APPROVED = "APPROVED"
+STATUS_REJECTED = "REJECTED"
+STATUS_CHOICES = (
+    (STATUS_PENDING, "Pendiente"),
+    (STATUS_APPROVED, "Aprobada"),
+    (STATUS_REJECTED, "Rechazada"),
+)
+
+
 class ScoreSubmission(models.Model):
     entry = models.ForeignKey(AthleteEntry, on_delete=models.CASCADE)
     workout = models.ForeignKey(Workout, on_delete=models.CASCADE)
     raw_value = models.CharField(max_length=64)  # e.g., '07:43' or '185' or '126'
     tie_break = models.CharField(max_length=32, blank=True)
-    status = models.CharField(max_length=12, default='PENDING')  # PENDING/APPROVED/REJECTED
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_PENDING)
     submitted_at = models.DateTimeField(auto_now_add=True)
 
+    # Normalizado UNA vez al guardar (services/normalize.py); nada se parsea al leer
+    time_seconds = models.PositiveIntegerField(null=True, blank=True)
+    reps = models.PositiveIntegerField(null=True, blank=True)
+    weight_kg = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    tiebreak_seconds = models.PositiveIntegerField(null=True, blank=True)
+    parse_error = models.CharField(max_length=120, blank=True, default="")
+    rank_key = models.BigIntegerField(null=True, blank=True, editable=False)
+
+    # Materializado por rerank_workouts() tras cada lote de aprobaciones/rechazos
+    rank = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    points = models.PositiveIntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("workout", "status", "rank_key"), name="scoring_sub_rank_idx"),
+            models.Index(fields=("workout", "rank"), name="scoring_sub_pos_idx"),
+        ]
+
     def __str__(self):
         return f"{self.entry} – {self.workout} = {self.raw_value}"
+
+    def save(self, *args, **kwargs):
+        from .services.normalize import normalize
+
+        normalize(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | {
+                "time_seconds", "reps", "weight_kg", "tiebreak_seconds", "parse_error", "rank_key",
+            }
+        super().save(*args, **kwargs)
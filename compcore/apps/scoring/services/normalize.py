@@ -0,0 +1,89 @@
+# compcore/apps/scoring/services/normalize.py
+"""
+Normalización de ScoreSubmission: `raw_value` / `tie_break` (texto libre del atleta) se parsean
+UNA vez al guardar a columnas tipadas + rank_key (misma clave que HeatResult, ver
+leaderboard.services.ranking.rank_key). Los rankings leen solo columnas ya ordenables.
+Un valor que no se puede interpretar deja parse_error y rank_key vacío (no se puede aprobar).
+"""
+from __future__ import annotations
+
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Optional
+
+from compcore.apps.leaderboard.services.ranking import rank_key
+
+_DURATION_RE = re.compile(r"^(?:(\d+):)?(\d{1,2}):(\d{1,2})(?:[.,]\d+)?$")
+
+
+def parse_duration(text: str) -> int:
+    """'7:43' / '07:43' / '1:02:03' / '463' → segundos (las fracciones de segundo se descartan)."""
+    text = (text or "").strip()
+    if text.isdigit():
+        return int(text)
+    m = _DURATION_RE.match(text)
+    if not m:
+        raise ValueError(f"Tiempo inválido: {text!r} (usar mm:ss o h:mm:ss)")
+    hours, minutes, seconds = int(m.group(1) or 0), int(m.group(2)), int(m.group(3))
+    if seconds >= 60 or (m.group(1) and minutes >= 60):
+        raise ValueError(f"Tiempo inválido: {text!r}")
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def parse_reps(text: str) -> int:
+    text = (text or "").strip()
+    if not text.isdigit():
+        raise ValueError(f"Repeticiones inválidas: {text!r}")
+    return int(text)
+
+
+def parse_weight(text: str) -> Decimal:
+    """'102.5' / '102,5' / '102.5 kg' → Decimal con 2 decimales."""
+    text = re.sub(r"\s*kg$", "", (text or "").strip().lower()).replace(",", ".")
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"Peso inválido: {text!r}")
+    if not value.is_finite() or value < 0 or value >= 10000:
+        raise ValueError(f"Peso fuera de rango: {text!r}")
+    return value.quantize(Decimal("0.01"))
+
+
+def parse_submission(scoring: Optional[str], raw_value: str, tie_break: str = "") -> Dict[str, object]:
+    """Columnas tipadas para un scoring; ValueError con mensaje para el atleta si no se puede."""
+    values: Dict[str, object] = {"time_seconds": None, "reps": None, "weight_kg": None, "tiebreak_seconds": None}
+    if scoring == "TIME":
+        values["time_seconds"] = parse_duration(raw_value)
+    elif scoring in ("REPS", "POINTS"):
+        values["reps"] = parse_reps(raw_value)
+    elif scoring == "WEIGHT":
+        values["weight_kg"] = parse_weight(raw_value)
+    else:
+        raise ValueError(f"Scoring no soportado: {scoring!r}")
+    if (tie_break or "").strip():
+        values["tiebreak_seconds"] = parse_duration(tie_break)
+    return values
+
+
+def normalize(sub, scoring: Optional[str] = None) -> None:
+    """Completa las columnas tipadas, parse_error y rank_key de una ScoreSubmission (sin guardar)."""
+    if scoring is None:
+        scoring = sub.workout.scoring
+    try:
+        values = parse_submission(scoring, sub.raw_value, sub.tie_break)
+    except ValueError as exc:
+        values = {"time_seconds": None, "reps": None, "weight_kg": None, "tiebreak_seconds": None}
+        sub.parse_error = str(exc)[:120]
+    else:
+        sub.parse_error = ""
+    for field, value in values.items():
+        setattr(sub, field, value)
+    sub.rank_key = None if sub.parse_error else rank_key(
+        scoring, sub.time_seconds, sub.reps, sub.weight_kg, 0, sub.tiebreak_seconds, None
+    )
+
+
+def normalize_many(subs: Iterable, scoring_by_workout: Dict[int, str]) -> None:
+    """Versión en bloque (antes de bulk_create / bulk_update): sin consultas por fila."""
+    for sub in subs:
+        normalize(sub, scoring_by_workout.get(sub.workout_id))
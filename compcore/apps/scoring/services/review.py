@@ -0,0 +1,106 @@
+# compcore/apps/scoring/services/review.py
+"""
+Aprobación / rechazo en bloque de ScoreSubmission y re-rank por workout.
+
+Un lote = un UPDATE de estado + un re-rank por workout afectado (no por envío). El re-rank lee
+las aprobadas ya ordenadas por la BD (índice workout, status, rank_key) y escribe rank/points
+solo en las filas que cambian.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from compcore.apps.events.models import Workout
+from compcore.apps.leaderboard.services.ranking import points_for_index
+from compcore.apps.registration.models import AthleteEntry
+
+from ..models import STATUS_APPROVED, STATUS_REJECTED, ScoreSubmission
+
+
+def _registered_counts(event_id: int) -> Dict[int, int]:
+    return dict(
+        AthleteEntry.objects.filter(event_id=event_id, team__isnull=True)
+        .values("division_id").annotate(n=Count("id")).values_list("division_id", "n")
+    )
+
+
+def rerank_workout(workout: Workout) -> int:
+    """Rank y puntos de las aprobadas de un workout, por división (misma regla que el leaderboard)."""
+    registered = _registered_counts(workout.event_id)
+    rows = list(
+        ScoreSubmission.objects.filter(workout=workout, status=STATUS_APPROVED, rank_key__isnull=False)
+        .order_by("entry__division_id", "rank_key", "submitted_at", "id")
+        .values_list("id", "entry_id", "entry__division_id", "rank", "points")
+    )
+    entrants: Dict[int, set] = {}
+    for _pk, entry_id, division_id, _rank, _points in rows:
+        entrants.setdefault(division_id, set()).add(entry_id)
+
+    changed: List[ScoreSubmission] = []
+    seen = set()
+    idx_by_div: Dict[int, int] = {}
+    for pk, entry_id, division_id, rank, points in rows:
+        idx = idx_by_div.get(division_id, 0)
+        idx_by_div[division_id] = idx + 1
+        if entry_id in seen:
+            # Otro envío aprobado del mismo atleta: cuenta su mejor marca
+            new = (None, None)
+        else:
+            seen.add(entry_id)
+            n = max(registered.get(division_id, 0), len(entrants[division_id]))
+            new = (idx + 1, points_for_index(idx, n))
+        if (rank, points) != new:
+            changed.append(ScoreSubmission(pk=pk, rank=new[0], points=new[1]))
+
+    with transaction.atomic():
+        ScoreSubmission.objects.bulk_update(changed, ["rank", "points"], batch_size=1000)
+        cleared = (
+            ScoreSubmission.objects.filter(workout=workout, rank__isnull=False)
+            .filter(~Q(status=STATUS_APPROVED) | Q(rank_key__isnull=True))
+            .update(rank=None, points=None)
+        )
+    return len(changed) + cleared
+
+
+def rerank_workouts(workout_ids: Iterable[int]) -> Dict[int, int]:
+    return {w.id: rerank_workout(w) for w in Workout.objects.filter(pk__in=set(workout_ids))}
+
+
+def _set_status(ids: Iterable[int], status: str, only_valid: bool) -> Dict[str, int]:
+    ids = list(ids)
+    qs = ScoreSubmission.objects.filter(pk__in=ids).exclude(status=status)
+    if only_valid:
+        qs = qs.filter(parse_error="", rank_key__isnull=False)
+    workout_ids = set(qs.values_list("workout_id", flat=True).distinct())
+    with transaction.atomic():
+        updated = qs.update(status=status)
+        reranked = rerank_workouts(workout_ids)
+    return {"updated": updated, "skipped": len(ids) - updated, "workouts": len(reranked)}
+
+
+def approve_submissions(ids: Iterable[int]) -> Dict[str, int]:
+    """Aprueba en bloque; las que tienen parse_error quedan pendientes (cuentan en `skipped`)."""
+    return _set_status(ids, STATUS_APPROVED, only_valid=True)
+
+
+def reject_submissions(ids: Iterable[int]) -> Dict[str, int]:
+    return _set_status(ids, STATUS_REJECTED, only_valid=False)
+
+
+def renormalize(workout: Workout, ids: Optional[Iterable[int]] = None) -> int:
+    """Re-parsea envíos existentes (p.ej. tras cambiar el scoring del WOD) y re-rankea."""
+    from .normalize import normalize_many
+
+    qs = ScoreSubmission.objects.filter(workout=workout)
+    if ids is not None:
+        qs = qs.filter(pk__in=list(ids))
+    subs = list(qs.only("id", "workout_id", "raw_value", "tie_break"))
+    normalize_many(subs, {workout.id: workout.scoring})
+    fields = ["time_seconds", "reps", "weight_kg", "tiebreak_seconds", "parse_error", "rank_key"]
+    with transaction.atomic():
+        ScoreSubmission.objects.bulk_update(subs, fields, batch_size=1000)
+        rerank_workout(workout)
+    return len(subs)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from compcore.apps.events.models import Division, Event, Workout
+from compcore.apps.registration.models import AthleteEntry
+from compcore.apps.scoring.models import STATUS_APPROVED, STATUS_PENDING, ScoreSubmission
+from compcore.apps.scoring.services.normalize import parse_submission
+from compcore.apps.scoring.services.review import approve_submissions, reject_submissions
+
+User = get_user_model()
+
+
+class ParseSubmissionTest(SimpleTestCase):
+    def test_formats(self):
+        self.assertEqual(parse_submission("TIME", "07:43")["time_seconds"], 463)
+        self.assertEqual(parse_submission("TIME", "1:02:03", "4:05")["tiebreak_seconds"], 245)
+        self.assertEqual(parse_submission("REPS", " 185 ")["reps"], 185)
+        self.assertEqual(parse_submission("WEIGHT", "102,5 kg")["weight_kg"], Decimal("102.50"))
+        for scoring, raw in (("TIME", "7:75"), ("REPS", "12a"), ("WEIGHT", "abc")):
+            with self.assertRaises(ValueError):
+                parse_submission(scoring, raw)
+
+
+class ReviewPipelineTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        event = Event.objects.create(name="Open", slug="open-q")
+        cls.division = Division.objects.create(event=event, name="RX", slug="rx")
+        cls.workout = Workout.objects.create(event=event, order=1, name="Q1", scoring="TIME", is_published=True)
+        users = User.objects.bulk_create([User(username=f"q{i}") for i in range(4)])
+        cls.entries = AthleteEntry.objects.bulk_create(
+            [AthleteEntry(user=u, event=event, division=cls.division) for u in users]
+        )
+
+    def _submit(self, entry, raw):
+        sub = ScoreSubmission(entry=entry, workout=self.workout, raw_value=raw)
+        sub.save()
+        return sub
+
+    def test_approve_and_reject_rerank(self):
+        subs = [self._submit(e, raw) for e, raw in zip(self.entries, ["9:00", "7:30", "8:15", "oops"])]
+        self.assertTrue(subs[3].parse_error)
+
+        stats = approve_submissions([s.pk for s in subs])
+        self.assertEqual((stats["updated"], stats["skipped"]), (3, 1))
+
+        ranked = ScoreSubmission.objects.filter(workout=self.workout, rank__isnull=False).order_by("rank")
+        self.assertEqual([s.raw_value for s in ranked], ["7:30", "8:15", "9:00"])
+        self.assertEqual([s.points for s in ranked], [100, 75, 50])
+        self.assertEqual(ScoreSubmission.objects.get(pk=subs[3].pk).status, STATUS_PENDING)
+
+        reject_submissions([subs[1].pk])
+        ranked = ScoreSubmission.objects.filter(workout=self.workout, status=STATUS_APPROVED).order_by("rank")
+        self.assertEqual([(s.raw_value, s.rank) for s in ranked], [("8:15", 1), ("9:00", 2)])
+        self.assertIsNone(ScoreSubmission.objects.get(pk=subs[1].pk).rank)
@@ -1,4 +1,4 @@
 import os
 from django.core.asgi import get_asgi_application
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'compcore.compcore.settings.base')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'compcore.compcore.settings')
 application = get_asgi_application()
@@ -28,10 +28,12 @@ INSTALLED_APPS = [
     "compcore.apps.accounts",
     "compcore.apps.orgs",
     "compcore.apps.scheduling",
+    "compcore.apps.jobs",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "compcore.apps.events.middleware.SnapshotMiddleware",  # inactivo salvo PUBLIC_SNAPSHOTS=1
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -66,6 +68,21 @@ DATABASES = {
     }
 }
 
+# Caché de páginas de resultados + locks single-flight. Con varios workers usar una caché compartida,
+# p.ej. CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache CACHE_LOCATION=compcore_cache
+# (y `manage.py createcachetable`).
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "compcore"),
+    }
+}
+
+# Snapshots estáticas de páginas públicas (events.services.snapshots): con 1, los resultados
+# re-publican las páginas afectadas (vía run_jobs) y SnapshotMiddleware las sirve a anónimos.
+PUBLIC_SNAPSHOTS = os.environ.get("PUBLIC_SNAPSHOTS", "0") == "1"
+PUBLIC_SNAPSHOTS_MAX_AGE = int(os.environ.get("PUBLIC_SNAPSHOTS_MAX_AGE", "5"))  # segundos
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -28,11 +28,13 @@ INSTALLED_APPS = [
     "compcore.apps.registration",
     "compcore.apps.scoring",
     "compcore.apps.scheduling",  # 👈 NUEVA
+    "compcore.apps.jobs",
 ]
 
 # === Middleware ===
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "compcore.apps.events.middleware.SnapshotMiddleware",  # inactivo salvo PUBLIC_SNAPSHOTS=1
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -72,6 +74,19 @@ DATABASES = {
     }
 }
 
+# === Caché (páginas de resultados + locks single-flight; compartida si hay varios workers) ===
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "compcore"),
+    }
+}
+
+# Snapshots estáticas de páginas públicas (events.services.snapshots): con 1, los resultados
+# re-publican las páginas afectadas (vía run_jobs) y SnapshotMiddleware las sirve a anónimos.
+PUBLIC_SNAPSHOTS = os.environ.get("PUBLIC_SNAPSHOTS", "0") == "1"
+PUBLIC_SNAPSHOTS_MAX_AGE = int(os.environ.get("PUBLIC_SNAPSHOTS_MAX_AGE", "5"))  # segundos
+
 # === Password validators ===
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
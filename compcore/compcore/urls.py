@@ -39,4 +39,7 @@ urlpatterns = [
 
     # Registro: habilita /register/<slug>/ y subrutas
     path("register/", include("compcore.apps.registration.urls")),
+
+    # Trabajos en segundo plano (solo staff)
+    path("jobs/", include("compcore.apps.jobs.urls")),
 ]
\ No newline at end of file
@@ -0,0 +1,66 @@
+{% load static %}/* Service worker de la página offline de jueces (views.offline_service_worker).
+ * - Páginas /judging/offline/<slug>/: red primero; sin red, la última copia guardada.
+ * - app.css: copia guardada primero, se actualiza en segundo plano.
+ * - La API (roster/sync) NO pasa por acá: la página guarda el roster y la cola en IndexedDB.
+ */
+var CACHE = "timscore-judge-v1";
+var STYLES = "{% static 'app.css' %}";
+
+self.addEventListener("install", function (event) {
+  event.waitUntil(
+    caches.open(CACHE).then(function (cache) { return cache.add(STYLES); }).catch(function () {})
+  );
+  self.skipWaiting();
+});
+
+self.addEventListener("activate", function (event) {
+  event.waitUntil(
+    caches.keys().then(function (names) {
+      return Promise.all(names.filter(function (n) {
+        return n.indexOf("timscore-judge-") === 0 && n !== CACHE;
+      }).map(function (n) { return caches.delete(n); }));
+    }).then(function () { return self.clients.claim(); })
+  );
+});
+
+function networkFirst(request) {
+  return fetch(request).then(function (response) {
+    // Un redirect (login vencido) o un error no reemplazan la copia buena
+    if (response.ok && !response.redirected) {
+      var copy = response.clone();
+      caches.open(CACHE).then(function (cache) { cache.put(request, copy); });
+    }
+    return response;
+  }).catch(function () {
+    return caches.match(request, { ignoreSearch: true }).then(function (cached) {
+      return cached || new Response("Sin conexión y sin copia guardada de esta página.", {
+        status: 503, headers: { "Content-Type": "text/plain; charset=utf-8" },
+      });
+    });
+  });
+}
+
+function cacheFirst(request) {
+  return caches.match(request).then(function (cached) {
+    var fresh = fetch(request).then(function (response) {
+      if (response.ok) {
+        var copy = response.clone();
+        caches.open(CACHE).then(function (cache) { cache.put(request, copy); });
+      }
+      return response;
+    });
+    return cached || fresh;
+  });
+}
+
+self.addEventListener("fetch", function (event) {
+  var request = event.request;
+  if (request.method !== "GET") return;
+  var url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
+  if (request.mode === "navigate" && url.pathname.indexOf(self.registration.scope.replace(self.location.origin, "")) === 0) {
+    event.respondWith(networkFirst(request));
+  } else if (url.pathname === STYLES) {
+    event.respondWith(cacheFirst(request));
+  }
+});